@@ -0,0 +1,174 @@
+import threading
+from heapq import nlargest
+
+SOLD, REVENUE, CANCELLED = range(3)
+
+
+def _fare(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _row(totals, capacity):
+    """One report row: seats sold, capacity, load factor, revenue, cancellations."""
+    sold, revenue, cancelled = totals
+    return {
+        "sold": sold,
+        "capacity": capacity,
+        "load_factor": sold / capacity if capacity else None,
+        "revenue": round(revenue, 2),
+        "cancelled": cancelled,
+    }
+
+
+def _report(total, capacity, classes, routes, flights):
+    """The report shape shared by the running dashboard and range reports."""
+    return {
+        "total": _row(total, sum(capacity.values())),
+        "classes": [{"class": c, **_row(totals, capacity.get(c, 0))} for c, totals in classes],
+        "routes": [{"source": r[0], "destination": r[1], **_row(totals, cap)} for r, totals, cap in routes],
+        "flights": [{"flight_id": k[0], "date": k[1], "class": k[2], **_row(totals, cap)}
+                    for k, totals, cap in flights],
+    }
+
+
+# ===============================================================
+#                  RUNNING BOOKING AGGREGATES
+# ===============================================================
+
+class BookingAnalytics:
+    """Revenue, seats sold and cancellations, kept as running totals.
+
+    Totals live per (flight_id, date, class) and are rolled up per route,
+    class and overall on every change, as is seat capacity from the
+    catalog. A dashboard reads those small dicts, so its cost depends on
+    the number of routes and flights, never on the number of bookings.
+    """
+
+    def __init__(self, classes):
+        self.classes = tuple(classes)
+        self._lock = threading.Lock()
+        self.by_key = {}            # (flight_id, date, class) -> [sold, revenue, cancelled]
+        self.by_route = {}          # (source, destination) -> [sold, revenue, cancelled]
+        self.by_class = {c: [0, 0.0, 0] for c in self.classes}
+        self.total = [0, 0.0, 0]
+        self._routes = {}           # (flight_id, date) -> (source, destination)
+        self.capacity = {c: 0 for c in self.classes}    # class -> seats
+        self.route_capacity = {}    # (source, destination) -> seats, all classes
+        self.key_capacity = {}      # (flight_id, date, class) -> seats
+        self.version = None         # booking store version() the totals are in step with
+
+    # -----------------------------------------------------------
+    #                     CATALOG
+    # -----------------------------------------------------------
+    def add_flight(self, flight, step=1):
+        """Count a flight's seats (step=-1 to take them off again)."""
+        route = (flight.source, flight.destination)
+        with self._lock:
+            # Kept after removal: its bookings may still be cancelled later
+            self._routes[(flight.flight_id, flight.date)] = route
+            for flight_class in self.classes:
+                self._add_capacity(flight.flight_id, flight.date, route, flight_class,
+                                   step * flight.seats[flight_class])
+
+    def remove_flight(self, flight):
+        self.add_flight(flight, -1)
+
+    def add_capacity(self, flight, flight_class, extra):
+        """Seats added to one class of a flight."""
+        with self._lock:
+            self._add_capacity(flight.flight_id, flight.date, (flight.source, flight.destination),
+                               flight_class, extra)
+
+    def _add_capacity(self, flight_id, date, route, flight_class, seats):
+        key = (flight_id, date, flight_class)
+        self.capacity[flight_class] = self.capacity.get(flight_class, 0) + seats
+        self.route_capacity[route] = self.route_capacity.get(route, 0) + seats
+        self.key_capacity[key] = self.key_capacity.get(key, 0) + seats
+
+    # -----------------------------------------------------------
+    #                     BOOKINGS
+    # -----------------------------------------------------------
+    def _add(self, key, sold, revenue, cancelled):
+        route = self._routes.get(key[:2])
+        for totals in (
+            self.by_key.setdefault(key, [0, 0.0, 0]),
+            self.by_route.setdefault(route, [0, 0.0, 0]) if route is not None else None,
+            self.by_class.setdefault(key[2], [0, 0.0, 0]),
+            self.total,
+        ):
+            if totals is not None:
+                totals[SOLD] += sold
+                totals[REVENUE] += revenue
+                totals[CANCELLED] += cancelled
+
+    def record(self, bookings, cancelled=False):
+        """Count bookings just made, or with cancelled set, just cancelled."""
+        step = -1 if cancelled else 1
+        with self._lock:
+            if self.version is not None:
+                self.version += len(bookings)
+            for b in bookings:
+                self._add((b["flight_id"], b["date"], b["class"]), step, step * _fare(b["fare"]), int(cancelled))
+
+    def load(self, bookings, cancellations, version=None):
+        """Start the totals from live bookings and {(flight_id, date, class): n}
+        cancellations, read at the booking store's version()."""
+        with self._lock:
+            self.version = version
+            for b in bookings:
+                self._add((b["flight_id"], b["date"], b["class"]), 1, _fare(b["fare"]), 0)
+            for key, n in cancellations.items():
+                self._add(key, 0, 0.0, n)
+
+    # -----------------------------------------------------------
+    #                     DASHBOARD
+    # -----------------------------------------------------------
+    def dashboard(self, top=10):
+        """Totals, per-class rows and the top routes / flights by revenue."""
+        with self._lock:
+            routes = nlargest(top, self.by_route.items(), key=lambda item: item[1][REVENUE])
+            flights = nlargest(top, self.by_key.items(), key=lambda item: item[1][REVENUE])
+            return _report(
+                list(self.total), self.capacity,
+                [(c, list(totals)) for c, totals in self.by_class.items()],
+                [(route, list(totals), self.route_capacity.get(route, 0)) for route, totals in routes],
+                [(key, list(totals), self.key_capacity.get(key, 0)) for key, totals in flights],
+            )
+
+
+# ===============================================================
+#                  AD-HOC DATE RANGE REPORTS
+# ===============================================================
+
+def range_report(bookings, cancellations, flights, classes, top=10):
+    """The dashboard() report recomputed from scratch for one date range.
+
+    bookings are the live bookings of the range, cancellations its
+    {(flight_id, date, class): n} and flights the catalog flights of the
+    range (for capacity and routes). Each booking is coded once to its
+    (flight_id, date, class) key; the sums over bookings are then two
+    NumPy bincounts, and only the per-key totals are rolled up in Python.
+    """
+    import numpy as np
+
+    codes = {}      # (flight_id, date, class) -> key code
+    keys = np.array([codes.setdefault((b["flight_id"], b["date"], b["class"]), len(codes)) for b in bookings],
+                    dtype=np.intp)
+    try:
+        fares = np.array([float(b["fare"]) for b in bookings], dtype=np.float64)
+    except (TypeError, ValueError):
+        fares = np.array([_fare(b["fare"]) for b in bookings], dtype=np.float64)
+    sold = np.bincount(keys, minlength=len(codes))
+    revenue = np.bincount(keys, weights=fares, minlength=len(codes))
+
+    report = BookingAnalytics(classes)
+    for flight in flights:
+        report.add_flight(flight)
+    for key, n, amount in zip(codes, sold.tolist(), revenue.tolist()):
+        report._add(key, n, amount, 0)
+    for key, n in cancellations.items():
+        report._add(key, 0, 0.0, n)
+    return report.dashboard(top)
@@ -0,0 +1,519 @@
+"""
+JSON booking API over one shared FlightSystem, on asyncio.
+
+A small HTTP/1.1 server (stdlib only): connections are kept alive and
+may pipeline requests, in-memory reads (search, fares) are answered on
+the event loop, and anything touching the data files or rendering a PDF
+runs on thread pools so a slow write never stalls other connections.
+Single bookings for the same flight, date and class that arrive while
+one is being written are coalesced into one book_group() call (one seat
+claim, one ledger append); POST /batch runs many requests in one round
+trip, and its bookings coalesce the same way.
+
+    python api_server.py [--host 127.0.0.1] [--port 8080] [--data-dir data] [--storage csv]
+
+or next to the Streamlit UI, sharing its FlightSystem:
+
+    FMS_API_PORT=8080 streamlit run app.py
+
+Endpoints (JSON bodies and responses, errors as {"error": ...}):
+
+    GET  /health
+    GET  /search?source=&destination=&date=[&sort=price][&class=Economy][&offset=0][&limit=50]
+    GET  /fare?flight_id=&date=&class=[&passengers=1]
+    GET  /bookings?passenger_name=&flight_id=[&date=]
+    POST /book        {"flight_id", "passenger_name", "date", "class"}
+    POST /book_group  {"flight_id", "passengers": [...], "date", "class", "policy"}
+    POST /cancel      {"booking_id"} or {"passenger_name", "flight_id", "date"}
+    GET  /ticket?booking_id=                (application/pdf)
+    POST /batch       [{"method", "path", "body"}, ...] -> [{"status", "body"}, ...]
+    GET  /metrics                           (Prometheus text)
+"""
+import argparse
+import asyncio
+import functools
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from flight_system import GROUP_ALL_OR_NOTHING, GROUP_POLICIES, GROUP_WAITLIST_REST, SEAT_CLASSES, FlightSystem
+from metrics import REGISTRY
+from ticket_generator import TicketGenerator
+
+KEEPALIVE_TIMEOUT = 15      # seconds an idle connection stays open
+REQUEST_TIMEOUT = 15        # seconds to send the headers and body of a started request
+MAX_HEADERS = 100           # header lines per request
+MAX_HEADER_BYTES = 16384    # bytes of header lines per request
+MAX_BODY = 1 << 20          # bytes
+MAX_BATCH = 100             # requests per POST /batch
+MAX_PAGE = 200              # flights per search page
+RELOAD_INTERVAL = 1.0       # seconds between checks for data changed by other processes
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+# A non-JSON response body (PDF tickets, metrics text)
+Raw = namedtuple("Raw", "content_type data")
+
+
+class ApiError(Exception):
+    """A request the API refuses; answered as {"error": message} with status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _fields(data, *names):
+    """The named, non-empty fields of a query or JSON body, or a 400."""
+    if not isinstance(data, dict):
+        raise ApiError(400, "expected a JSON object")
+    missing = [name for name in names if data.get(name) in (None, "")]
+    if missing:
+        raise ApiError(400, f"missing {', '.join(missing)}")
+    return [data[name] for name in names]
+
+
+def _int(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be an integer") from None
+
+
+def _flight_class(value):
+    if value not in SEAT_CLASSES:
+        raise ApiError(400, f"class must be one of {', '.join(SEAT_CLASSES)}")
+    return value
+
+
+def _flight_json(flight):
+    return {
+        "flight_id": flight.flight_id,
+        "source": flight.source,
+        "destination": flight.destination,
+        "date": flight.date,
+        "time": flight.time,
+        "base_price": flight.base_price,
+        "available": {c: flight.available(c) for c in SEAT_CLASSES},
+        "fares": {c: flight.get_price_by_class(c) for c in SEAT_CLASSES},
+    }
+
+
+# ===============================================================
+#                     BOOKING COALESCER
+# ===============================================================
+
+class _BookingBatcher:
+    """Groups concurrent single bookings per (flight_id, date, class).
+
+    The first booking for a key is written at once; bookings for that key
+    arriving while it runs wait and then go together as one
+    book_group(policy=waitlist_rest) call. That books them in arrival
+    order and waitlists whoever does not fit, the same outcome as one
+    book_ticket() each, for one seat claim and one ledger append.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self._pending = {}          # key -> [(passenger_name, future)]
+
+    async def book(self, flight_id, passenger_name, date, flight_class):
+        key = (flight_id, date, flight_class)
+        future = asyncio.get_running_loop().create_future()
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append((passenger_name, future))
+        else:
+            self._pending[key] = [(passenger_name, future)]
+            asyncio.create_task(self._flush(key))
+        return await future
+
+    async def _flush(self, key):
+        while self._pending.get(key):
+            batch, self._pending[key] = self._pending[key], []
+            try:
+                result = await self.api.offload(
+                    self.api.system.book_group, key[0], [name for name, _ in batch], key[1], key[2],
+                    GROUP_WAITLIST_REST)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            if len(batch) > 1:
+                REGISTRY.inc("fms_api_bookings_coalesced_total", len(batch) - 1)
+            outcomes = [("booked", b) for b in result["booked"]] + [("waitlisted", w) for w in result["waitlisted"]]
+            for (_, future), outcome in zip(batch, outcomes):
+                future.set_result(outcome)
+            for _, future in batch[len(outcomes):]:
+                future.set_result(None)         # flight deleted meanwhile
+        del self._pending[key]
+
+
+# ===============================================================
+#                     ROUTES
+# ===============================================================
+
+class BookingApi:
+    """The API's routes over one FlightSystem.
+
+    Each route is a coroutine taking (query params, JSON body) and
+    returning a JSON-able payload or a Raw body; dispatch() turns errors
+    into status codes. Route handlers never block the event loop on file
+    I/O: that goes through offload() (FlightSystem calls) or the PDF pool.
+    """
+
+    def __init__(self, system, workers=8, pdf_workers=2, tickets_dir="tickets"):
+        self.system = system
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="api")
+        self.pdf_executor = ThreadPoolExecutor(pdf_workers * 2, thread_name_prefix="api-pdf")
+        # Drawing a PDF is CPU-bound Python, so tickets are rendered in
+        # worker processes that do not hold this process's GIL; the PDF
+        # threads only wait for them (and read the ticket cache)
+        self.tickets = TicketGenerator(output_dir=tickets_dir, workers=pdf_workers)
+        self._batcher = _BookingBatcher(self)
+        self._reloader = None
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/search"): self.search,
+            ("GET", "/fare"): self.fare,
+            ("GET", "/bookings"): self.find_bookings,
+            ("POST", "/book"): self.book,
+            ("POST", "/book_group"): self.book_group,
+            ("POST", "/cancel"): self.cancel,
+            ("GET", "/ticket"): self.ticket,
+            ("POST", "/batch"): self.batch,
+            ("GET", "/metrics"): self.metrics,
+        }
+
+    async def offload(self, fn, *args):
+        """Run a blocking FlightSystem call on the API thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def start_reloading(self):
+        """Pick up data files changed by other processes (admin edits, the UI) once a second."""
+        if self._reloader is None:
+            self._reloader = asyncio.create_task(self._reload_loop())
+
+    async def _reload_loop(self):
+        while True:
+            await asyncio.sleep(RELOAD_INTERVAL)
+            try:
+                await self.offload(self.system.reload_if_changed)
+            except Exception:
+                REGISTRY.inc("fms_api_errors_total", route="reload")
+
+    def close(self):
+        if self._reloader is not None:
+            self._reloader.cancel()
+        self.executor.shutdown(wait=False)
+        self.pdf_executor.shutdown(wait=False)
+        self.tickets.close()
+
+    async def dispatch(self, method, target, body=None):
+        """Answer one request; returns (status, payload)."""
+        url = urlsplit(target)
+        route = self.routes.get((method, url.path))
+        start = time.perf_counter()
+        try:
+            if route is None:
+                if any(path == url.path for _, path in self.routes):
+                    raise ApiError(405, f"{method} not allowed on {url.path}")
+                raise ApiError(404, f"no route {url.path}")
+            status, payload = 200, await route(dict(parse_qsl(url.query)), body)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except ValueError as e:         # bad sort keys, unknown policies, ...
+            status, payload = 400, {"error": str(e)}
+        except Exception:
+            status, payload = 500, {"error": traceback.format_exc(limit=3).strip().splitlines()[-1]}
+        label = url.path if route is not None else "other"
+        REGISTRY.observe("fms_api_seconds", time.perf_counter() - start, route=label)
+        REGISTRY.inc("fms_api_requests_total", route=label, status=str(status))
+        return status, payload
+
+    # -----------------------------------------------------------
+    #                     SEARCH & FARES
+    # -----------------------------------------------------------
+    async def health(self, params, body):
+        return {"status": "ok", "flights": len(self.system.flights)}
+
+    async def search(self, params, body):
+        source, destination, date = _fields(params, "source", "destination", "date")
+        flight_class = _flight_class(params.get("class", "Economy"))
+        offset = max(0, _int(params, "offset", 0))
+        limit = min(max(1, _int(params, "limit", 50)), MAX_PAGE)
+        flights = self.system.ranked_search(source, destination, date, params.get("sort", "price"),
+                                            flight_class, offset, limit)
+        return {"flights": [_flight_json(f) for f in flights]}
+
+    async def fare(self, params, body):
+        flight_id, date = _fields(params, "flight_id", "date")
+        flight_class = _flight_class(params.get("class", "Economy"))
+        passengers = _int(params, "passengers", 1)
+        if passengers < 1:
+            raise ApiError(400, "passengers must be at least 1")
+        flight = self.system.get_flight(flight_id, date)
+        if flight is None:
+            raise ApiError(404, "flight not found")
+        breakdown = flight.get_price_by_class(flight_class, breakdown=True)
+        return {
+            "flight_id": flight.flight_id,
+            "date": flight.date,
+            "class": flight_class,
+            "available": flight.available(flight_class),
+            "passengers": passengers,
+            "breakdown": breakdown,
+            "total": round(breakdown["Total Fare"] * passengers, 2),
+        }
+
+    # -----------------------------------------------------------
+    #                     BOOKINGS
+    # -----------------------------------------------------------
+    async def find_bookings(self, params, body):
+        passenger_name, flight_id = _fields(params, "passenger_name", "flight_id")
+        bookings = await self.offload(self.system.find_bookings, passenger_name, flight_id, params.get("date"))
+        return {"bookings": bookings}
+
+    async def book(self, params, body):
+        flight_id, passenger_name, date, flight_class = _fields(body, "flight_id", "passenger_name", "date", "class")
+        _flight_class(flight_class)
+        if self.system.get_flight(flight_id, date) is None:
+            raise ApiError(404, "flight not found")
+        outcome = await self._batcher.book(flight_id, passenger_name, date, flight_class)
+        if outcome is None:
+            raise ApiError(404, "flight not found")
+        status, record = outcome
+        return {"status": status, "booking" if status == "booked" else "waitlist": record}
+
+    async def book_group(self, params, body):
+        flight_id, passengers, date, flight_class = _fields(body, "flight_id", "passengers", "date", "class")
+        _flight_class(flight_class)
+        if not isinstance(passengers, list) or not all(isinstance(name, str) and name for name in passengers):
+            raise ApiError(400, "passengers must be a list of names")
+        policy = body.get("policy", GROUP_ALL_OR_NOTHING)
+        if policy not in GROUP_POLICIES:
+            raise ApiError(400, f"policy must be one of {', '.join(GROUP_POLICIES)}")
+        if self.system.get_flight(flight_id, date) is None:
+            raise ApiError(404, "flight not found")
+        return await self.offload(self.system.book_group, flight_id, passengers, date, flight_class, policy)
+
+    async def cancel(self, params, body):
+        if isinstance(body, dict) and body.get("booking_id"):
+            booking_id = body["booking_id"]
+        else:
+            passenger_name, flight_id, date = _fields(body, "passenger_name", "flight_id", "date")
+            matches = await self.offload(self.system.find_bookings, passenger_name, flight_id, date)
+            if not matches:
+                raise ApiError(404, "no matching booking")
+            booking_id = matches[0]["booking_id"]
+        cancelled = await self.offload(self.system.release_booking, booking_id)
+        if cancelled is None:
+            raise ApiError(404, "no matching booking")
+        booking, promoted = cancelled
+        return {"cancelled": booking, "promoted": promoted}
+
+    # -----------------------------------------------------------
+    #                     TICKETS
+    # -----------------------------------------------------------
+    async def ticket(self, params, body):
+        booking_id, = _fields(params, "booking_id")
+        booking = await self.offload(self.system.get_booking, booking_id)
+        if booking is None:
+            raise ApiError(404, "no matching booking")
+        data = await asyncio.get_running_loop().run_in_executor(
+            self.pdf_executor, self.tickets.pooled_ticket_pdf, booking)
+        return Raw("application/pdf", data)
+
+    # -----------------------------------------------------------
+    #                     BATCHES & METRICS
+    # -----------------------------------------------------------
+    async def batch(self, params, body):
+        if not isinstance(body, list):
+            raise ApiError(400, "expected a JSON list of requests")
+        if len(body) > MAX_BATCH:
+            raise ApiError(413, f"at most {MAX_BATCH} requests per batch")
+        return await asyncio.gather(*(self._batch_item(item) for item in body))
+
+    async def _batch_item(self, item):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            return {"status": 400, "body": {"error": "expected {\"method\", \"path\", \"body\"}"}}
+        method = str(item.get("method", "GET")).upper()
+        if urlsplit(item["path"]).path in ("/batch", "/ticket", "/metrics"):
+            return {"status": 400, "body": {"error": f"{item['path']} cannot be batched"}}
+        status, payload = await self.dispatch(method, item["path"], item.get("body"))
+        return {"status": status, "body": payload}
+
+    async def metrics(self, params, body):
+        return Raw("text/plain; version=0.0.4; charset=utf-8", REGISTRY.prometheus_text().encode("utf-8"))
+
+
+# ===============================================================
+#                     HTTP/1.1 SERVER
+# ===============================================================
+
+def _response(status, payload, keep_alive):
+    if isinstance(payload, Raw):
+        content_type, data = payload
+    else:
+        content_type, data = "application/json", json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + data
+
+
+async def _read_request(reader):
+    """(method, target, version, headers, body bytes) of the next request, or None at EOF."""
+    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+    if not request_line.strip():
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ApiError(400, "malformed request line")
+    method, target, version = parts
+    try:
+        headers, body = await asyncio.wait_for(_read_headers_and_body(reader), REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ApiError(408, "request not received in time") from None
+    return method.upper(), target, version, headers, body
+
+
+async def _read_headers_and_body(reader):
+    headers = {}
+    size = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        size += len(line)
+        if len(headers) >= MAX_HEADERS or size > MAX_HEADER_BYTES:
+            raise ApiError(431, "request headers too large")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ApiError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise ApiError(400, "invalid Content-Length")
+    if length > MAX_BODY:
+        raise ApiError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return headers, body
+
+
+async def _connection(api, reader, writer):
+    """Serve one client connection until it closes, asks to, or idles out."""
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ApiError as e:
+                # Nothing more can be read reliably on this connection: answer, then close
+                writer.write(_response(e.status, {"error": str(e)}, False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, target, version, headers, raw = request
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                status, payload = 400, {"error": "body is not valid JSON"}
+            else:
+                status, payload = await api.dispatch(method, target, body)
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(api, host="127.0.0.1", port=8080):
+    """Start serving api over HTTP; returns the asyncio Server (port 0 picks a free one)."""
+    server = await asyncio.start_server(functools.partial(_connection, api), host, port)
+    api.start_reloading()
+    return server
+
+
+def serve_api(system, port, host="127.0.0.1", workers=8):
+    """Serve the API for system from a daemon thread with its own event loop.
+
+    Returns the BookingApi; its address attribute is the bound (host, port).
+    """
+    api = BookingApi(system, workers)
+    started = threading.Event()
+    failure = []
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(serve(api, host, port))
+            api.address = server.sockets[0].getsockname()[:2]
+        except BaseException as e:
+            failure.append(e)
+            return
+        finally:
+            started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="booking-api", daemon=True).start()
+    started.wait()
+    if failure:
+        raise failure[0]
+    return api
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--workers", type=int, default=8, help="threads for file-touching calls")
+    parser.add_argument("--tickets-dir", default="tickets", help="where rendered tickets are cached")
+    args = parser.parse_args()
+
+    async def run():
+        api = BookingApi(FlightSystem(args.data_dir, storage=args.storage), args.workers,
+                         tickets_dir=args.tickets_dir)
+        server = await serve(api, args.host, args.port)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Booking API on http://{host}:{port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            api.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
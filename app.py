@@ -1,9 +1,12 @@
 import streamlit as st
-from flight_system import FlightSystem
+from flight_system import GROUP_ALL_OR_NOTHING, GROUP_WAITLIST_ALL, GROUP_WAITLIST_REST, FlightSystem
 from ticket_generator import TicketGenerator
-import pandas as pd
+from ticket_queue import TicketJobQueue, TicketWorkers
+from connections import DEFAULT_BLOCK_MINUTES, MIN_CONNECTION_MINUTES
+from metrics import REGISTRY, serve_metrics
+from profiling import MODES as PROFILER_MODES, RunProfiler
 import os
-from datetime import date
+from datetime import date, timedelta
 import time
 
 # Predefined Indian cities (for suggestions)
@@ -15,6 +18,8 @@ BASE_CITIES = [
     "Raipur", "Bhopal"
 ]
 
+_rerun_start = time.perf_counter()
+
 # -------------------- PAGE SETUP --------------------
 st.set_page_config(
     page_title="Flight Management System",
@@ -22,19 +27,154 @@ st.set_page_config(
     layout="wide",
 )
 
+# Profile this whole run if the admin asked for it (Performance tab)
+_profiler = None
+if st.session_state.get("profile_next_run"):
+    try:
+        _profiler = RunProfiler(st.session_state.pop("profile_next_run")).start()
+    except ValueError:      # cProfile already active in another session's run
+        _profiler = None
+
 st.title("✈️ Flight Management System")
 st.markdown("### Efficiently manage flights, bookings, cancellations, and passengers")
 
 # -------------------- INITIALIZE SYSTEM --------------------
-system = FlightSystem()
-tg = TicketGenerator()
+@st.cache_resource
+def get_system():
+    """One FlightSystem per server process, shared by every session.
+
+    FMS_STORAGE=sqlite switches to data/flights.db (see migrate_storage.py).
+    """
+    return FlightSystem(storage=os.environ.get("FMS_STORAGE", "csv"))
+
+
+@st.cache_resource
+def get_ticket_generator():
+    return TicketGenerator()
+
+
+@st.cache_resource
+def get_fare_engine():
+    """Batch fare engine; imported on first search (NumPy is slow to import)."""
+    from fares import FareEngine
+    return FareEngine()
+
+
+@st.cache_resource
+def get_ticket_jobs():
+    """Durable ticket queue plus the background workers rendering it."""
+    queue = TicketJobQueue()
+    TicketWorkers(queue, get_ticket_generator()).start()
+    return queue
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Prometheus endpoint on FMS_METRICS_PORT, if set (one per server process)."""
+    port = os.environ.get("FMS_METRICS_PORT")
+    return serve_metrics(int(port)) if port else None
+
+
+@st.cache_resource
+def get_api_server():
+    """JSON booking API on FMS_API_PORT, if set, over this process's FlightSystem."""
+    port = os.environ.get("FMS_API_PORT")
+    if not port:
+        return None
+    from api_server import serve_api
+    return serve_api(get_system(), int(port))
+
+
+_load_start = time.perf_counter()
+get_metrics_server()
+system = get_system()
+get_api_server()
+# Another process (or a manual edit) may have changed the data files
+system.reload_if_changed()
+tg = get_ticket_generator()
+ticket_jobs = get_ticket_jobs()
+_load_time = time.perf_counter() - _load_start
 
 # Merge base cities with any cities present in flights.csv (dynamic)
-dynamic_cities = set(BASE_CITIES)
-for f in system.flights:
-    dynamic_cities.add(f.source)
-    dynamic_cities.add(f.destination)
-CITIES = sorted(dynamic_cities)
+CITIES = sorted(set(BASE_CITIES).union(system.cities()))
+
+# Group booking: what to do when a group doesn't fit (see FlightSystem.book_group).
+# The first option is the default; like a single booking, it waitlists.
+GROUP_POLICY_OPTIONS = {
+    "Book the seats left, waitlist the rest": GROUP_WAITLIST_REST,
+    "Waitlist the whole group": GROUP_WAITLIST_ALL,
+    "Book nobody": GROUP_ALL_OR_NOTHING,
+}
+
+# -------------------- TICKET DOWNLOADS --------------------
+TICKET_POLL_SECONDS = 1.0
+
+
+def show_ticket_jobs():
+    """Download buttons for this session's queued tickets, polled until all are finished."""
+    job_ids = st.session_state.get("ticket_jobs")
+    if not job_ids:
+        return
+    open_statuses = (TicketJobQueue.PENDING, TicketJobQueue.RUNNING)
+    waiting = any(job["status"] in open_statuses for job in ticket_jobs.statuses(job_ids))
+
+    @st.fragment(run_every=TICKET_POLL_SECONDS if waiting else None)
+    def ticket_panel():
+        jobs = ticket_jobs.statuses(job_ids)
+        done = [job for job in jobs if job["status"] == TicketJobQueue.DONE]
+        st.markdown(f"#### 🎫 Tickets ({len(done)}/{len(jobs)} ready)")
+        for job in jobs:
+            label = f"{job['passenger_name']} ({job['flight_id']}, {job['date']})"
+            if job["status"] == TicketJobQueue.DONE and os.path.exists(job["path"]):
+                with open(job["path"], "rb") as pdf_file:
+                    st.download_button(
+                        label=f"📥 Download Ticket {label}",
+                        data=pdf_file.read(),
+                        file_name=os.path.basename(job["path"]),
+                        mime="application/pdf",
+                        key=f"dl_job_{job['job_id']}"
+                    )
+            elif job["status"] == TicketJobQueue.FAILED:
+                st.error(f"❌ Ticket for {label} could not be generated: {job['error']}")
+            else:
+                retry = f" (retry {job['attempts']})" if job["attempts"] else ""
+                st.caption(f"⏳ Generating ticket for {label}...{retry}")
+        if waiting and not any(job["status"] in open_statuses for job in jobs):
+            st.rerun()      # everything finished: redraw once more without polling
+
+    ticket_panel()
+
+
+# -------------------- BOOKING ANALYTICS --------------------
+def _load_factor(row):
+    return f"{row['load_factor']:.0%}" if row["load_factor"] is not None else "–"
+
+
+def show_booking_report(report, key):
+    """Headline metrics and tables of a booking_dashboard() / booking_report() result."""
+    total = report["total"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Revenue (₹)", f"{total['revenue']:,.0f}")
+    col2.metric("Seats sold", f"{total['sold']:,}")
+    col3.metric("Load factor", _load_factor(total))
+    col4.metric("Cancellations", f"{total['cancelled']:,}")
+
+    st.markdown("**By class**")
+    st.dataframe([{
+        "Class": row["class"], "Seats sold": row["sold"], "Capacity": row["capacity"],
+        "Load factor": _load_factor(row), "Revenue (₹)": row["revenue"], "Cancellations": row["cancelled"],
+    } for row in report["classes"]], use_container_width=True, hide_index=True, key=f"{key}_classes")
+    st.markdown("**Top routes by revenue**")
+    st.dataframe([{
+        "Route": f"{row['source']} → {row['destination']}", "Seats sold": row["sold"],
+        "Load factor": _load_factor(row), "Revenue (₹)": row["revenue"], "Cancellations": row["cancelled"],
+    } for row in report["routes"]], use_container_width=True, hide_index=True, key=f"{key}_routes")
+    st.markdown("**Top flights by revenue**")
+    st.dataframe([{
+        "Flight": row["flight_id"], "Date": row["date"], "Class": row["class"], "Seats sold": row["sold"],
+        "Load factor": _load_factor(row), "Revenue (₹)": row["revenue"], "Cancellations": row["cancelled"],
+    } for row in report["flights"]], use_container_width=True, hide_index=True, key=f"{key}_flights")
+
 
 # -------------------- SIDEBAR NAVIGATION --------------------
 menu = st.sidebar.radio(
@@ -64,40 +204,54 @@ if menu == "👤 User Portal":
 
         col1, col2, col3 = st.columns(3)
         with col1:
-            # source dropdown (alphabetical)
+            # source dropdown (alphabetical): only cities flights leave from
             source = st.selectbox(
                 "Source",
-                options=[""] + CITIES,
+                options=[""] + system.origins(),
                 index=0,
                 key="src_input",
                 help="Start typing to filter cities alphabetically"
             )
         with col2:
-            # destination dropdown (alphabetical)
+            # destination dropdown (alphabetical): every city flown to, so
+            # routes without a direct flight can still find connections
             destination = st.selectbox(
                 "Destination",
-                options=[""] + CITIES,
+                options=[""] + system.destinations(),
                 index=0,
                 key="dest_input",
                 help="Start typing to filter cities alphabetically"
             )
+            if source:
+                direct = system.destinations(source)
+                st.caption(f"Direct flights from {source} to {len(direct)} cit{'y' if len(direct) == 1 else 'ies'}")
         with col3:
             date_search = st.date_input("Select Date", key="date_input_search", value=date.today())
 
+        sort_options = {
+            "Price (low to high)": "price",
+            "Price (high to low)": "-price",
+            "Departure time": "time",
+            "Most seats available": ("-seats", "price"),
+        }
+        sort_choice = st.selectbox("Sort results by", list(sort_options), key="sort_results")
+
         if st.button("🔎 Search Flights", key="search_btn"):
             if source and destination:
-                results = system.search_flights(source, destination, str(date_search))
+                results = system.ranked_search(source, destination, str(date_search), sort_by=sort_options[sort_choice])
                 if results:
                     st.success(f"Found {len(results)} flight(s)!")
-                    for f in results:
+                    # Every result priced in every class in one pass
+                    fares = get_fare_engine().price_table(results, ["Economy", "Business", "First Class"]).tolist()
+                    for f, (econ_fare, business_fare, first_fare) in zip(results, fares):
                         with st.container():
                             st.markdown(
                                 f"""
                                 **{f.flight_id}** | 🏙️ {f.source} ➡️ {f.destination}  
                                 🕒 {f.time} | 📅 {f.date}  
-                                💺 Economy: {f.available_seats['Economy']} (₹{f.get_price_by_class('Economy')})  
-                                💼 Business: {f.available_seats['Business']} (₹{f.get_price_by_class('Business')})  
-                                🏆 First Class: {f.available_seats['First Class']} (₹{f.get_price_by_class('First Class')})
+                                💺 Economy: {f.available_seats['Economy']} (₹{econ_fare})  
+                                💼 Business: {f.available_seats['Business']} (₹{business_fare})  
+                                🏆 First Class: {f.available_seats['First Class']} (₹{first_fare})
                                 """
                             )
                             # Book Now - redirect to booking
@@ -107,10 +261,48 @@ if menu == "👤 User Portal":
                                 st.session_state["redirect_to_book"] = True
                                 st.rerun()
                 else:
-                    st.warning("⚠️ No flights found for this route or date.")
+                    connections = system.search_connections(source, destination, str(date_search))
+                    if connections:
+                        cheapest = min(c["fare"] for c in connections)
+                        st.info(f"No direct flights. Found {len(connections)} connecting itinerary(ies).")
+                        for c in connections:
+                            route = " ➡️ ".join([c["legs"][0].source] + [leg.destination for leg in c["legs"]])
+                            legs = ", ".join(f"{leg.flight_id} ({leg.time})" for leg in c["legs"])
+                            hours, minutes = divmod(c["duration_minutes"], 60)
+                            tag = " 💸 Cheapest" if c["fare"] == cheapest else ""
+                            st.markdown(
+                                f"""
+                                🏙️ {route}{tag}  
+                                ✈️ {legs} | {c['stops']} stop(s)  
+                                🕒 {c['departure']} → {c['arrival']} (~{hours}h {minutes:02d}m) | 💺 Economy from ₹{c['fare']}
+                                """
+                            )
+                        st.caption(
+                            f"Arrival times assume {DEFAULT_BLOCK_MINUTES} min per leg and "
+                            f"at least {MIN_CONNECTION_MINUTES} min between flights."
+                        )
+                    else:
+                        st.warning("⚠️ No flights found for this route or date.")
             else:
                 st.warning("Please enter both Source and Destination.")
 
+        # Fare calendar: which dates of the next month still have seats on this route
+        if source and destination:
+            with st.expander("📅 Fare calendar (30 days from the selected date)"):
+                calendar_class = st.selectbox("Class", ["Economy", "Business", "First Class"], key="calendar_class")
+                calendar = system.fare_calendar(
+                    source, destination, str(date_search), str(date_search + timedelta(days=29)))
+                if calendar:
+                    st.dataframe([{
+                        "Date": day["date"],
+                        "Flights": day["flights"],
+                        "Seats left": day["seats_left"][calendar_class],
+                        "From (₹)": day["min_fare"][calendar_class],     # None when sold out
+                        "Departures": ", ".join(day["times"]),
+                    } for day in calendar], use_container_width=True, hide_index=True)
+                else:
+                    st.caption("No direct flights on this route in these 30 days.")
+
     # -------------------- BOOK TICKET --------------------
     elif user_section == "Book Ticket":
         st.subheader("🎫 Book a Flight Ticket")
@@ -120,7 +312,7 @@ if menu == "👤 User Portal":
         if "book_prefill" in st.session_state:
             prefill_id = st.session_state["book_prefill"].get("flight_id", "")
             try:
-                prefill_date = pd.to_datetime(st.session_state["book_prefill"].get("date", str(date.today()))).date()
+                prefill_date = date.fromisoformat(st.session_state["book_prefill"].get("date", str(date.today())))
             except Exception:
                 prefill_date = date.today()
 
@@ -129,6 +321,9 @@ if menu == "👤 User Portal":
         flight_id = st.text_input("Flight ID", value=prefill_id, key="book_flight_id_user")
         flight_date = st.date_input("Date", value=prefill_date, key="book_date_user")
         flight_class = st.selectbox("Select Class", ["Economy", "Business", "First Class"], key="book_class_user")
+        group_policy = next(iter(GROUP_POLICY_OPTIONS))
+        if num_passengers > 1:
+            group_policy = st.selectbox("If the group doesn't fit", list(GROUP_POLICY_OPTIONS), key="group_policy_user")
 
         col1, col2 = st.columns(2)
         with col1:
@@ -138,9 +333,10 @@ if menu == "👤 User Portal":
 
         if show_fare_btn:
             if flight_id.strip():
-                flight = next((f for f in system.flights if f.flight_id == flight_id and f.date == str(flight_date)), None)
+                flight = system.get_flight(flight_id, str(flight_date))
                 if flight:
-                    details = flight.get_price_by_class(flight_class, breakdown=True)
+                    fare_engine = get_fare_engine()
+                    details = fare_engine.breakdowns([flight], flight_class)[0]
                     total_fare = details["Total Fare"] * num_passengers
                     st.markdown(f"""
                     ### 💰 Fare Summary for **{flight_class}** ({flight.flight_id})
@@ -148,7 +344,7 @@ if menu == "👤 User Portal":
                     |------------|------------:|
                     | Base Fare | {details['Base Fare']} |
                     | Class Multiplier | ×{details['Class Multiplier']} |
-                    | Tax (18%) | {details['Tax (18%)']} |
+                    | {fare_engine.tax_label} | {details[fare_engine.tax_label]} |
                     | **Total Fare per Passenger** | **₹{details['Total Fare']}** |
                     | **Total ({num_passengers} Passenger(s))** | **₹{total_fare}** |
                     """)
@@ -170,30 +366,30 @@ if menu == "👤 User Portal":
             if "pending_booking" in st.session_state:
                 booking = st.session_state["pending_booking"]
 
-                for i in range(1, booking["num_passengers"] + 1):
-                    passenger_name = f"{booking['name']} #{i}" if booking["num_passengers"] > 1 else booking["name"]
-                    msg = system.book_ticket(booking["flight_id"], passenger_name, booking["date"], booking["class"])
-                    st.success(msg)
-
-                    ticket_path = tg.generate_ticket(
-                        passenger_name,
-                        booking["flight_id"],
-                        booking["date"],
-                        booking["class"],
-                        booking["fare"]
-                    )
-
-                    with open(ticket_path, "rb") as pdf_file:
-                        st.download_button(
-                            label=f"📥 Download Ticket ({passenger_name})",
-                            data=pdf_file,
-                            file_name=os.path.basename(ticket_path),
-                            mime="application/pdf",
-                            key=f"dl_user_{passenger_name}"
-                        )
+                if booking["num_passengers"] > 1:
+                    names = [f"{booking['name']} #{i}" for i in range(1, booking["num_passengers"] + 1)]
+                else:
+                    names = [booking["name"]]
+                # The whole group is booked (or not) in one batch; a single
+                # passenger is booked or waitlisted, as book_ticket() does
+                policy = GROUP_POLICY_OPTIONS[group_policy] if len(names) > 1 else GROUP_WAITLIST_REST
+                result = system.book_group(booking["flight_id"], names, booking["date"], booking["class"],
+                                           policy=policy)
+                confirmed = result["booked"]
+                for b in confirmed:
+                    st.success(f"✅ Booking confirmed for {b['passenger_name']} ({b['class']}) on {b['flight_id']}.")
+                for w in result["waitlisted"]:
+                    st.info(f"🕓 No seats available. {w['passenger_name']} added to waitlist for {w['flight_id']}.")
+                if not confirmed and not result["waitlisted"]:
+                    if system.get_flight(booking["flight_id"], booking["date"]) is None:
+                        st.error("❌ Flight not found for the given date.")
+                    else:
+                        st.error(f"❌ Not enough seats left for all {len(names)} passenger(s); nothing was booked.")
 
-                total_fare = booking["fare"] * booking["num_passengers"]
-                st.success(f"💵 Total Paid: ₹{total_fare}")
+                # Tickets render in the background; the panel below polls them
+                if confirmed:
+                    st.session_state["ticket_jobs"] = ticket_jobs.submit(confirmed)
+                    st.success(f"💵 Total Paid: ₹{booking['fare'] * len(confirmed)}")
                 for key in ["book_name_user", "book_class_user", "pending_booking", "book_prefill", "book_flight_id_user"]:
                     if key in st.session_state:
                         try:
@@ -203,6 +399,8 @@ if menu == "👤 User Portal":
             else:
                 st.warning("Please calculate fare first before confirming.")
 
+        show_ticket_jobs()
+
     # -------------------- CANCEL TICKET --------------------
     elif user_section == "Cancel Ticket":
         st.subheader("❌ Cancel a Ticket (User)")
@@ -225,7 +423,8 @@ if menu == "👤 User Portal":
 elif menu == "🛫 Admin Portal":
     st.header("🛫 Admin Portal")
 
-    tab1, tab2, tab3 = st.tabs(["➕ Add / Manage Flights", "📋 View All Flights", "📜 View Booked Tickets"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["➕ Add / Manage Flights", "📋 View All Flights",
+                                            "📜 View Booked Tickets", "📊 Analytics", "⚡ Performance"])
 
     # -------------------- ADD FLIGHTS --------------------
     with tab1:
@@ -257,10 +456,6 @@ elif menu == "🛫 Admin Portal":
                 }
                 system.add_flight(new_flight)
                 st.success(f"✅ Flight {fid} added successfully!")
-                # refresh city list
-                dynamic_cities.add(src)
-                dynamic_cities.add(dest)
-                CITIES[:] = sorted(dynamic_cities)
 
     # -------------------- VIEW FLIGHTS --------------------
     with tab2:
@@ -292,12 +487,34 @@ elif menu == "🛫 Admin Portal":
             else:
                 st.warning("Please select a flight to delete.")
 
+        # Add seats - waitlisted passengers are promoted into them right away
+        st.markdown("---")
+        st.subheader("Add Seats")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            seats_flight = st.selectbox(
+                "Flight",
+                options=[""] + [f"{f.flight_id} | {f.date}" for f in system.flights],
+                key="admin_seats_flight"
+            )
+        with col2:
+            seats_class = st.selectbox("Class", ["Economy", "Business", "First Class"], key="admin_seats_class")
+        with col3:
+            seats_extra = st.number_input("Extra Seats", min_value=1, step=1, key="admin_seats_extra")
+        if st.button("Add Seats", key="admin_seats_btn"):
+            if seats_flight:
+                seats_fid, seats_date = seats_flight.split(" | ")
+                promoted = system.add_seats(seats_fid, seats_date, seats_class, int(seats_extra))
+                st.success(f"✅ Added {int(seats_extra)} {seats_class} seat(s) to {seats_fid}. "
+                           f"{len(promoted)} waitlisted passenger(s) confirmed.")
+            else:
+                st.warning("Please select a flight.")
+
     # -------------------- VIEW BOOKINGS --------------------
     with tab3:
         st.subheader("📜 View Booked Tickets")
 
-        bookings = system.view_all_bookings()
-        if not bookings:
+        if system.count_bookings() == 0:
             st.info("No bookings found yet.")
         else:
             # Filters
@@ -313,19 +530,38 @@ elif menu == "🛫 Admin Portal":
             with col3:
                 filter_class = st.selectbox("Filter by Class", ["All", "Economy", "Business", "First Class"], key="admin_filter_class")
 
-            filtered = bookings
-            if filter_flight:
-                filtered = [b for b in filtered if b["flight_id"].lower() == filter_flight.lower()]
-            if filter_date:
-                filtered = [b for b in filtered if b["date"] == str(filter_date)]
-            if filter_class != "All":
-                filtered = [b for b in filtered if b["class"] == filter_class]
-
-            st.dataframe(filtered, use_container_width=True)
+            filters = (
+                filter_flight.strip() or None,
+                str(filter_date) if filter_date else None,
+                None if filter_class == "All" else filter_class,
+            )
+            page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=1, key="admin_page_size")
+
+            # Cursors of the pages seen so far; any filter change starts over
+            if st.session_state.get("admin_page_filters") != (filters, page_size):
+                st.session_state["admin_page_filters"] = (filters, page_size)
+                st.session_state["admin_page_cursors"] = [None]
+            cursors = st.session_state["admin_page_cursors"]
+
+            total = system.count_bookings(*filters)
+            page, next_cursor = system.query_bookings(*filters, after=cursors[-1], limit=page_size)
+            first_row = (len(cursors) - 1) * page_size
+            st.caption(f"Showing {first_row + 1 if page else 0}–{first_row + len(page)} of {total} booking(s)")
+            st.dataframe(page, use_container_width=True)
+
+            col_prev, col_next = st.columns(2)
+            with col_prev:
+                if st.button("⬅️ Previous page", key="admin_prev_page", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+            with col_next:
+                if st.button("Next page ➡️", key="admin_next_page", disabled=next_cursor is None):
+                    cursors.append(next_cursor)
+                    st.rerun()
 
             # Admin cancel option
             st.markdown("---")
-            valid_flights = sorted({b.get("flight_id", "") for b in bookings if isinstance(b, dict) and "flight_id" in b and b.get("flight_id")})
+            valid_flights = system.booked_flight_ids()
             cancel_fid = st.selectbox(
                 "Select Flight ID to Cancel Booking",
                     options=[""] + valid_flights,
@@ -334,12 +570,122 @@ elif menu == "🛫 Admin Portal":
             cancel_name = st.text_input("Enter Passenger Name to Cancel", key="admin_cancel_name")
             if st.button("Cancel Booking (Admin)", key="admin_cancel_btn"):
                 if cancel_fid and cancel_name:
-                    match = next((b for b in bookings if b["flight_id"] == cancel_fid and b["passenger_name"].lower() == cancel_name.lower()), None)
-                    if match:
-                        msg = system.cancel_ticket(cancel_name, cancel_fid, match["date"])
+                    matches = system.find_bookings(cancel_name, cancel_fid)
+                    if matches:
+                        msg = system.cancel_booking(matches[0]["booking_id"])
                         st.success(msg)
                         st.rerun()
                     else:
                         st.warning("No matching booking found.")
                 else:
                     st.warning("Please provide both Flight ID and Passenger Name.")
+
+        # Past flight dates go to compressed cold storage and leave the views above
+        st.markdown("---")
+        with st.expander("🗄️ Archived bookings"):
+            archive_before = st.date_input("Archive bookings for flights before", value=date.today(),
+                                           key="admin_archive_before")
+            if st.button("Archive", key="admin_archive_btn"):
+                moved = system.archive_bookings(str(archive_before))
+                st.success(f"✅ Archived {moved} booking(s) for flights before {archive_before}.")
+                st.rerun()
+
+            archived_dates = system.archived_booking_dates()
+            if archived_dates:
+                view_date = st.selectbox("Archived flight date", archived_dates, index=len(archived_dates) - 1,
+                                         key="admin_archive_date")
+                st.dataframe(system.archived_bookings(view_date), use_container_width=True)
+            else:
+                st.caption("No archived bookings yet.")
+
+    # -------------------- ANALYTICS --------------------
+    with tab4:
+        st.subheader("📊 Booking Analytics")
+        st.caption("All live bookings, from running totals kept up to date by every booking and cancellation.")
+        show_booking_report(system.booking_dashboard(), key="analytics_all")
+
+        # Ad-hoc range: recomputed from the bookings of those flight dates only
+        st.markdown("---")
+        st.markdown("**Report for a range of flight dates**")
+        report_range = st.date_input("Flight dates", value=(date.today(), date.today() + timedelta(days=30)),
+                                     key="analytics_range")
+        if len(report_range) == 2 and st.button("Compute report", key="analytics_range_btn"):
+            range_from, range_to = (str(d) for d in report_range)
+            show_booking_report(system.booking_report(range_from, range_to), key="analytics_range_report")
+
+    # -------------------- PERFORMANCE --------------------
+    with tab5:
+        st.subheader("⚡ Performance")
+        st.caption("Since this server process started. Latencies are over each method's last 2,048 calls.")
+
+        methods = REGISTRY.timers("fms_method_seconds")
+        if methods:
+            errors = {(e["component"], e["method"]): e["value"] for e in REGISTRY.counters("fms_method_errors_total")}
+            perf = sorted([{
+                "Component": m["component"],
+                "Method": m["method"],
+                "Calls": m["count"],
+                "Errors": errors.get((m["component"], m["method"]), 0),
+                "Total (ms)": round(m["total"] * 1000, 1),
+                "p50 (ms)": round(m["p50"] * 1000, 3),
+                "p95 (ms)": round(m["p95"] * 1000, 3),
+                "p99 (ms)": round(m["p99"] * 1000, 3),
+            } for m in methods], key=lambda row: row["Total (ms)"], reverse=True)
+            st.dataframe(perf, use_container_width=True, hide_index=True)
+        else:
+            st.info("No calls recorded yet.")
+
+        io_bytes = {(c["file"], c["op"]): c["value"] for c in REGISTRY.counters("fms_io_bytes_total")}
+        if io_bytes:
+            st.markdown("**File I/O**")
+            st.dataframe(sorted([{
+                "File": c["file"],
+                "Operation": c["op"],
+                "Calls": c["value"],
+                "KiB": round(io_bytes.get((c["file"], c["op"]), 0) / 1024, 1),
+            } for c in REGISTRY.counters("fms_io_ops_total")], key=lambda row: row["KiB"], reverse=True),
+                use_container_width=True, hide_index=True)
+
+        reruns = REGISTRY.timers("fms_rerun_seconds")
+        if reruns:
+            r = reruns[0]
+            st.caption(f"Page reruns: {r['count']} · p50 {r['p50'] * 1000:.1f} ms · "
+                       f"p95 {r['p95'] * 1000:.1f} ms · p99 {r['p99'] * 1000:.1f} ms")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button("⬇️ Prometheus metrics", REGISTRY.prometheus_text(),
+                               file_name="metrics.prom", mime="text/plain", key="perf_download_metrics")
+        with col2:
+            if st.button("💾 Write data/metrics.prom", key="perf_write_metrics"):
+                st.success(f"Written to {REGISTRY.write_prometheus(os.path.join('data', 'metrics.prom'))}")
+        with col3:
+            if st.button("🧹 Reset metrics", key="perf_reset_metrics"):
+                REGISTRY.reset()
+                st.rerun()
+
+        # Profiler: armed here, runs over the whole next rerun of this session
+        st.markdown("---")
+        st.markdown("**Profiler**")
+        col1, col2 = st.columns(2)
+        with col1:
+            profile_mode = st.selectbox("Mode", PROFILER_MODES, key="perf_profile_mode",
+                                        help="sampling: low overhead, folded stacks for flame graphs. "
+                                             "cprofile: exact call counts (.prof) plus caller/callee folded stacks.")
+        with col2:
+            if st.button("🔬 Profile next rerun", key="perf_profile_btn"):
+                st.session_state["profile_next_run"] = profile_mode
+                st.info("The next interaction will be profiled.")
+        for path in st.session_state.get("profile_files", []):
+            with open(path, "rb") as f:
+                st.download_button(f"⬇️ {os.path.basename(path)}", f.read(),
+                                   file_name=os.path.basename(path), key=f"perf_profile_{path}")
+
+# -------------------- RERUN TIMING --------------------
+_render_time = time.perf_counter() - _rerun_start - _load_time
+REGISTRY.observe("fms_rerun_seconds", time.perf_counter() - _rerun_start)
+if os.environ.get("FMS_METRICS_FILE"):
+    REGISTRY.write_prometheus(os.environ["FMS_METRICS_FILE"])
+if _profiler is not None:
+    st.session_state["profile_files"] = _profiler.stop()
+st.sidebar.caption(f"⏱️ Load: {_load_time * 1000:.1f} ms · Render: {_render_time * 1000:.1f} ms")
@@ -0,0 +1,95 @@
+"""
+Booking analytics benchmark.
+
+What the admin analytics tab pays per view at each --scales size: the
+hand-rolled way (every booking re-read and joined against the catalog
+in Python) vs FlightSystem.booking_dashboard() on running totals. Also
+a 7-day range report, joined in Python vs booking_report() (NumPy over
+that range's bookings), and what keeping the totals current adds to
+book_ticket.
+
+    python -m benchmarks.bench_analytics [--scales small medium] [--calls 20]
+"""
+import argparse
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.datagen import SCALES, START_DATE, generate
+from flight_system import SEAT_CLASSES, FlightSystem
+
+RANGE_DAYS = 7
+
+
+def per_call_ms(n, fn):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1000
+
+
+def joined_by_hand(system, date_from=None, date_to=None):
+    """Revenue / sold per route and class plus load factor, the way an admin
+    would compute them from view_all_bookings() and system.flights."""
+    flights = {(f.flight_id, f.date): f for f in system.flights}
+    by_route, by_class = {}, {}
+    for b in system.view_all_bookings():
+        if (date_from and b["date"] < date_from) or (date_to and b["date"] > date_to):
+            continue
+        f = flights.get((b["flight_id"], b["date"]))
+        route = (f.source, f.destination) if f else None
+        for totals in (by_route.setdefault(route, [0, 0.0]), by_class.setdefault(b["class"], [0, 0.0])):
+            totals[0] += 1
+            totals[1] += float(b["fare"])
+    capacity = {c: sum(f.seats[c] for f in flights.values()
+                       if (not date_from or f.date >= date_from) and (not date_to or f.date <= date_to))
+                for c in SEAT_CLASSES}
+    top = sorted(by_route.items(), key=lambda item: item[1][1], reverse=True)[:10]
+    return top, {c: by_class.get(c, [0, 0.0])[0] / capacity[c] if capacity[c] else None for c in SEAT_CLASSES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    range_from = str(START_DATE)
+    range_to = str(START_DATE + timedelta(days=RANGE_DAYS - 1))
+    print(f"{'scale':>8} {'bookings':>10} {'view':>18} {'by hand':>11} {'engine':>11} {'speedup':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+            counts = generate(tmp, **SCALES[scale])
+            system = FlightSystem(tmp)
+
+            start = time.perf_counter()
+            system.booking_dashboard()
+            build_ms = (time.perf_counter() - start) * 1000
+            system.booking_report(range_from, range_to)     # NumPy imported
+
+            cases = {
+                "dashboard": (lambda i: joined_by_hand(system),
+                              lambda i: system.booking_dashboard()),
+                f"{RANGE_DAYS}-day report": (lambda i: joined_by_hand(system, range_from, range_to),
+                                             lambda i: system.booking_report(range_from, range_to)),
+            }
+            for name, (slow_fn, fast_fn) in cases.items():
+                slow = per_call_ms(max(1, args.calls // 10), slow_fn)
+                fast = per_call_ms(args.calls, fast_fn)
+                print(f"{scale:>8} {counts['bookings']:>10,} {name:>18} {slow:>8.1f} ms {fast:>8.2f} ms "
+                      f"{slow / fast:>7.0f}x")
+            print(f"{'':>8} {'':>10} {'first dashboard':>18} {build_ms:>8.1f} ms (every date read, totals built)")
+
+            # Book on the first day's flights; the seats are at the load factor, so some waitlist
+            flights = [f for f in system.flights if f.date == range_from]
+            book = lambda i: system.book_ticket(flights[i % len(flights)].flight_id, f"B{i}", range_from, "Economy")
+            system._analytics = None
+            off = per_call_ms(args.calls * 5, book)
+            system.booking_dashboard()
+            on = per_call_ms(args.calls * 5, lambda i: book(i + args.calls * 5))
+            print(f"{'':>8} {'':>10} {'book_ticket':>18} {off:>8.2f} ms {on:>8.2f} ms (without / with totals)")
+            system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Booking ledger benchmark.
+
+What a fresh process pays to answer the admin view for one flight date
+(count + first page), and for a 7-day range, as the booking history
+grows: the date-partitioned ledger (only the queried dates' segments
+are read) vs parsing one bookings.csv holding the whole history, as the
+single-journal store did on every start. Then the same queries after
+archiving all but the last week, and the size of the cold archive.
+
+    python -m benchmarks.bench_booking_ledger [--per-day 2000] [--days 30 180 365]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking_store import BookingStore
+from journal import CsvJournal
+
+CLASSES = ["Economy", "Business", "First Class"]
+START = date(2025, 1, 1)
+
+
+def history(days, per_day, seed=11):
+    rng = random.Random(seed)
+    for d in range(days):
+        day = str(START + timedelta(days=d))
+        for i in range(per_day):
+            yield (f"BK{d:04d}{i:06d}", f"Passenger {rng.randrange(100_000)}", f"AI{100 + rng.randrange(300)}",
+                   day, rng.choice(CLASSES), "5000.0")
+
+
+def ms(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def day_view(data_dir, day):
+    store = BookingStore(data_dir)
+    return store.count(date=day), store.query(date=day, limit=50)[0]
+
+
+def week_view(data_dir, first, last):
+    store = BookingStore(data_dir)
+    return sum(store.count(date=str(first + timedelta(days=d))) for d in range((last - first).days + 1))
+
+
+def csv_view(path, header, day):
+    rows = CsvJournal(path, header).read()
+    return sum(1 for row in rows if row[3] == day)
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+               if os.path.isfile(os.path.join(path, name)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--per-day", type=int, default=2000)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 180, 365])
+    args = parser.parse_args()
+
+    print(f"{'history':>16} {'one date (csv)':>15} {'one date':>10} {'7 days':>10} "
+          f"{'archived: 7 days':>17} {'hot / cold size':>20}")
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = list(history(days, args.per_day))
+            csv_path = os.path.join(tmp, "old", BookingStore.FILENAME)
+            CsvJournal(csv_path, BookingStore.HEADER).append([[*row, BookingStore.BOOKED] for row in rows])
+            BookingStore(tmp).import_rows(rows)
+
+            last = START + timedelta(days=days - 1)
+            week_start = last - timedelta(days=6)
+            day = str(last)
+            old_count, t_csv = ms(lambda: csv_view(csv_path, BookingStore.HEADER, day), repeat=1)
+            (count, page), t_day = ms(lambda: day_view(tmp, day))
+            assert count == old_count == args.per_day and len(page) == 50
+            week, t_week = ms(lambda: week_view(tmp, week_start, last))
+            assert week == 7 * args.per_day
+
+            BookingStore(tmp).archive(str(week_start))
+            week, t_archived = ms(lambda: week_view(tmp, week_start, last))
+            assert week == 7 * args.per_day
+            store = BookingStore(tmp)
+            sizes = (f"{dir_size(store.ledger.directory) / 1e6:.1f} / "
+                     f"{dir_size(store.cold.directory) / 1e6:.1f} MB")
+            label = f"{days} d, {len(rows):,}"
+            print(f"{label:>16} {t_csv:>12.0f} ms {t_day:>7.1f} ms {t_week:>7.1f} ms "
+                  f"{t_archived:>14.1f} ms {sizes:>20}")
+
+
+if __name__ == "__main__":
+    main()
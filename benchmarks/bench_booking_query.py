@@ -0,0 +1,97 @@
+"""
+Admin bookings view benchmark.
+
+One render of the "View Booked Tickets" tab over N bookings: the old path
+(copy every booking, filter with list comprehensions, scan for distinct
+flight IDs) vs the indexed path (count + one page via BookingStore.query,
+cached distinct flight IDs), unfiltered and with flight / date / class
+filters. Also times walking a few pages further with the cursor.
+
+    python -m benchmarks.bench_booking_query [--bookings 1000000] [--page 50]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from booking_store import BookingStore
+
+CLASSES = ["Economy", "Business", "First Class"]
+
+
+def build_store(tmp, n, seed=13):
+    rng = random.Random(seed)
+    store = BookingStore(tmp)
+    store.import_rows(
+        (f"BK{i:012d}", f"Passenger {i}", f"AI{100 + rng.randrange(500)}",
+         f"2025-{1 + rng.randrange(12):02d}-{1 + rng.randrange(28):02d}",
+         rng.choice(CLASSES), "5000.0")
+        for i in range(n)
+    )
+    return store
+
+
+def old_render(store, flight_id, date, flight_class, page):
+    bookings = store.all()
+    filtered = bookings
+    if flight_id:
+        filtered = [b for b in filtered if b.get("flight_id", "").lower() == flight_id.lower()]
+    if date:
+        filtered = [b for b in filtered if b.get("date", "") == date]
+    if flight_class:
+        filtered = [b for b in filtered if b.get("class", "") == flight_class]
+    valid_flights = sorted({b.get("flight_id", "") for b in bookings if b.get("flight_id")})
+    return len(filtered), filtered[:page], valid_flights
+
+
+def new_render(store, flight_id, date, flight_class, page):
+    total = store.count(flight_id, date, flight_class)
+    rows, _ = store.query(flight_id, date, flight_class, limit=page)
+    return total, rows, store.distinct("flight_id")
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = build_store(tmp, args.bookings)
+        print(f"bookings: {args.bookings:,}  (imported in {time.perf_counter() - start:.1f} s)")
+
+        print(f"{'filters':>32} {'matches':>9} {'old':>11} {'indexed':>11} {'speed-up':>9}")
+        for filters in [
+            (None, None, None),
+            ("AI250", None, None),
+            (None, "2025-06-15", None),
+            ("ai250", None, "Business"),
+            ("AI250", "2025-06-15", "Business"),
+        ]:
+            old, t_old = timed(lambda: old_render(store, *filters, args.page), repeat=1)
+            new, t_new = timed(lambda: new_render(store, *filters, args.page))
+            assert old[0] == new[0] and old[1] == new[1] and old[2] == new[2]
+            label = " / ".join(v for v in filters if v) or "(none)"
+            print(f"{label:>32} {new[0]:>9,} {t_old * 1000:>8.1f} ms {t_new * 1000:>8.3f} ms {t_old / t_new:>8.0f}x")
+
+        def walk(pages):
+            cursor = None
+            for _ in range(pages):
+                _, cursor = store.query("AI250", limit=args.page, after=cursor)
+
+        _, t_walk = timed(lambda: walk(10))
+        print(f"10 consecutive pages (AI250): {t_walk * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Catalog index benchmark.
+
+Times FlightSystem.search_flights / get_flight against the old linear scan
+as the catalog grows from 1k to 1M flights.
+
+    python -m benchmarks.bench_catalog_index
+"""
+import random
+import tempfile
+import time
+
+from flight_system import Flight, FlightSystem
+
+CITIES = [
+    "Delhi", "Mumbai", "Hyderabad", "Chennai", "Bangalore", "Kolkata", "Pune", "Goa",
+    "Ahmedabad", "Chandigarh", "Lucknow", "Patna", "Indore", "Coimbatore", "Jaipur",
+]
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUERIES = 200
+
+
+def flight_fields(n, seed=42):
+    """Flight() arguments for n random flights."""
+    rng = random.Random(seed)
+    for i in range(n):
+        src, dest = rng.sample(CITIES, 2)
+        yield (
+            f"AI{i:07d}", src, dest, f"{rng.randrange(24):02d}:{rng.choice(['00', '30'])}",
+            rng.randrange(3000, 9000, 100), f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            40, 10, 4
+        )
+
+
+def build_system(n, data_dir, seed=42):
+    """Build an in-memory catalog of n flights (nothing is written to disk)."""
+    system = FlightSystem(data_dir=data_dir)
+    for fields in flight_fields(n, seed):
+        flight = Flight(*fields)
+        system.flights.append(flight)
+        system._index_flight(flight)
+    return system
+
+
+def linear_search(flights, source, destination, date):
+    """The pre-index search_flights implementation."""
+    return [
+        f for f in flights
+        if f.source.lower() == source.lower()
+        and f.destination.lower() == destination.lower()
+        and f.date == date
+    ]
+
+
+def timed(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def main():
+    print(f"{'flights':>10} {'search (idx)':>14} {'get_flight':>12} {'search (scan)':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            system = build_system(n, tmp)
+            rng = random.Random(n)
+            sample = [rng.choice(system.flights) for _ in range(QUERIES)]
+            searches = [(f.source.upper(), f.destination, f.date) for f in sample]
+            lookups = [(f.flight_id, f.date) for f in sample]
+
+            t_idx = timed(system.search_flights, searches)
+            t_get = timed(system.get_flight, lookups)
+            # The scan is O(N); keep the 1M run short.
+            scans = searches[:max(1, QUERIES * 1_000 // n)]
+            t_scan = timed(lambda s, d, dt: linear_search(system.flights, s, d, dt), scans)
+
+            print(f"{n:>10,} {t_idx * 1e6:>11.2f} µs {t_get * 1e6:>9.2f} µs {t_scan * 1e6:>12.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
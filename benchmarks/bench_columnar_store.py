@@ -0,0 +1,92 @@
+"""
+Columnar flight store benchmark.
+
+Memory and bulk-scan speed of 1M flights kept as Flight objects vs a
+ColumnarFlightStore. The scan is "all flights from X in a date range with
+at least N economy seats": a Python loop over the objects vs vectorized
+masks over the columns.
+
+    python -m benchmarks.bench_columnar_store [--flights 1000000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.bench_catalog_index import flight_fields
+from flight_store import ColumnarFlightStore
+from flight_system import Flight
+
+QUERIES = 20
+
+
+def measure(build):
+    """(result, bytes still allocated) of build()."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def book_some(flights, n, seed=7):
+    """Take a random number of economy seats on every flight."""
+    rng = random.Random(seed)
+    for i, taken in enumerate(rng.randrange(41) for _ in range(n)):
+        flights[i].available_seats["Economy"] -= taken
+
+
+def scan_objects(flights, source, date_from, date_to, min_seats):
+    source = source.lower()
+    return [
+        f for f in flights
+        if f.source.lower() == source and date_from <= f.date <= date_to
+        and f.available_seats["Economy"] >= min_seats
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.flights
+
+    objects, object_bytes = measure(lambda: [Flight(*f) for f in flight_fields(n)])
+
+    def build_store():
+        store = ColumnarFlightStore()
+        for fields in flight_fields(n):
+            store.add(*fields)
+        return store
+
+    store, store_bytes = measure(build_store)
+    book_some(objects, n)
+    book_some(store, n)
+
+    rng = random.Random(1)
+    queries = []
+    for _ in range(QUERIES):
+        month = rng.randint(1, 11)
+        queries.append((rng.choice(["Delhi", "Mumbai", "Goa"]), f"2025-{month:02d}-01",
+                        f"2025-{month + 1:02d}-01", rng.randint(5, 35)))
+
+    start = time.perf_counter()
+    expected = [len(scan_objects(objects, *q)) for q in queries]
+    object_scan = (time.perf_counter() - start) / QUERIES
+
+    start = time.perf_counter()
+    got = [len(store.rows(source=s, date_from=lo, date_to=hi, min_seats=m)) for s, lo, hi, m in queries]
+    store_scan = (time.perf_counter() - start) / QUERIES
+    assert got == expected, "columnar scan disagrees with the object scan"
+
+    print(f"flights: {n:,}")
+    print(f"{'':>18} {'objects':>12} {'columnar':>12} {'ratio':>8}")
+    print(f"{'memory (MB)':>18} {object_bytes / 1e6:>12,.1f} {store_bytes / 1e6:>12,.1f} "
+          f"{object_bytes / store_bytes:>7.1f}x")
+    print(f"{'bytes / flight':>18} {object_bytes / n:>12,.0f} {store_bytes / n:>12,.0f}")
+    print(f"{'scan (ms)':>18} {object_scan * 1000:>12.1f} {store_scan * 1000:>12.1f} "
+          f"{object_scan / store_scan:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
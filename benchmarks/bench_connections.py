@@ -0,0 +1,68 @@
+"""
+Connection search benchmark.
+
+Builds the route graph for a 100k-flight schedule, then times
+FlightSystem.search_connections (up to two stops) for random city pairs
+and dates, plus incremental add_flight / delete_flight updates of the
+graph. Target: every search under 50 ms.
+
+    python -m benchmarks.bench_connections [--flights 100000] [--queries 500]
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_catalog_index import CITIES, build_system
+
+TARGET_MS = 50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        system = build_system(args.flights, tmp)
+
+        start = time.perf_counter()
+        system.search_connections(CITIES[0], CITIES[1], "2025-06-01")
+        build = time.perf_counter() - start
+
+        latencies, found = [], 0
+        for _ in range(args.queries):
+            src, dest = rng.sample(CITIES, 2)
+            day = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            start = time.perf_counter()
+            found += bool(system.search_connections(src, dest, day))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        # Incremental graph updates: the index steps of add_flight /
+        # delete_flight, without their flights.csv rewrite
+        start = time.perf_counter()
+        for i in range(100):
+            system._index_flight(
+                system._new_flight(f"ZZ{i}", CITIES[0], CITIES[1], "10:00", 5000, "2025-06-01", 40, 10, 4))
+        add = (time.perf_counter() - start) / 100
+        start = time.perf_counter()
+        for i in range(100):
+            system._unindex_flight(system.get_flight(f"ZZ{i}", "2025-06-01"))
+        remove = (time.perf_counter() - start) / 100
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"flights: {args.flights:,}  queries: {args.queries}  with itineraries: {found}")
+    print(f"graph build        {build * 1000:8.1f} ms")
+    print(f"search p50         {statistics.median(latencies):8.2f} ms")
+    print(f"search p95         {p95:8.2f} ms")
+    print(f"search max         {latencies[-1]:8.2f} ms   (target < {TARGET_MS} ms: "
+          f"{'ok' if latencies[-1] < TARGET_MS else 'MISSED'})")
+    print(f"graph add / remove {add * 1e6:8.1f} / {remove * 1e6:.1f} µs per flight")
+
+
+if __name__ == "__main__":
+    main()
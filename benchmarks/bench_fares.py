@@ -0,0 +1,59 @@
+"""
+Fare engine benchmark.
+
+Prices every flight in every class with Flight.get_price_by_class (one
+call each, as the search page does) and with one FareEngine pass, checks
+that the results are identical (prices and breakdowns), and reports the
+speedup.
+
+    python -m benchmarks.bench_fares [--flights 100000]
+"""
+import argparse
+import random
+import time
+
+from fares import FareEngine
+from flight_system import Flight
+
+CLASSES = ["Economy", "Business", "First Class"]
+
+
+def make_flights(n, seed=3):
+    """Flights with awkward base fares, so rounding ties actually occur."""
+    rng = random.Random(seed)
+    fares = [rng.randrange(100_000, 1_500_000) / 100 for _ in range(n)]
+    fares[:4] = [1234.565, 0.125, 4100.005, 99.995]
+    return [Flight(f"AI{i}", "A", "B", "10:00", fare, "2025-01-01", 40, 10, 4)
+            for i, fare in enumerate(fares)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=100_000)
+    args = parser.parse_args()
+
+    flights = make_flights(args.flights)
+    engine = FareEngine()
+
+    start = time.perf_counter()
+    expected = [[f.get_price_by_class(c) for c in CLASSES] for f in flights]
+    per_call = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = engine.price_table(flights, CLASSES)
+    batch = time.perf_counter() - start
+
+    assert table.tolist() == expected, "price_table differs from get_price_by_class"
+    for c in CLASSES + ["Unknown"]:
+        assert engine.breakdowns(flights, c) == [f.get_price_by_class(c, breakdown=True) for f in flights], \
+            f"breakdowns differ for {c}"
+
+    priced = len(flights) * len(CLASSES)
+    print(f"flights: {len(flights):,} x {len(CLASSES)} classes (results identical)")
+    print(f"{'get_price_by_class':>20} {per_call * 1000:>10.1f} ms {priced / per_call:>14,.0f} fares/s")
+    print(f"{'FareEngine':>20} {batch * 1000:>10.1f} ms {priced / batch:>14,.0f} fares/s")
+    print(f"{'speedup':>20} {per_call / batch:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
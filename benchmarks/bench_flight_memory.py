@@ -0,0 +1,113 @@
+"""
+Flight memory benchmark.
+
+Bytes per Flight, measured with tracemalloc, for a catalog of N flights
+parsed from CSV text (so every field starts as a fresh string, as in
+load_flights): the previous layout (per-instance __dict__, seats and
+available_seats dicts, a deque per flight) vs the current one (__slots__,
+one seat array, interned strings, lazy waitlist). Also times
+construction and a seat lookup, via the available_seats mapping and via
+Flight.available(), which hot paths use.
+
+    python -m benchmarks.bench_flight_memory [--flights 1000000]
+"""
+import argparse
+import csv
+import gc
+import io
+import time
+import tracemalloc
+from collections import deque
+
+from benchmarks.datagen import schedule
+from flight_system import Flight
+
+CHUNK = 10_000
+TIMED = 100_000
+
+
+class LegacyFlight:
+    """Flight as it was before the compact layout."""
+
+    def __init__(self, flight_id, source, destination, time, base_price, date,
+                 econ_seats, business_seats, first_class_seats):
+        self.flight_id = flight_id
+        self.source = source
+        self.destination = destination
+        self.time = time
+        self.base_price = float(base_price)
+        self.date = date
+        self.seats = {
+            "Economy": int(econ_seats),
+            "Business": int(business_seats),
+            "First Class": int(first_class_seats)
+        }
+        self.available_seats = self.seats.copy()
+        self.waitlist = deque()
+
+
+def csv_rows(n):
+    """n flight rows as csv.reader would hand them to load_flights, CHUNK at a time."""
+    days = -(-n // 1000)
+    rows = schedule(cities=60, flights_per_day=1000, days=days, seed=7)[:n]
+    for start in range(0, n, CHUNK):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows[start:start + CHUNK])
+        buf.seek(0)
+        yield from csv.reader(buf)
+
+
+def measure(cls, n):
+    """(bytes/flight, construction us/flight, mapping lookup ns, available() ns) for n flights of cls.
+
+    Memory is traced over the whole catalog; the timings (best of 3) are
+    taken separately on up to TIMED flights with tracing off.
+    """
+    rows = csv_rows(n)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    flights = [cls(*row) for row in rows]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del flights
+
+    rows = list(csv_rows(min(n, TIMED)))
+    build = lookup = fast = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        flights = [cls(*row) for row in rows]
+        build = min(build, time.perf_counter() - start)
+        start = time.perf_counter()
+        for f in flights:
+            f.available_seats.get("Economy", 0)
+        lookup = min(lookup, time.perf_counter() - start)
+        if hasattr(cls, "available"):
+            start = time.perf_counter()
+            for f in flights:
+                f.available("Economy")
+            fast = min(fast, time.perf_counter() - start)
+    per = 1e9 / len(rows)
+    return used / n, build * per / 1000, lookup * per, fast * per if fast != float("inf") else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{args.flights:,} flights")
+    print(f"{'layout':>10} {'bytes/flight':>13} {'total MB':>9} {'build us':>9} "
+          f"{'seats.get()':>12} {'available()':>12}")
+    results = {}
+    for name, cls in (("legacy", LegacyFlight), ("compact", Flight)):
+        per_flight, build_us, lookup_ns, fast_ns = results[name] = measure(cls, args.flights)
+        fast = f"{fast_ns:>9.0f} ns" if fast_ns is not None else f"{'-':>12}"
+        print(f"{name:>10} {per_flight:>13,.0f} {per_flight * args.flights / 1e6:>9,.0f} "
+              f"{build_us:>9.2f} {lookup_ns:>9.0f} ns {fast}")
+    print(f"\n{results['legacy'][0] / results['compact'][0]:.1f}x less memory per flight")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Group booking benchmark.
+
+Books groups of 1 to 500 passengers onto one flight: one book_ticket call
+per passenger (a lock, a seat record and a booking append each) vs a
+single book_group call (one lock, one seat record, one append). A last
+group that does not fit shows each book_group policy.
+
+    python -m benchmarks.bench_group_booking [--groups 1 10 50 100 500] [--storage csv|sqlite]
+"""
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+
+from flight_system import GROUP_POLICIES, FlightSystem
+from migrate_storage import migrate
+
+GROUPS = [1, 10, 50, 100, 250, 500]
+FLIGHT = ("GB100", "2025-12-01", "Economy")
+ROUNDS = 5
+_groups = itertools.count()
+
+
+def make_data_dir(path, seats, storage):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        writer.writerow([FLIGHT[0], "Delhi", "Mumbai", "10:00", 5000, FLIGHT[1], seats, 0, 0])
+    if storage == "sqlite":
+        migrate(path)
+
+
+def names(size):
+    group = next(_groups)
+    return [f"G{group} #{i}" for i in range(size)]
+
+
+def loop_booking(system, size):
+    return sum(
+        system.book_ticket(FLIGHT[0], name, FLIGHT[1], FLIGHT[2]).startswith("✅")
+        for name in names(size)
+    )
+
+
+def group_booking(system, size):
+    return len(system.book_group(FLIGHT[0], names(size), FLIGHT[1], FLIGHT[2])["booked"])
+
+
+def best_ms(fn, size):
+    """Fastest of ROUNDS runs, checking every passenger got a seat."""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        booked = fn(size)
+        best = min(best, time.perf_counter() - start)
+        assert booked == size
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, nargs="+", default=GROUPS)
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_data_dir(tmp, 2 * ROUNDS * sum(args.groups), args.storage)
+        system = FlightSystem(tmp, storage=args.storage)
+
+        print(f"storage: {args.storage}")
+        print(f"{'passengers':>10} {'book_ticket loop':>17} {'book_group':>12} {'speed-up':>9}")
+        for size in args.groups:
+            loop = best_ms(lambda n: loop_booking(system, n), size)
+            group = best_ms(lambda n: group_booking(system, n), size)
+            print(f"{size:>10} {loop:>14.2f} ms {group:>9.2f} ms {loop / group:>8.1f}x")
+
+        system.storage.close()
+
+        # A group of 10 for a flight with 5 seats, under each policy
+        print("\n10 passengers, 5 seats:")
+        for policy in GROUP_POLICIES:
+            data_dir = os.path.join(tmp, policy)
+            os.makedirs(data_dir)
+            make_data_dir(data_dir, 5, args.storage)
+            system = FlightSystem(data_dir, storage=args.storage)
+            result = system.book_group(FLIGHT[0], names(10), FLIGHT[1], FLIGHT[2], policy=policy)
+            print(f"  {policy:<15} booked {len(result['booked']):>2}, waitlisted {len(result['waitlisted']):>2}")
+            system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
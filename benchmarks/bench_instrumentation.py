@@ -0,0 +1,74 @@
+"""
+Instrumentation overhead benchmark.
+
+Cost of the metrics layer on hot FlightSystem calls: the same get_flight,
+search_flights and book_ticket loops with the registry recording
+(default) and switched off (FMS_METRICS=0), plus the cost of one
+Prometheus export of everything recorded.
+
+    python -m benchmarks.bench_instrumentation [--calls 20000]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from flight_system import FlightSystem
+from metrics import REGISTRY
+
+DATE = "2025-12-01"
+FLIGHTS = 500
+
+
+def make_data_dir(path):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        for i in range(FLIGHTS):
+            writer.writerow([f"IN{i:03d}", "Delhi", f"City{i % 20}", "10:00", 5000, DATE, 100_000, 0, 0])
+
+
+def per_call_us(n, fn):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+    n = args.calls
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_data_dir(tmp)
+        system = FlightSystem(tmp)
+        calls = {
+            "get_flight": lambda i: system.get_flight(f"IN{i % FLIGHTS:03d}", DATE),
+            "search_flights": lambda i: system.search_flights("Delhi", f"City{i % 20}", DATE),
+            "book_ticket": lambda i: system.book_ticket(f"IN{i % FLIGHTS:03d}", f"P{i}", DATE, "Economy"),
+        }
+
+        print(f"{'call':>16} {'metrics off':>12} {'metrics on':>12} {'overhead':>10}")
+        for name, fn in calls.items():
+            # Bookings stay under the journals' compaction threshold (1,000 rows)
+            count = n if name != "book_ticket" else min(n // 10, 400)
+            REGISTRY.enabled = False
+            off = per_call_us(count, fn)
+            REGISTRY.enabled = True
+            on = per_call_us(count, fn)
+            print(f"{name:>16} {off:>9.2f} us {on:>9.2f} us {on - off:>7.2f} us")
+
+        start = time.perf_counter()
+        text = REGISTRY.prometheus_text()
+        export_ms = (time.perf_counter() - start) * 1000
+        print(f"\nPrometheus export: {len(text.splitlines())} lines in {export_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Ranking benchmark.
+
+Sorting N search results by fare: the original recursive merge sort from
+utils.py, sorted(), ranking.rank (multi-key), ranking.top_k for the
+cheapest 10, and a page served from the pre-sorted per-route index.
+
+    python -m benchmarks.bench_ranking [--results 100000]
+"""
+import argparse
+import random
+import time
+
+from flight_system import Flight
+from ranking import RouteRanking, rank, top_k
+
+ROUTE = ("delhi", "mumbai", "2025-06-01")
+
+
+def old_merge_sort(flights, key):
+    """utils.merge_sort_flights as it was (slicing, recursive, unstable)."""
+    if len(flights) <= 1:
+        return flights
+    mid = len(flights) // 2
+    left = old_merge_sort(flights[:mid], key)
+    right = old_merge_sort(flights[mid:], key)
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if key(left[i]) < key(right[j]):
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--results", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    flights = [
+        Flight(f"AI{i}", "Delhi", "Mumbai", f"{rng.randrange(24):02d}:{rng.choice(['00', '30'])}",
+               rng.randrange(3000, 9000, 100), "2025-06-01", rng.randrange(41), 10, 4)
+        for i in range(args.results)
+    ]
+    ranking = RouteRanking()
+    for f in flights:
+        ranking.add(ROUTE, f)
+
+    fare = lambda f: f.get_price_by_class("Economy")
+    old, t_old = timed(lambda: old_merge_sort(flights, fare), repeat=1)
+    builtin, t_sorted = timed(lambda: sorted(flights, key=fare))
+    multi, t_rank = timed(lambda: rank(flights, ("price", "time", "-seats")))
+    top, t_top = timed(lambda: top_k(flights, 10, ("price", "time", "-seats")))
+    page, t_page = timed(lambda: ranking.page(ROUTE, "price", 0, 10))
+
+    assert [fare(f) for f in old] == [fare(f) for f in builtin]
+    assert top == multi[:10]
+    assert [f.base_price for f in page] == [f.base_price for f in builtin[:10]]
+
+    print(f"results: {args.results:,}")
+    for label, t in [
+        ("old merge_sort_flights", t_old),
+        ("sorted()", t_sorted),
+        ("rank (3 keys)", t_rank),
+        ("top_k 10 (3 keys)", t_top),
+        ("pre-sorted page of 10", t_page),
+    ]:
+        print(f"{label:>24} {t * 1000:>10.3f} ms {t_old / t:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Route summary benchmark.
+
+What the search page pays for its route-level views on a generated
+catalog: a 30-day fare calendar for one route (date-by-date
+search_flights plus pricing, vs FlightSystem.fare_calendar), the city
+picker lists (walking the catalog, vs origins() / destinations()), and
+what keeping the summaries current adds to book_ticket.
+
+    python -m benchmarks.bench_route_summary [--scale medium] [--calls 200]
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.datagen import SCALES, START_DATE, generate, schedule
+from flight_system import SEAT_CLASSES, FlightSystem
+
+CALENDAR_DAYS = 30
+
+
+def per_call_us(n, fn):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def scan_calendar(system, source, destination, first_day):
+    """The fare calendar as the search page would build it without summaries."""
+    days = []
+    for offset in range(CALENDAR_DAYS):
+        day = str(first_day + timedelta(days=offset))
+        flights = system.search_flights(source, destination, day)
+        if not flights:
+            continue
+        seats_left, min_fare = {}, {}
+        for flight_class in SEAT_CLASSES:
+            fares = [f.get_price_by_class(flight_class) for f in flights if f.available(flight_class) > 0]
+            seats_left[flight_class] = sum(f.available(flight_class) for f in flights)
+            min_fare[flight_class] = min(fares, default=None)
+        days.append((day, seats_left, min_fare, sorted(f.time for f in flights)))
+    return days
+
+
+def scan_pickers(system, source):
+    origins = sorted({f.source for f in system.flights})
+    destinations = sorted({f.destination for f in system.flights if f.source == source})
+    return origins, destinations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="medium")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    params = SCALES[args.scale]
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        generate(tmp, **params)
+        system = FlightSystem(tmp)
+        rng = random.Random(7)
+        flights = schedule(params["cities"], params["flights_per_day"], 1)
+        routes = [(fields[1], fields[2]) for fields in rng.choices(flights, k=args.calls)]
+        first = date.fromisoformat(str(START_DATE))
+        print(f"{len(system.flights):,} flights ({args.scale}), {args.calls} calls each")
+
+        start = time.perf_counter()
+        system.origins()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"\n{'view':>24} {'scan':>12} {'summaries':>12} {'speedup':>8}")
+        cases = {
+            f"{CALENDAR_DAYS}-day fare calendar": (
+                lambda i: scan_calendar(system, *routes[i], first),
+                lambda i: system.fare_calendar(*routes[i], str(first),
+                                               str(first + timedelta(days=CALENDAR_DAYS - 1)))),
+            "city pickers": (
+                lambda i: scan_pickers(system, routes[i][0]),
+                lambda i: (system.origins(), system.destinations(routes[i][0]))),
+        }
+        for name, (scan, cached) in cases.items():
+            for i in range(args.calls):     # warm up: every route's summaries built once
+                cached(i)
+            slow = per_call_us(args.calls, scan)
+            fast = per_call_us(args.calls, cached)
+            print(f"{name:>24} {slow:>9,.1f} us {fast:>9,.1f} us {slow / fast:>7.0f}x")
+        print(f"\nsummaries built in {build_ms:.1f} ms on first use")
+
+        # Bookings stay under the journals' compaction threshold (1,000 rows)
+        bookings = min(args.calls, 400)
+        book = lambda i: system.book_ticket(flights[i % len(flights)][0], f"B{i}", str(first), "Economy")
+        book(-1)
+        system._summaries = None
+        off = per_call_us(bookings // 2, book)
+        system.origins()
+        on = per_call_us(bookings // 2, lambda i: book(i + bookings))
+        print(f"book_ticket: {off:,.1f} us without summaries, {on:,.1f} us keeping them current")
+        system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Schedule import benchmark.
+
+Loads a generated season schedule of N flights: the old way (add_flight
+per row, which rewrites flights.csv every time, so only --baseline rows)
+vs schedule_io.import_schedule streaming the file in chunks and saving
+once, then streams the catalog back out. Reports rows/s and peak RSS.
+
+    python -m benchmarks.bench_schedule_import [--flights 200000] [--baseline 2000]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from benchmarks.bench_catalog_index import flight_fields
+from flight_system import FlightSystem
+from schedule_io import export_flights, import_schedule, peak_rss_mb
+from storage import FLIGHT_HEADER
+
+
+def write_schedule(path, n):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FLIGHT_HEADER)
+        writer.writerows(flight_fields(n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flights", type=int, default=200_000)
+    parser.add_argument("--baseline", type=int, default=2_000)
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        schedule = os.path.join(tmp, "schedule.csv")
+        write_schedule(schedule, args.flights)
+
+        old_dir = os.path.join(tmp, "old")
+        system = FlightSystem(old_dir, storage=args.storage)
+        start = time.perf_counter()
+        for fields in flight_fields(args.baseline):
+            system.add_flight(dict(zip(FLIGHT_HEADER, fields)))
+        old_rate = args.baseline / (time.perf_counter() - start)
+        old_rss = peak_rss_mb()
+        system.storage.close()
+
+        new_dir = os.path.join(tmp, "new")
+        system = FlightSystem(new_dir, storage=args.storage)
+        result = import_schedule(system, schedule, rejects_path=os.path.join(tmp, "rejects.csv"))
+        exported = export_flights(system, os.path.join(tmp, "export.jsonl"))
+        assert result["imported"] == len(FlightSystem(new_dir, storage=args.storage).flights) == args.flights
+
+    print(f"storage: {args.storage}")
+    print(f"{'':>28} {'rows':>9} {'rows/s':>10} {'peak RSS':>10}")
+    print(f"{'add_flight per row':>28} {args.baseline:>9,} {old_rate:>10,.0f} {old_rss:>7,.0f} MB")
+    print(f"{'import_schedule (streamed)':>28} {result['rows']:>9,} {result['rows_per_s']:>10,.0f} "
+          f"{result['peak_rss_mb']:>7,.0f} MB")
+    print(f"{'export_flights (jsonl)':>28} {exported['rows']:>9,} {exported['rows_per_s']:>10,.0f} "
+          f"{exported['peak_rss_mb']:>7,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Seat inventory benchmark.
+
+Bookings per second against catalog size: the old path (full flights.csv
+rewrite after every booking) vs the seat journal (one small append).
+
+    python -m benchmarks.bench_seat_inventory
+"""
+import tempfile
+import time
+
+from benchmarks.bench_catalog_index import build_system
+
+SIZES = [1_000, 10_000, 100_000]
+BOOKINGS = 200
+
+
+def run(system, save_catalog):
+    flights = system.flights
+    start = time.perf_counter()
+    for i in range(BOOKINGS):
+        flight = flights[(i * 7919) % len(flights)]
+        system.book_ticket(flight.flight_id, f"Passenger {i}", flight.date, "Economy")
+        if save_catalog:
+            system.save_flights()
+    return BOOKINGS / (time.perf_counter() - start)
+
+
+def main():
+    print(f"{'flights':>10} {'old (rewrite)':>16} {'journal':>14} {'speedup':>9}")
+    for n in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            system = build_system(n, tmp)
+            system.save_flights()
+            old = run(system, save_catalog=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            system = build_system(n, tmp)
+            system.save_flights()
+            new = run(system, save_catalog=False)
+        print(f"{n:>10,} {old:>11,.0f} /s {new:>9,.0f} /s {new / old:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
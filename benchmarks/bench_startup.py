@@ -0,0 +1,107 @@
+"""
+Startup benchmark.
+
+Time from a fresh interpreter to the first search result on a generated
+data set, each run in its own process: importing the app's modules,
+constructing FlightSystem (of which loading the catalog) and the first
+search with fares. Three cases: the old startup (fpdf, qrcode, pandas and
+NumPy imported up front, catalog parsed from flights.csv), a first start
+(lazy imports, no snapshot yet: flights.csv is parsed and a snapshot
+written) and a restart (catalog loaded from the snapshot). Streamlit's
+own import time is the same in every case and not included.
+
+    python -m benchmarks.bench_startup [--scale large] [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import SCALES, generate, schedule
+from storage import CsvStorage
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import connections, flight_system, metrics, profiling, storage, ticket_generator, ticket_queue
+if sys.argv[2] == "old":
+    import fpdf, numpy, pandas, qrcode
+    storage.read_snapshot = lambda path, signature: None
+    storage.write_snapshot = lambda path, rows, signature: False
+imported = time.perf_counter()
+
+catalog = [0.0]
+load_catalog = storage.CsvStorage.load_catalog
+def timed_load_catalog(self):
+    t = time.perf_counter()
+    try:
+        return load_catalog(self)
+    finally:
+        catalog[0] += time.perf_counter() - t
+storage.CsvStorage.load_catalog = timed_load_catalog
+
+system = flight_system.FlightSystem(sys.argv[1])
+loaded = time.perf_counter()
+from fares import FareEngine
+results = system.ranked_search(sys.argv[3], sys.argv[4], sys.argv[5])
+FareEngine().price_table(results, list(flight_system.SEAT_CLASSES))
+searched = time.perf_counter()
+print(json.dumps({"imports": imported - start, "system": loaded - imported, "catalog": catalog[0],
+                  "search": searched - loaded, "total": searched - start,
+                  "heavy": sorted(m for m in ("fpdf", "qrcode", "pandas", "numpy") if m in sys.modules)}))
+"""
+
+
+def run_child(data_dir, mode, route):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD, data_dir, mode, *route],
+                         capture_output=True, text=True, check=True, cwd=os.getcwd()).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def best(runs):
+    """Per-field minimum over runs (the least disturbed timing of each)."""
+    return {key: min(r[key] for r in runs) if key != "heavy" else runs[0][key] for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="large")
+    parser.add_argument("--load-factor", type=float, default=0.05,
+                        help="bookings per seat in the data set (kept low: this measures the catalog)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    params = dict(SCALES[args.scale], load_factor=args.load_factor)
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        counts = generate(tmp, **params)
+        first = schedule(params["cities"], params["flights_per_day"], 1)[0]
+        route = (first[1], first[2], first[5])
+        snapshot = os.path.join(tmp, CsvStorage.SNAPSHOT_FILENAME)
+        print(f"{counts['flights']:,} flights, {counts['bookings']:,} bookings ({args.scale}), "
+              f"best of {args.runs} runs")
+
+        cases = {}
+        cases["old startup"] = best([run_child(tmp, "old", route) for _ in range(args.runs)])
+        runs = []
+        for _ in range(args.runs):
+            if os.path.exists(snapshot):
+                os.remove(snapshot)
+            runs.append(run_child(tmp, "new", route))
+        cases["first start"] = best(runs)
+        cases["restart"] = best([run_child(tmp, "new", route) for _ in range(args.runs)])
+
+        print(f"\n{'case':>12} {'imports':>9} {'system':>9} {'catalog':>9} {'search':>9} "
+              f"{'to search':>10} {'process':>9}  heavy modules loaded")
+        for name, r in cases.items():
+            print(f"{name:>12} " + " ".join(f"{r[k] * 1000:>6.0f} ms" for k in ("imports", "system", "catalog", "search"))
+                  + f" {r['total'] * 1000:>7.0f} ms {r['process'] * 1000:>6.0f} ms  {', '.join(r['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Storage backend benchmark.
+
+Throughput of the CSV journals vs SQLite (WAL) behind FlightSystem, both
+starting from the same data set of --existing bookings: start-up (load),
+sequential bookings, bookings from --threads threads, cancellations by
+booking_id, a passenger lookup and one admin page with its count.
+
+    python -m benchmarks.bench_storage [--existing 100000] [--bookings 2000] [--threads 8]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flight_system import FlightSystem
+from migrate_storage import migrate
+
+FLIGHTS = 200
+DATE = "2025-12-01"
+SEATS = 100_000
+
+
+def make_data_dir(path, existing):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        for i in range(FLIGHTS):
+            writer.writerow([f"SB{i:03d}", "Delhi", "Mumbai", "10:00", 5000, DATE, SEATS, 0, 0])
+    system = FlightSystem(path)
+    system.bookings.add_many([(f"E{i}", f"SB{i % FLIGHTS:03d}", DATE, "Economy", 5900.0) for i in range(existing)])
+    system.inventory.record_many([(f"SB{i:03d}", DATE, "Economy", -(existing // FLIGHTS)) for i in range(FLIGHTS)])
+
+
+def rate(n, fn):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def measure(data_dir, storage, n, threads):
+    start = time.perf_counter()
+    system = FlightSystem(data_dir, storage=storage)
+    results = {"load (s)": time.perf_counter() - start}
+
+    def book(i):
+        return system.book_ticket(f"SB{i % FLIGHTS:03d}", f"N{i}", DATE, "Economy")
+
+    results["book /s"] = rate(n, lambda: [book(i) for i in range(n)])
+    with ThreadPoolExecutor(threads) as pool:
+        results[f"book x{threads} threads /s"] = rate(n, lambda: list(pool.map(book, range(n, 2 * n))))
+    ids = [b["booking_id"] for b in system.bookings.query("SB007", limit=n // 10)[0]]
+    results["cancel /s"] = rate(len(ids), lambda: [system.cancel_booking(b) for b in ids])
+    results["find /s"] = rate(n, lambda: [system.find_bookings(f"E{i}", f"SB{i % FLIGHTS:03d}", DATE) for i in range(n)])
+    results["admin page /s"] = rate(200, lambda: [
+        (system.count_bookings("SB042"), system.query_bookings("SB042", limit=50)) for _ in range(200)])
+
+    left = sum(f.available_seats["Economy"] for f in system.flights)
+    assert left == FLIGHTS * SEATS - system.count_bookings(), "seats and bookings disagree"
+    system.storage.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--existing", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        make_data_dir(data_dir, args.existing)
+        migrate(data_dir)
+        results = {storage: measure(data_dir, storage, args.bookings, args.threads) for storage in ("csv", "sqlite")}
+
+    print(f"existing bookings: {args.existing:,}, operations per run: {args.bookings:,}")
+    print(f"{'':>22} {'csv':>12} {'sqlite':>12}")
+    for metric in results["csv"]:
+        csv_value, sqlite_value = results["csv"][metric], results["sqlite"][metric]
+        fmt = "{:>12.2f}" if metric.endswith("(s)") else "{:>12,.0f}"
+        print(f"{metric:>22} {fmt.format(csv_value)} {fmt.format(sqlite_value)}")
+
+
+if __name__ == "__main__":
+    main()
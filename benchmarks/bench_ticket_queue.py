@@ -0,0 +1,89 @@
+"""
+Confirm-to-response latency benchmark.
+
+Time from "Confirm & Pay" until the page can respond, for groups of 1 to
+20 passengers: booking plus rendering every ticket in the request (one
+generate_ticket per passenger, or one merged PDF for the group) vs
+booking plus queueing the tickets for the background workers. For the
+queue, the time until the last ticket is ready is shown as well.
+
+    python -m benchmarks.bench_ticket_queue [--groups 1 5 10 20] [--threads 2]
+"""
+import argparse
+import csv
+import itertools
+import os
+import tempfile
+import time
+
+from flight_system import FlightSystem
+from ticket_generator import FONT_PATH, TicketGenerator
+from ticket_queue import TicketJobQueue, TicketWorkers
+
+GROUPS = [1, 5, 10, 20]
+FLIGHT = ("QB100", "2025-12-01", "Economy")
+_names = itertools.count()
+
+
+def make_data_dir(path):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        writer.writerow([FLIGHT[0], "Delhi", "Mumbai", "10:00", 5000, FLIGHT[1], 100_000, 0, 0])
+
+
+def book_group(system, size):
+    """Book size passengers the way the app does; returns the confirmed bookings."""
+    group = next(_names)
+    confirmed = []
+    for i in range(size):
+        name = f"G{group} #{i}"
+        if system.book_ticket(FLIGHT[0], name, FLIGHT[1], FLIGHT[2]).startswith("✅"):
+            confirmed.append({"passenger_name": name, "flight_id": FLIGHT[0], "date": FLIGHT[1],
+                              "class": FLIGHT[2], "fare": 5900.0})
+    return confirmed
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", type=int, nargs="+", default=GROUPS)
+    parser.add_argument("--threads", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_data_dir(tmp)
+        system = FlightSystem(tmp)
+        generator = TicketGenerator(os.path.abspath(FONT_PATH), output_dir=os.path.join(tmp, "tickets"), workers=1)
+        generator.render_ticket("warm", "up", FLIGHT[1], FLIGHT[2], 1)
+        queue = TicketJobQueue(tmp)
+        workers = TicketWorkers(queue, generator, threads=args.threads, poll_interval=0.05).start()
+
+        print(f"{'passengers':>10} {'per-ticket':>12} {'merged PDF':>12} {'queued':>10} {'all ready':>11}")
+        for size in args.groups:
+            _, per_ticket = timed(lambda: [
+                generator.generate_ticket(*(b[k] for k in ("passenger_name", "flight_id", "date", "class", "fare")))
+                for b in book_group(system, size)])
+            _, merged = timed(lambda: generator.generate_tickets(book_group(system, size), merge=True))
+
+            start = time.perf_counter()
+            job_ids = queue.submit(book_group(system, size))
+            queued = (time.perf_counter() - start) * 1000
+            while any(j["status"] != TicketJobQueue.DONE for j in queue.statuses(job_ids)):
+                time.sleep(0.005)
+            ready = (time.perf_counter() - start) * 1000
+
+            print(f"{size:>10} {per_ticket:>9.1f} ms {merged:>9.1f} ms {queued:>7.1f} ms {ready:>8.1f} ms")
+        workers.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Ticket generation benchmark.
+
+Tickets per second for batches of 1, 10, 1,000 and 10,000 bookings: the
+old per-passenger loop (generate_ticket, font parsed per ticket) vs
+generate_tickets() as a zip of PDFs and as one merged PDF, both with a
+cold ticket cache, and a repeat zip download served from the warm cache.
+The old loop is skipped above --serial-limit tickets, where it takes
+minutes.
+
+    python -m benchmarks.bench_tickets [--sizes 1 10 1000 10000] [--workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ticket_cache import TicketCache
+from ticket_generator import FONT_PATH, TicketGenerator
+
+SIZES = [1, 10, 1_000, 10_000]
+CLASSES = ["Economy", "Business", "First Class"]
+
+
+def make_bookings(n):
+    return [
+        {
+            "passenger_name": f"Passenger {i}",
+            "flight_id": f"AI{100 + i % 50}",
+            "date": f"2025-01-{1 + i % 28:02d}",
+            "class": CLASSES[i % 3],
+            "fare": 4000 + (i * 37) % 9000,
+        }
+        for i in range(n)
+    ]
+
+
+def no_cache():
+    return TicketCache(os.devnull, max_memory_bytes=0, max_disk_bytes=0)
+
+
+def rate(n, fn):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--serial-limit", type=int, default=1_000)
+    args = parser.parse_args()
+
+    font_path = os.path.abspath(FONT_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = TicketGenerator(font_path, output_dir=tmp, workers=args.workers)
+        # Start the pool up front so its start-up isn't charged to one size
+        generator.generate_tickets(make_bookings(2 * 8 * args.workers))
+
+        print(f"workers: {args.workers}")
+        print(f"{'tickets':>8} {'old loop':>12} {'batch zip':>12} {'batch merged':>14} {'cached zip':>12}")
+        for n in args.sizes:
+            bookings = make_bookings(n)
+            if n <= args.serial_limit:
+                old = rate(n, lambda: [
+                    TicketGenerator(font_path, output_dir=tmp, cache=no_cache()).generate_ticket(
+                        b["passenger_name"], b["flight_id"], b["date"], b["class"], b["fare"])
+                    for b in bookings
+                ])
+                old = f"{old:,.1f} /s"
+            else:
+                old = "-"
+            generator.cache.clear()
+            zipped = rate(n, lambda: generator.generate_tickets(bookings))
+            merged = rate(n, lambda: generator.generate_tickets(bookings, merge=True))
+            cached = rate(n, lambda: generator.generate_tickets(bookings))
+            print(f"{n:>8,} {old:>12} {zipped:>9,.1f} /s {merged:>11,.1f} /s {cached:>9,.0f} /s")
+        generator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Waitlist benchmark with 100k waitlisted passengers per flight.
+
+Times the lazy rebuild of the queues from waitlist.csv, single promotions
+triggered by cancellations, and one batch promotion after an admin adds
+seats.
+
+    python -m benchmarks.bench_waitlist [--waitlisted 100000]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from flight_system import FlightSystem
+from waitlist import WaitlistStore
+
+FLIGHTS = 3
+DATE = "2025-12-01"
+CANCELLATIONS = 1_000
+BATCH = 10_000
+
+
+def make_data_dir(path, seats):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        for i in range(FLIGHTS):
+            writer.writerow([f"WL{i:03d}", "Delhi", "Mumbai", "10:00", 5000, DATE, seats, 0, 0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--waitlisted", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        make_data_dir(data_dir, seats=CANCELLATIONS)
+        system = FlightSystem(data_dir=data_dir)
+
+        # Fill every seat, then waitlist n passengers per flight in bulk
+        for i in range(FLIGHTS):
+            fid = f"WL{i:03d}"
+            system.bookings.add_many([(f"B{j}", fid, DATE, "Economy", 5900.0) for j in range(CANCELLATIONS)])
+            system.inventory.record(fid, DATE, "Economy", -CANCELLATIONS)
+
+        start = time.perf_counter()
+        for i in range(FLIGHTS):
+            system.waitlist.add_many([f"W{j}" for j in range(args.waitlisted)], f"WL{i:03d}", DATE, "Economy")
+        t_add = time.perf_counter() - start
+        total = FLIGHTS * args.waitlisted
+        print(f"waitlisted {total:,} passengers in {t_add:.2f}s ({total / t_add:,.0f}/s)")
+
+        # Lazy rebuild: a fresh store parses waitlist.csv on first use
+        fresh = WaitlistStore(data_dir)
+        start = time.perf_counter()
+        fresh.peek("WL000", DATE, "Economy")
+        print(f"lazy queue rebuild from waitlist.csv: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        # Single promotions: each cancellation hands its seat to the queue head
+        system = FlightSystem(data_dir=data_dir)
+        start = time.perf_counter()
+        promoted = 0
+        for j in range(CANCELLATIONS):
+            msg = system.cancel_ticket(f"B{j}", "WL000", DATE)
+            promoted += "Promoted" in msg
+        t_cancel = time.perf_counter() - start
+        print(f"{CANCELLATIONS:,} cancellations with promotion: "
+              f"{t_cancel / CANCELLATIONS * 1e6:.0f} µs each ({promoted} promoted)")
+
+        # Batch promotion: admin adds seats
+        start = time.perf_counter()
+        promoted = system.add_seats("WL001", DATE, "Economy", BATCH)
+        t_batch = time.perf_counter() - start
+        print(f"batch promotion of {len(promoted):,} waitlisters: {t_batch * 1000:.0f} ms "
+              f"({len(promoted) / t_batch:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
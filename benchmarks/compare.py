@@ -0,0 +1,72 @@
+"""
+Compare two benchmark suite result files.
+
+Prints the p50 latency of every benchmark (and of each request kind in the
+mixed workload) in both runs and flags those that got slower by more than
+--threshold. Exits with status 1 if any did, so it can gate a CI job.
+
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--threshold 0.15]
+"""
+import argparse
+import json
+import sys
+
+# Parameters that must match for the numbers to be comparable
+SAME_PARAMS = ("scale", "storage", "seed", "cities", "flights_per_day", "days", "load_factor", "mixed_requests")
+
+
+def _p50s(doc):
+    """{benchmark name: p50 in microseconds}, mixed workload kinds included."""
+    p50s = {}
+    for name, result in doc["results"].items():
+        p50s[name] = result["p50_us"]
+        for kind, sub in result.get("by_kind", {}).items():
+            p50s[f"{name}: {kind}"] = sub["p50_us"]
+    return p50s
+
+
+def compare(baseline, current, threshold=0.15):
+    """Print a side-by-side table; returns the names of benchmarks that regressed."""
+    mismatched = [p for p in SAME_PARAMS if baseline["params"].get(p) != current["params"].get(p)]
+    if mismatched:
+        print(f"warning: runs differ in {', '.join(mismatched)}; numbers may not be comparable")
+
+    old, new = _p50s(baseline), _p50s(current)
+    print(f"\nbaseline {baseline['git'].get('commit')} -> current {current['git'].get('commit')} "
+          f"(p50 us, regression above +{threshold:.0%})")
+    print(f"{'benchmark':>26} {'baseline':>10} {'current':>10} {'change':>8}")
+    regressions = []
+    for name in [n for n in new if n in old]:
+        before, after = old[name], new[name]
+        if not before or after is None:
+            continue
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:>26} {before:>10,.1f} {after:>10,.1f} {change:>+8.1%}{flag}")
+    for name in sorted(set(old) ^ set(new)):
+        print(f"{name:>26} only in {'baseline' if name in old else 'current'}")
+    print(f"\n{len(regressions)} regression(s)" + (f": {', '.join(regressions)}" if regressions else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Synthetic data generator for benchmarks.
+
+Builds a data directory (flights.csv, the bookings/ ledger,
+seat_journal.csv, waitlist.csv; optionally migrated to SQLite) for a network of --cities
+cities with --flights-per-day scheduled services flown every day for
+--days days. Each seat class is filled to about --load-factor of its
+capacity; demand beyond capacity goes to the waitlist. The same seed
+always gives the same data (byte-identical files, but for the random
+incarnation in each booking segment's header).
+
+    python -m benchmarks.datagen DATA_DIR [--scale medium] [--cities 30] [--seed 7] [--storage sqlite]
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+from datetime import date, timedelta
+
+from booking_store import BookingStore
+from flight_system import Flight
+from journal import CsvJournal
+from seat_inventory import SeatInventory
+from storage import FLIGHT_HEADER
+from waitlist import WaitlistStore
+
+CITY_NAMES = [
+    "Delhi", "Mumbai", "Bangalore", "Hyderabad", "Chennai", "Kolkata", "Pune", "Ahmedabad",
+    "Goa", "Jaipur", "Lucknow", "Kochi", "Chandigarh", "Patna", "Indore", "Bhubaneswar",
+    "Coimbatore", "Nagpur", "Varanasi", "Srinagar", "Guwahati", "Amritsar", "Ranchi", "Raipur",
+    "Visakhapatnam", "Madurai", "Mangalore", "Trichy", "Dehradun", "Bhopal",
+]
+AIRLINES = ["AI", "6E", "UK", "SG", "QP", "IX"]
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Rohan",
+    "Ananya", "Diya", "Aadhya", "Saanvi", "Pari", "Anika", "Navya", "Myra", "Meera", "Kavya",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Reddy", "Iyer", "Nair", "Patel", "Shah", "Gupta", "Singh", "Das",
+    "Rao", "Menon", "Joshi", "Kulkarni", "Mehta", "Chopra", "Bose", "Pillai", "Naidu", "Khan",
+]
+CAPACITY = {"Economy": 120, "Business": 16, "First Class": 6}
+
+SCALES = {
+    "small": dict(cities=10, flights_per_day=20, days=7, load_factor=0.7),
+    "medium": dict(cities=30, flights_per_day=100, days=30, load_factor=0.75),
+    "large": dict(cities=60, flights_per_day=300, days=60, load_factor=0.8),
+}
+START_DATE = date(2025, 12, 1)
+
+
+def city_list(n):
+    """n city names: the real list first, then City31, City32, ..."""
+    return CITY_NAMES[:n] + [f"City{i + 1}" for i in range(len(CITY_NAMES), n)]
+
+
+def passenger_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randrange(10_000):04d}"
+
+
+# ===============================================================
+#                     SCHEDULE
+# ===============================================================
+
+def schedule(cities=30, flights_per_day=100, days=30, seed=7):
+    """Flight() argument lists: flights_per_day daily services over days days.
+
+    Routes favour big cities (Zipf-like weights), so a few trunk routes
+    carry many flights a day, as in a real network.
+    """
+    rng = random.Random(seed)
+    names = city_list(cities)
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(cities)]
+    services = []
+    for i in range(flights_per_day):
+        src, dst = rng.choices(names, weights, k=2)
+        while dst == src:
+            dst = rng.choices(names, weights)[0]
+        services.append((
+            f"{AIRLINES[i % len(AIRLINES)]}{100 + i // len(AIRLINES):04d}", src, dst,
+            f"{rng.randrange(5, 23):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            rng.randrange(2500, 9500, 50),
+        ))
+    return [
+        [fid, src, dst, dep, price, str(START_DATE + timedelta(days=day)),
+         CAPACITY["Economy"], CAPACITY["Business"], CAPACITY["First Class"]]
+        for day in range(days)
+        for fid, src, dst, dep, price in services
+    ]
+
+
+# ===============================================================
+#                     DATA DIRECTORY
+# ===============================================================
+
+def generate(data_dir, cities=30, flights_per_day=100, days=30, load_factor=0.75, seed=7, storage="csv"):
+    """Write a complete data directory; returns counts of what was written.
+
+    Bookings, seat deltas and waitlist entries are written straight to the
+    ledger and journals with IDs derived from the seed, so reruns are identical.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    shutil.rmtree(os.path.join(data_dir, BookingStore.DIRNAME), ignore_errors=True)
+    for store in (SeatInventory, WaitlistStore):
+        for path in (os.path.join(data_dir, store.FILENAME), os.path.join(data_dir, store.FILENAME) + ".gen"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    flights = schedule(cities, flights_per_day, days, seed)
+    with open(os.path.join(data_dir, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FLIGHT_HEADER)
+        writer.writerows(flights)
+
+    rng = random.Random(seed + 1)
+    bookings, deltas, waiting = [], [], []
+    for fields in flights:
+        fid, day, flight = fields[0], fields[5], Flight(*fields)
+        for flight_class, capacity in CAPACITY.items():
+            demand = int(capacity * load_factor * rng.uniform(0.5, 1.5))
+            booked = min(demand, capacity)
+            for _ in range(booked):
+                bookings.append([f"BK{seed:04X}{len(bookings):08X}", passenger_name(rng), fid, day,
+                                 flight_class, flight.get_price_by_class(flight_class)])
+            for _ in range(demand - booked):
+                waiting.append([f"WL{seed:04X}{len(waiting):08X}", passenger_name(rng), fid, day,
+                                flight_class, 0, WaitlistStore.WAITING])
+            if booked:
+                deltas.append([fid, day, flight_class, -booked])
+
+    BookingStore(data_dir).import_rows(bookings)
+    for store, rows in ((SeatInventory, deltas), (WaitlistStore, waiting)):
+        CsvJournal(os.path.join(data_dir, store.FILENAME), store.HEADER).append(rows)
+
+    if storage == "sqlite":
+        from migrate_storage import migrate
+        migrate(data_dir, force=True)
+    return {"flights": len(flights), "bookings": len(bookings), "waitlisted": len(waiting)}
+
+
+# ===============================================================
+#                     REQUEST TRACES
+# ===============================================================
+
+# Share of each request type in a mixed workload (roughly a busy booking site)
+REQUEST_MIX = {
+    "search": 50,
+    "fare_quote": 15,
+    "book": 10,
+    "find_booking": 8,
+    "admin_page": 7,
+    "cancel": 5,
+    "book_group": 3,
+    "ticket": 2,
+}
+
+
+def request_trace(flights, bookings, n, seed=7, mix=None):
+    """n requests as (kind, args) tuples, drawn with the weights of mix.
+
+    flights are Flight() argument lists (see schedule()), bookings dicts of
+    live bookings to cancel and look up. Cancellations and lookups target
+    those plus the bookings the trace itself asked for earlier.
+    """
+    rng = random.Random(seed + 2)
+    mix = mix or REQUEST_MIX
+    kinds, weights = list(mix), list(mix.values())
+    live = [(b["passenger_name"], b["flight_id"], b["date"]) for b in bookings]
+    rng.shuffle(live)
+    trace = []
+    for kind in rng.choices(kinds, weights, k=n):
+        fields = rng.choice(flights)
+        fid, src, dst, day = fields[0], fields[1], fields[2], fields[5]
+        flight_class = rng.choices(list(CAPACITY), [85, 10, 5])[0]
+        if kind == "search":
+            args = (src, dst, day)
+        elif kind == "fare_quote":
+            args = (fid, day, flight_class)
+        elif kind == "book":
+            name = passenger_name(rng)
+            live.append((name, fid, day))
+            args = (fid, name, day, flight_class)
+        elif kind == "book_group":
+            names = [passenger_name(rng) for _ in range(rng.randint(2, 6))]
+            live.extend((name, fid, day) for name in names)
+            args = (fid, names, day, flight_class)
+        elif kind in ("cancel", "find_booking"):
+            if not live:
+                continue
+            args = live.pop() if kind == "cancel" else live[rng.randrange(len(live))]
+        elif kind == "admin_page":
+            args = (rng.choice([None, fid]), rng.choice([None, day]))
+        else:  # ticket
+            args = (passenger_name(rng), fid, day, flight_class, Flight(*fields).get_price_by_class(flight_class))
+        trace.append((kind, args))
+    return trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("data_dir")
+    parser.add_argument("--scale", choices=list(SCALES), default="medium")
+    parser.add_argument("--cities", type=int)
+    parser.add_argument("--flights-per-day", type=int)
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--load-factor", type=float)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    args = parser.parse_args()
+
+    params = dict(SCALES[args.scale])
+    params.update({k: v for k, v in vars(args).items() if k in params and v is not None})
+    counts = generate(args.data_dir, seed=args.seed, storage=args.storage, **params)
+    print(", ".join(f"{v:,} {k}" for k, v in counts.items()), f"written to {args.data_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Booking API load test.
+
+Starts api_server.py on a generated data set and replays a seeded
+REQUEST_MIX trace against it (search, fare quote, book, group booking,
+booking lookup, cancel and ticket download; admin page views are not API
+calls) from --connections concurrent clients. Reports requests per
+second and p50 / p95 / p99 / max latency for each --modes:
+
+    keepalive   one persistent connection per client
+    close       a new connection per request (Connection: close)
+    batch       keep-alive, --batch requests per POST /batch (ticket
+                downloads, which cannot be batched, go on their own)
+
+plus a per-kind breakdown for the first mode. A --warmup trace is sent
+first and not counted.
+
+    python -m benchmarks.load_api [--scale small] [--requests 3000] [--connections 32] [--batch 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from benchmarks.datagen import REQUEST_MIX, SCALES, generate, request_trace, schedule
+from benchmarks.suite import stats
+from flight_system import FlightSystem
+
+MODES = ("keepalive", "close", "batch")
+
+
+def api_request(kind, args):
+    """(method, path, body) of one trace request."""
+    if kind == "search":
+        source, destination, day = args
+        return "GET", "/search?" + urlencode({"source": source, "destination": destination, "date": day}), None
+    if kind == "fare_quote":
+        flight_id, day, flight_class = args
+        return "GET", "/fare?" + urlencode({"flight_id": flight_id, "date": day, "class": flight_class}), None
+    if kind == "book":
+        flight_id, name, day, flight_class = args
+        return "POST", "/book", {"flight_id": flight_id, "passenger_name": name, "date": day, "class": flight_class}
+    if kind == "book_group":
+        flight_id, names, day, flight_class = args
+        return "POST", "/book_group", {"flight_id": flight_id, "passengers": names, "date": day,
+                                       "class": flight_class, "policy": "waitlist_rest"}
+    if kind == "find_booking":
+        name, flight_id, day = args
+        return "GET", "/bookings?" + urlencode({"passenger_name": name, "flight_id": flight_id, "date": day}), None
+    if kind == "cancel":
+        name, flight_id, day = args
+        return "POST", "/cancel", {"passenger_name": name, "flight_id": flight_id, "date": day}
+    return "GET", "/ticket?" + urlencode({"booking_id": args}), None
+
+
+def build_trace(data_dir, params, n, seed):
+    """n (kind, method, path, body) requests; tickets download live bookings."""
+    system = FlightSystem(data_dir)
+    rng = random.Random(seed)
+    live = system.view_all_bookings()
+    system.storage.close()
+    sample = rng.sample(live, min(len(live), 20_000))
+    mix = {kind: weight for kind, weight in REQUEST_MIX.items() if kind != "admin_page"}
+    flights = schedule(params["cities"], params["flights_per_day"], params["days"], 7)
+    trace = []
+    for kind, args in request_trace(flights, sample, n, seed=seed, mix=mix):
+        if kind == "ticket":
+            args = rng.choice(sample)["booking_id"]
+        trace.append((kind, *api_request(kind, args)))
+    return trace
+
+
+# ===============================================================
+#                     CLIENT
+# ===============================================================
+
+class Connection:
+    """A minimal HTTP/1.1 client connection (JSON in, status + bytes out)."""
+
+    def __init__(self, host, port, keep_alive=True):
+        self.host, self.port, self.keep_alive = host, port, keep_alive
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(data)}\r\n"
+                + ("" if self.keep_alive else "Connection: close\r\n") + "\r\n")
+        self.writer.write(head.encode("latin-1") + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        payload = await self.reader.readexactly(length)
+        if not self.keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def run_load(host, port, trace, connections, mode, batch):
+    """Replay trace; returns (wall seconds, {kind: [latency s]}, {kind: 5xx responses})."""
+    units, group = [], []
+    for request in trace:
+        if mode == "batch" and request[0] != "ticket":
+            group.append(request)
+            if len(group) == batch:
+                units.append(group)
+                group = []
+        else:
+            units.append([request])
+    if group:
+        units.append(group)
+    pending = iter(units)
+    by_kind, errors = {}, {}
+
+    async def client():
+        conn = Connection(host, port, keep_alive=mode != "close")
+        for unit in pending:
+            start = time.perf_counter()
+            if mode == "batch" and unit[0][0] != "ticket":
+                status, payload = await conn.request(
+                    "POST", "/batch", [{"method": m, "path": p, "body": b} for _, m, p, b in unit])
+                statuses = [item["status"] for item in json.loads(payload)] if status == 200 else [status] * len(unit)
+            else:
+                _, method, path, body = unit[0]
+                statuses = [(await conn.request(method, path, body))[0]]
+            elapsed = time.perf_counter() - start
+            for (kind, *_), status in zip(unit, statuses):
+                by_kind.setdefault(kind, []).append(elapsed)
+                errors[kind] = errors.get(kind, 0) + (status >= 500)
+        conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return time.perf_counter() - start, by_kind, errors
+
+
+# ===============================================================
+#                     SERVER
+# ===============================================================
+
+def start_server(data_dir, storage, workers):
+    """api_server.py in a subprocess on a free port; returns (process, host, port)."""
+    process = subprocess.Popen(
+        [sys.executable, "api_server.py", "--port", "0", "--data-dir", data_dir, "--storage", storage,
+         "--workers", str(workers), "--tickets-dir", os.path.join(data_dir, "tickets")],
+        stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()        # "Booking API on http://host:port"
+    if not line:
+        raise SystemExit("api_server.py did not start")
+    host, port = line.strip().rsplit("/", 1)[-1].rsplit(":", 1)
+    return process, host, int(port)
+
+
+def print_row(label, wall, samples, errors):
+    s = stats(samples)
+    print(f"{label:>14} {s['ops']:>8,} {s['ops'] / wall:>9,.0f} {s['p50_us'] / 1000:>8.2f} "
+          f"{s['p95_us'] / 1000:>8.2f} {s['p99_us'] / 1000:>8.2f} {s['max_us'] / 1000:>8.2f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--requests", type=int, default=3000, help="per mode")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=10, help="requests per POST /batch")
+    parser.add_argument("--workers", type=int, default=8, help="server threads for file-touching calls")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--warmup", type=int, default=300, help="uncounted requests sent first")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        params = SCALES[args.scale]
+        counts = generate(tmp, storage=args.storage, **params)
+        traces = {mode: build_trace(tmp, params, args.requests, seed=11 + i) for i, mode in enumerate(args.modes)}
+        warmup = build_trace(tmp, params, args.warmup, seed=10)
+        process, host, port = start_server(tmp, args.storage, args.workers)
+        try:
+            # The first requests read each date's booking segment and start the PDF workers
+            asyncio.run(run_load(host, port, warmup, args.connections, "keepalive", args.batch))
+            print(f"{args.scale}: {counts['flights']:,} flights, {counts['bookings']:,} bookings; "
+                  f"{args.connections} clients, http://{host}:{port}")
+            print(f"{'mode':>14} {'requests':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'max ms':>8} {'errors':>7}")
+            first = None
+            for mode in args.modes:
+                wall, by_kind, errors = asyncio.run(
+                    run_load(host, port, traces[mode], args.connections, mode, args.batch))
+                label = f"batch of {args.batch}" if mode == "batch" else mode
+                print_row(label, wall, [s for samples in by_kind.values() for s in samples], sum(errors.values()))
+                first = first or (mode, wall, by_kind, errors)
+
+            mode, wall, by_kind, errors = first
+            print(f"\nby request kind ({mode}):")
+            for kind, samples in sorted(by_kind.items(), key=lambda item: -len(item[1])):
+                print_row(kind, wall, samples, errors[kind])
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
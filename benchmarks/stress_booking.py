@@ -0,0 +1,142 @@
+"""
+Concurrent booking stress test.
+
+Fires thousands of bookings (with some cancellations mixed in) at one data
+directory from a thread pool sharing one FlightSystem, then from a process
+pool where every worker has its own FlightSystem. Afterwards a fresh
+FlightSystem reads the stored bookings (the date segments of the booking
+ledger, or the SQLite bookings table) and checks that no flight is
+overbooked, that every confirmed booking is there and nothing else, and
+that each flight's available seats match its stored bookings.
+
+    python -m benchmarks.stress_booking [--requests 5000] [--workers 16] [--storage csv|sqlite]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flight_system import FlightSystem
+from migrate_storage import migrate
+
+FLIGHTS = 20
+ECONOMY_SEATS = 100
+CANCEL_EVERY = 10
+
+_worker_system = None
+
+
+def make_data_dir(path):
+    with open(os.path.join(path, "flights.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "flight_id", "source", "destination", "time",
+            "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+        ])
+        for i in range(FLIGHTS):
+            writer.writerow([f"ST{i:03d}", "Delhi", "Mumbai", "10:00", 5000, "2025-12-01", ECONOMY_SEATS, 0, 0])
+
+
+def make_requests(n, seed=7):
+    """(op, flight_id, passenger) tuples; every CANCEL_EVERY-th is a cancel of an earlier booking."""
+    rng = random.Random(seed)
+    requests = []
+    for i in range(n):
+        if i and i % CANCEL_EVERY == 0:
+            requests.append(("cancel", None, f"P{rng.randrange(i)}"))
+        else:
+            requests.append(("book", f"ST{rng.randrange(FLIGHTS):03d}", f"P{i}"))
+    return requests
+
+
+def do_request(system, request):
+    op, flight_id, passenger = request
+    if op == "book":
+        msg = system.book_ticket(flight_id, passenger, "2025-12-01", "Economy")
+        return op, passenger, flight_id, msg.startswith("✅"), 0
+    # Cancel against whichever flight the passenger may hold
+    for i in range(FLIGHTS):
+        msg = system.cancel_ticket(passenger, f"ST{i:03d}", "2025-12-01")
+        if msg.startswith("✅"):
+            # A freed seat may go straight to waitlisted passengers
+            promoted = len(msg.split("Promoted from waitlist: ")[1].split(", ")) if "Promoted" in msg else 0
+            return op, passenger, f"ST{i:03d}", True, promoted
+    return op, passenger, None, False, 0
+
+
+def _init_worker(data_dir, storage):
+    global _worker_system
+    _worker_system = FlightSystem(data_dir=data_dir, storage=storage)
+
+
+def _process_request(request):
+    return do_request(_worker_system, request)
+
+
+def verify(data_dir, storage, results):
+    confirmed = Counter()
+    for op, passenger, flight_id, ok, promoted in results:
+        if ok:
+            confirmed[flight_id] += 1 if op == "book" else promoted - 1
+
+    fresh = FlightSystem(data_dir=data_dir, storage=storage)
+    on_disk = Counter(b["flight_id"] for b in fresh.view_all_bookings())
+    problems = []
+    for i in range(FLIGHTS):
+        fid = f"ST{i:03d}"
+        if on_disk[fid] > ECONOMY_SEATS:
+            problems.append(f"{fid}: overbooked ({on_disk[fid]} > {ECONOMY_SEATS})")
+        if on_disk[fid] != confirmed[fid]:
+            problems.append(f"{fid}: {confirmed[fid]} confirmed but {on_disk[fid]} bookings stored")
+        available = fresh.get_flight(fid, "2025-12-01").available_seats["Economy"]
+        if available != ECONOMY_SEATS - on_disk[fid]:
+            problems.append(f"{fid}: {available} seats left but {on_disk[fid]} bookings")
+    return problems
+
+
+def run(mode, n, workers, storage="csv"):
+    requests = make_requests(n)
+    with tempfile.TemporaryDirectory() as data_dir:
+        make_data_dir(data_dir)
+        if storage == "sqlite":
+            migrate(data_dir)
+        start = time.perf_counter()
+        if mode == "threads":
+            system = FlightSystem(data_dir=data_dir, storage=storage)
+            with ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(lambda r: do_request(system, r), requests))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_dir, storage)) as pool:
+                results = list(pool.map(_process_request, requests, chunksize=16))
+        elapsed = time.perf_counter() - start
+        problems = verify(data_dir, storage, results)
+
+    booked = sum(1 for op, _, _, ok, _ in results if op == "book" and ok)
+    cancelled = sum(1 for op, _, _, ok, _ in results if op == "cancel" and ok)
+    print(f"{mode:>9}: {n} requests in {elapsed:.2f}s ({n / elapsed:,.0f} req/s), "
+          f"{booked} booked, {cancelled} cancelled, {FLIGHTS * ECONOMY_SEATS} seats")
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if not problems:
+        print("  ✅ no overbooking, no lost bookings, seat counts consistent")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    args = parser.parse_args()
+
+    ok = run("threads", args.requests, args.workers, args.storage)
+    ok = run("processes", args.requests, min(args.workers, os.cpu_count() or 1), args.storage) and ok
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
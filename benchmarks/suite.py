@@ -0,0 +1,290 @@
+"""
+Benchmark suite: microbenchmarks and a mixed workload on generated data.
+
+Generates a data set with benchmarks.datagen (same seed, same data), then
+times load_flights, search_flights, book_ticket, cancel_ticket,
+view_all_bookings and generate_ticket one call at a time, and replays a
+seeded request trace in the REQUEST_MIX proportions. Mutating benchmarks
+each get a fresh copy of the data. Results (per-call latency percentiles
+and throughput) are saved as JSON; pass --compare to check them against
+an earlier run (see benchmarks.compare).
+
+    python -m benchmarks.suite [--scale small] [--storage csv] [--seed 7] [--output results.json]
+    python -m benchmarks.suite --compare benchmarks/results/<baseline>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.compare import compare
+from benchmarks.datagen import REQUEST_MIX, SCALES, generate, request_trace, schedule
+from flight_system import FlightSystem
+from metrics import REGISTRY
+from ticket_cache import TicketCache
+from ticket_generator import FONT_PATH, TicketGenerator
+
+SCHEMA_VERSION = 1
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+# Calls per microbenchmark (one warm-up call is made first and not counted)
+CALLS = {
+    "load_flights": 5,
+    "search_flights": 2000,
+    "book_ticket": 500,
+    "cancel_ticket": 300,
+    "view_all_bookings": 5,
+    "generate_ticket": 20,
+}
+MIXED_REQUESTS = 5000
+
+
+def stats(samples):
+    """Latency summary (microseconds) and throughput of per-call durations in seconds."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    total = sum(ordered)
+
+    def pct(q):
+        return round(ordered[min(n - 1, int(q * n))] * 1e6, 2) if n else None
+
+    return {
+        "ops": n,
+        "seconds": round(total, 6),
+        "ops_per_s": round(n / total, 2) if total else None,
+        "mean_us": round(total / n * 1e6, 2) if n else None,
+        "p50_us": pct(0.50),
+        "p95_us": pct(0.95),
+        "p99_us": pct(0.99),
+        "max_us": round(ordered[-1] * 1e6, 2) if n else None,
+    }
+
+
+def time_calls(fn, args_list):
+    """Call fn(*args) for each args (after one uncounted warm-up); returns durations."""
+    fn(*args_list[0])
+    samples = []
+    for args in args_list[1:]:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# ===============================================================
+#                     SUITE
+# ===============================================================
+
+class Suite:
+    """One generated data set plus helpers to open fresh copies of it."""
+
+    def __init__(self, workdir, storage, seed, params):
+        self.workdir = workdir
+        self.storage = storage
+        self.seed = seed
+        self.params = params
+        self.base_dir = os.path.join(workdir, "base")
+        self.counts = generate(self.base_dir, seed=seed, storage=storage, **params)
+        self.flights = schedule(params["cities"], params["flights_per_day"], params["days"], seed)
+        self._copies = 0
+
+    def fresh_system(self):
+        """A FlightSystem on a private copy of the generated data."""
+        self._copies += 1
+        data_dir = os.path.join(self.workdir, f"copy{self._copies}")
+        shutil.copytree(self.base_dir, data_dir, ignore=shutil.ignore_patterns("locks"))
+        return FlightSystem(data_dir, storage=self.storage)
+
+    def ticket_generator(self):
+        out = os.path.join(self.workdir, "tickets")
+        return TicketGenerator(os.path.abspath(FONT_PATH), output_dir=out, workers=1,
+                               cache=TicketCache(os.path.join(out, "cache")))
+
+    def trace(self, system, n, mix=None):
+        rng = random.Random(self.seed)
+        live = system.view_all_bookings()
+        sample = rng.sample(live, min(len(live), 20_000))
+        return request_trace(self.flights, sample, n, seed=self.seed, mix=mix)
+
+    # -----------------------------------------------------------
+    #                     MICROBENCHMARKS
+    # -----------------------------------------------------------
+    def bench_load_flights(self, n):
+        system = self.fresh_system()
+        samples = time_calls(system.load_flights, [()] * (n + 1))
+        system.storage.close()
+        return samples
+
+    def bench_search_flights(self, n):
+        system = self.fresh_system()
+        trace = self.trace(system, n + 1, mix={"search": 1})
+        samples = time_calls(system.search_flights, [args for _, args in trace])
+        system.storage.close()
+        return samples
+
+    def bench_book_ticket(self, n):
+        system = self.fresh_system()
+        trace = self.trace(system, n + 1, mix={"book": 1})
+        samples = time_calls(system.book_ticket, [args for _, args in trace])
+        system.storage.close()
+        return samples
+
+    def bench_cancel_ticket(self, n):
+        system = self.fresh_system()
+        trace = self.trace(system, n + 1, mix={"cancel": 1})
+        samples = time_calls(system.cancel_ticket, [args for _, args in trace])
+        system.storage.close()
+        return samples
+
+    def bench_view_all_bookings(self, n):
+        system = self.fresh_system()
+        samples = time_calls(system.view_all_bookings, [()] * (n + 1))
+        system.storage.close()
+        return samples
+
+    def bench_generate_ticket(self, n):
+        generator = self.ticket_generator()
+        system = self.fresh_system()
+        trace = self.trace(system, n + 1, mix={"ticket": 1})
+        samples = time_calls(generator.generate_ticket, [args for _, args in trace])
+        system.storage.close()
+        return samples
+
+    # -----------------------------------------------------------
+    #                     MIXED WORKLOAD
+    # -----------------------------------------------------------
+    def bench_mixed(self, n):
+        """Replay a REQUEST_MIX trace; returns overall and per-kind stats."""
+        system = self.fresh_system()
+        generator = self.ticket_generator()
+        handlers = {
+            "search": system.search_flights,
+            "fare_quote": lambda fid, day, cls: system.get_flight(fid, day).get_price_by_class(cls),
+            "book": system.book_ticket,
+            "book_group": system.book_group,
+            "find_booking": system.find_bookings,
+            "cancel": system.cancel_ticket,
+            "admin_page": lambda fid, day: (system.count_bookings(fid, day),
+                                            system.query_bookings(fid, day, limit=50)),
+            "ticket": generator.generate_ticket,
+        }
+        trace = self.trace(system, n, mix=REQUEST_MIX)
+        by_kind = {kind: [] for kind in REQUEST_MIX}
+        start = time.perf_counter()
+        for kind, args in trace:
+            t0 = time.perf_counter()
+            handlers[kind](*args)
+            by_kind[kind].append(time.perf_counter() - t0)
+        wall = time.perf_counter() - start
+        system.storage.close()
+
+        overall = stats([s for samples in by_kind.values() for s in samples])
+        overall["requests_per_s"] = round(len(trace) / wall, 2)
+        overall["by_kind"] = {kind: stats(samples) for kind, samples in by_kind.items() if samples}
+        return overall
+
+
+def run(scale="small", storage="csv", seed=7, overrides=None, mixed_requests=MIXED_REQUESTS, only=None):
+    """Run the suite; returns the result document (see SCHEMA_VERSION)."""
+    params = dict(SCALES[scale], **(overrides or {}))
+    results = {}
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as workdir:
+        start = time.perf_counter()
+        suite = Suite(workdir, storage, seed, params)
+        generate_s = time.perf_counter() - start
+        for name, calls in CALLS.items():
+            if only and name not in only:
+                continue
+            print(f"  {name} ...", file=sys.stderr)
+            results[name] = stats(getattr(suite, f"bench_{name}")(calls))
+        if not only or "mixed" in only:
+            print(f"  mixed ({mixed_requests} requests) ...", file=sys.stderr)
+            results["mixed"] = suite.bench_mixed(mixed_requests)
+        counts = suite.counts
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_info(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "metrics_enabled": REGISTRY.enabled,
+        },
+        "params": {"scale": scale, "storage": storage, "seed": seed, **params,
+                   "mixed_requests": mixed_requests, "generate_s": round(generate_s, 2), **counts},
+        "results": results,
+    }
+
+
+def git_info():
+    """Commit and dirty flag of the working tree, or Nones outside a git checkout."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def print_results(doc):
+    print(f"{'benchmark':>22} {'ops':>6} {'ops/s':>10} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    rows = [(name, r) for name, r in doc["results"].items() if name != "mixed"]
+    mixed = doc["results"].get("mixed")
+    if mixed:
+        rows.append(("mixed (all)", mixed))
+        rows += [(f"mixed: {kind}", r) for kind, r in mixed["by_kind"].items()]
+    for name, r in rows:
+        print(f"{name:>22} {r['ops']:>6} {r['ops_per_s'] or 0:>10,.0f} {r['p50_us']:>10,.1f} "
+              f"{r['p95_us']:>10,.1f} {r['p99_us']:>10,.1f}")
+    if mixed:
+        print(f"\nmixed workload: {mixed['requests_per_s']:,.0f} requests/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cities", type=int)
+    parser.add_argument("--flights-per-day", type=int)
+    parser.add_argument("--days", type=int)
+    parser.add_argument("--load-factor", type=float)
+    parser.add_argument("--mixed-requests", type=int, default=MIXED_REQUESTS)
+    parser.add_argument("--only", nargs="+", choices=[*CALLS, "mixed"], help="run just these benchmarks")
+    parser.add_argument("--output", help=f"JSON results path (default: {RESULTS_DIR}/<commit>-<scale>-<storage>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="slowdown (fraction of p50) that counts as a regression")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in vars(args).items()
+                 if k in ("cities", "flights_per_day", "days", "load_factor") and v is not None}
+    doc = run(args.scale, args.storage, args.seed, overrides, args.mixed_requests, args.only)
+    print_results(doc)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{doc['git']['commit'] or 'nogit'}-{args.scale}-{args.storage}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, doc, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
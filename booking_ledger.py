@@ -0,0 +1,278 @@
+import gzip
+import mmap
+import os
+import struct
+import time
+from urllib.parse import quote, unquote
+
+from metrics import count_io
+
+# Segment file: a header, then records appended one after another.
+#   header   magic, format version, incarnation (8 random bytes, new on
+#            every rewrite), length of the flight date, the date (UTF-8)
+#   record   body length, status, seq, then the body: booking_id,
+#            passenger_name, flight_id, class and fare joined by FIELD_SEP
+#            (a CANCELLATIONS record has no booking_id or passenger, and
+#            the count in place of the fare)
+MAGIC = b"FMSB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sB8sH")
+RECORD = struct.Struct("<IBI")
+FIELD_SEP = "\x1f"
+FIELDS = ("booking_id", "passenger_name", "flight_id", "class", "fare")
+
+# Record status codes
+BOOKED = 1
+CANCELLED = 2
+CANCELLATIONS = 3   # what compaction keeps of the tombstones it drops
+
+# A directory listing is only reused once the directory's mtime is older
+# than this: timestamps are coarse, so a file created within the same
+# tick as the listing would not change it.
+LISTING_SETTLE_NS = 2_000_000_000
+
+SEGMENT_SUFFIX = ".seg"
+ARCHIVE_SUFFIX = ".seg.gz"
+
+
+def _file_name(date, suffix):
+    return quote(date, safe="-") + suffix
+
+
+def _file_date(name, suffix):
+    return unquote(name[:-len(suffix)]) if name.endswith(suffix) else None
+
+
+# ===============================================================
+#                     RECORD ENCODING
+# ===============================================================
+
+def encode_header(date, incarnation=None):
+    date_bytes = date.encode("utf-8")
+    return HEADER.pack(MAGIC, FORMAT_VERSION, incarnation or os.urandom(8), len(date_bytes)) + date_bytes
+
+
+def decode_header(buf):
+    """(incarnation, date, offset of the first record) of a segment's bytes."""
+    if len(buf) < HEADER.size:
+        raise ValueError("truncated segment header")
+    magic, version, incarnation, date_length = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a booking segment")
+    end = HEADER.size + date_length
+    return incarnation, bytes(buf[HEADER.size:end]).decode("utf-8"), end
+
+
+def encode_records(records):
+    """Bytes of (status, seq, fields) records, fields being FIELDS' values."""
+    out = []
+    for status, seq, fields in records:
+        body = FIELD_SEP.join(str(value).replace(FIELD_SEP, " ") for value in fields).encode("utf-8")
+        out.append(RECORD.pack(len(body), status, seq))
+        out.append(body)
+    return b"".join(out)
+
+
+def decode_records(buf, offset, end=None):
+    """Complete records of buf[offset:end] as (status, seq, fields) tuples.
+
+    Returns (records, offset after the last complete one); a record still
+    being appended by another process is left for the next read.
+    """
+    end = len(buf) if end is None else end
+    records = []
+    head = RECORD.size
+    unpack = RECORD.unpack_from
+    while offset + head <= end:
+        length, status, seq = unpack(buf, offset)
+        body_end = offset + head + length
+        if body_end > end:
+            break
+        records.append((status, seq, buf[offset + head:body_end].decode("utf-8").split(FIELD_SEP)))
+        offset = body_end
+    return records, offset
+
+
+# ===============================================================
+#                     HOT SEGMENTS
+# ===============================================================
+
+class BookingLedger:
+    """Append-only binary segment files, one per flight date.
+
+    Segments are read through mmap, from any offset, so catching up with
+    another process's appends only touches the new bytes. Rewrites
+    (compaction) go to a temp file that is swapped in, with a fresh
+    incarnation in its header so readers notice even if the inode is
+    reused. Callers serialize writers (BookingStore holds a file lock).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._listing = (None, [])      # (directory mtime, sorted dates)
+
+    def path(self, date):
+        return os.path.join(self.directory, _file_name(date, SEGMENT_SUFFIX))
+
+    def dates(self):
+        """Sorted flight dates that have a segment (re-listed only when the directory changes)."""
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return []
+        if self._listing[0] != mtime or time.time_ns() - mtime < LISTING_SETTLE_NS:
+            dates = sorted(
+                date for date in (_file_date(name, SEGMENT_SUFFIX) for name in os.listdir(self.directory))
+                if date is not None
+            )
+            self._listing = (mtime, dates)
+        return self._listing[1]
+
+    def identity(self, date):
+        """(inode, size, mtime) of a segment, or None if it doesn't exist."""
+        try:
+            st = os.stat(self.path(date))
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def read(self, date, offset=0, incarnation=None):
+        """Records of a segment from offset on.
+
+        Returns (records, new offset, incarnation). Reads from the start
+        instead when the file is not the incarnation the offset belongs to;
+        the caller compares incarnations to tell a tail from a full reread.
+        A missing segment reads as ([], 0, None).
+        """
+        try:
+            f = open(self.path(date), "rb")
+        except FileNotFoundError:
+            return [], 0, None
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:      # empty, or a creation torn by a crash
+                return [], 0, None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                current, _, start = decode_header(buf)
+                if current != incarnation or offset < start:
+                    offset = start
+                records, end = decode_records(buf, offset, size)
+        count_io("read", "bookings.seg", end - offset)
+        return records, end, current
+
+    def append(self, date, records, offset):
+        """Append records to a segment whose complete records end at offset.
+
+        Creates the segment (header first) if needed, and drops a torn
+        record left at the end by a crashed writer. Returns (new offset,
+        incarnation).
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(date), "ab+") as f:
+            if f.seek(0, os.SEEK_END) > offset:
+                f.truncate(offset)
+            if offset < HEADER.size:
+                f.truncate(0)
+                header = encode_header(date)
+                f.write(header)
+                offset = len(header)
+            f.seek(0)
+            incarnation = decode_header(f.read(offset))[0]
+            data = encode_records(records)
+            f.write(data)       # append mode: lands at offset, the end of the file
+            count_io("write", "bookings.seg", len(data))
+            return offset + len(data), incarnation
+
+    def rewrite(self, date, records):
+        """Atomically replace a segment with records; returns (offset, incarnation)."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(date)
+        incarnation = os.urandom(8)
+        data = encode_header(date, incarnation) + encode_records(records)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        count_io("write", "bookings.seg", len(data))
+        return len(data), incarnation
+
+    def remove(self, date):
+        try:
+            os.remove(self.path(date))
+        except FileNotFoundError:
+            pass
+
+
+# ===============================================================
+#                     COLD ARCHIVE
+# ===============================================================
+
+class BookingArchive:
+    """Compacted segments of past dates, gzip-compressed, one file per date.
+
+    Nothing on the booking hot path reads these; they are only opened to
+    archive more bookings or to look at archived ones.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, date):
+        return os.path.join(self.directory, _file_name(date, ARCHIVE_SUFFIX))
+
+    def dates(self):
+        """Sorted flight dates with archived bookings."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            date for date in (_file_date(name, ARCHIVE_SUFFIX) for name in os.listdir(self.directory))
+            if date is not None
+        )
+
+    def read(self, date):
+        """Archived (status, seq, fields) records of a date, [] if none."""
+        try:
+            with gzip.open(self.path(date), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        count_io("read", "bookings.seg.gz", len(data))
+        return decode_records(data, decode_header(data)[2])[0]
+
+    def add(self, date, records):
+        """Archive live BOOKED records of a date, after any archived earlier.
+
+        Bookings already in the archive are skipped, so archiving a date
+        again after a crash part-way through does not duplicate them.
+        """
+        self.publish(self.stage(date, records))
+
+    def stage(self, date, records):
+        """Write what add() would to a temporary file, leaving the archive
+        as it is; returns the staged (temporary, final) paths for publish()
+        or discard()."""
+        os.makedirs(self.directory, exist_ok=True)
+        archived = self.read(date)
+        known = {fields[0] for _, _, fields in archived}
+        data = encode_header(date) + encode_records(
+            [*archived, *(record for record in records if record[2][0] not in known)])
+        path = self.path(date)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(data)
+        count_io("write", "bookings.seg.gz", len(data))
+        return tmp_path, path
+
+    @staticmethod
+    def publish(staged):
+        tmp_path, path = staged
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def discard(staged):
+        try:
+            os.remove(staged[0])
+        except FileNotFoundError:
+            pass
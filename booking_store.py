@@ -0,0 +1,543 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+
+from booking_ledger import BOOKED, CANCELLATIONS, CANCELLED, BookingArchive, BookingLedger
+from file_lock import FileLock
+from journal import CsvJournal, new_id
+
+
+def passenger_key(passenger_name):
+    return passenger_name.strip().lower()
+
+
+def _fields(booking):
+    """A booking dict as ledger record fields (booking_ledger.FIELDS)."""
+    return (booking["booking_id"], booking["passenger_name"], booking["flight_id"],
+            booking["class"], booking["fare"])
+
+
+# ===============================================================
+#                   ONE FLIGHT DATE'S BOOKINGS
+# ===============================================================
+
+class _DateBookings:
+    """Live bookings of one flight date, folded from its ledger segment.
+
+    Bookings keep the seq they were given on their date (their order in
+    the segment, kept by compaction). For paging, seqs are also kept in
+    sorted posting lists, one for the whole date and one per flight and
+    per class; cancelled ones stay in them and are skipped, until half a
+    list is dead and it gets rebuilt.
+    """
+
+    def __init__(self, date):
+        self.date = date
+        self.records = {}          # booking_id -> booking dict (live only), in seq order
+        self.seq_of = {}           # booking_id -> seq
+        self.by_seq = {}           # seq -> booking_id
+        # None (every booking), ("flight", lower-case flight_id) or
+        # ("class", class) -> ascending seqs
+        self.postings = {None: []}
+        self.dead_postings = {}    # posting key -> dead entries
+        # (passenger, flight_id) -> [booking_id, ...]; a lookup by
+        # (passenger, flight_id) on this date is one dict hit.
+        self.by_key = {}
+        self.counts = {}           # (lower-case flight or None, class or None) -> live bookings
+        self.flight_names = {}     # lower-case flight_id -> flight_id as booked
+        self.cancelled = {}        # (flight_id, class) -> cancellations, kept through compaction
+        self.next_seq = 0
+        self.dead = 0              # records in the segment that aren't live bookings
+
+        # Where this process stopped reading the segment
+        self.identity = None
+        self.offset = 0
+        self.incarnation = None
+
+    def _count(self, flight, flight_class, step):
+        for key in ((None, None), (flight, None), (None, flight_class), (flight, flight_class)):
+            total = self.counts.get(key, 0) + step
+            if total:
+                self.counts[key] = total
+            else:
+                del self.counts[key]
+
+    def apply(self, status, seq, fields):
+        """Fold one ledger record into the state."""
+        booking_id, passenger_name, flight_id, flight_class, fare = fields
+        if status == CANCELLATIONS:
+            tally = (flight_id.strip(), flight_class)
+            self.cancelled[tally] = self.cancelled.get(tally, 0) + int(fare)
+            return
+        self.next_seq = max(self.next_seq, seq + 1)
+        key = (passenger_key(passenger_name), flight_id.strip())
+        flight = flight_id.strip().lower()
+
+        if status == CANCELLED:
+            if self.records.pop(booking_id, None) is None:
+                self.dead += 1
+                return
+            self.dead += 2          # the booking and its tombstone
+            tally = (flight_id.strip(), flight_class)
+            self.cancelled[tally] = self.cancelled.get(tally, 0) + 1
+            del self.by_seq[self.seq_of.pop(booking_id)]
+            for posting in (None, ("flight", flight), ("class", flight_class)):
+                self._drop_dead(posting)
+            ids = self.by_key[key]
+            ids.remove(booking_id)
+            if not ids:
+                del self.by_key[key]
+            self._count(flight, flight_class, -1)
+        elif booking_id not in self.records:
+            self.records[booking_id] = {
+                "booking_id": booking_id,
+                "passenger_name": passenger_name,
+                "flight_id": flight_id,
+                "date": self.date,
+                "class": flight_class,
+                "fare": fare,
+            }
+            self.seq_of[booking_id] = seq
+            self.by_seq[seq] = booking_id
+            for posting in (None, ("flight", flight), ("class", flight_class)):
+                self.postings.setdefault(posting, []).append(seq)
+            self.by_key.setdefault(key, []).append(booking_id)
+            self.flight_names.setdefault(flight, flight_id.strip())
+            self._count(flight, flight_class, 1)
+        else:
+            self.dead += 1
+
+    def compacted(self):
+        """Records that reproduce this state: the live bookings, then one
+        CANCELLATIONS record per (flight, class) standing in for the tombstones."""
+        return [
+            *((BOOKED, self.seq_of[booking_id], _fields(b)) for booking_id, b in self.records.items()),
+            *((CANCELLATIONS, 0, ("", "", flight_id, flight_class, str(n)))
+              for (flight_id, flight_class), n in self.cancelled.items()),
+        ]
+
+    def _drop_dead(self, posting):
+        """Count one more dead entry in a posting list; rebuild it once half is dead."""
+        seqs = self.postings[posting]
+        dead = self.dead_postings.get(posting, 0) + 1
+        if dead * 2 > len(seqs):
+            seqs[:] = [seq for seq in seqs if seq in self.by_seq]
+            self.dead_postings.pop(posting, None)
+            if not seqs and posting is not None:
+                del self.postings[posting]
+        else:
+            self.dead_postings[posting] = dead
+
+
+# ===============================================================
+#                       BOOKING STORE
+# ===============================================================
+
+class BookingStore:
+    """Bookings in a ledger partitioned by flight date (see booking_ledger.py).
+
+    Every flight date has its own binary segment under data/bookings/.
+    A date is read (memory-mapped) the first time something asks for it,
+    then kept in step by reading only what other processes appended since.
+    A query for one date touches that date's segment alone; an unfiltered
+    one touches the hot dates, and never the archive. Every booking gets a
+    stable booking_id; a cancellation appends a tombstone record, and a
+    segment is rewritten once its dead records outnumber its live ones,
+    keeping a count of the cancellations it drops.
+
+    archive(before) moves the bookings of past dates into gzip-compressed
+    cold storage (data/bookings/archive/) and drops their segments.
+
+    Results are ordered by flight date, then by booking order within the
+    date; query() cursors are (date, seq) pairs.
+    """
+
+    DIRNAME = "bookings"
+    # The single-file journal this ledger replaces; migrated on load()
+    FILENAME = "bookings.csv"
+    HEADER = ["booking_id", "passenger_name", "flight_id", "date", "class", "fare", "status"]
+    LEGACY_HEADER = ["passenger_name", "flight_id", "date", "class", "fare"]
+
+    BOOKED = "BOOKED"
+    CANCELLED = "CANCELLED"
+
+    def __init__(self, data_dir="data", compact_every=256):
+        self.data_dir = data_dir
+        self.ledger = BookingLedger(os.path.join(data_dir, self.DIRNAME))
+        self.cold = BookingArchive(os.path.join(data_dir, self.DIRNAME, "archive"))
+        self.file_lock = FileLock(os.path.join(data_dir, "locks", "bookings.lock"))
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._dates = {}           # date -> _DateBookings, for the dates read so far
+        self._date_of = {}         # booking_id -> date, for the dates read so far
+        self._distinct = {}        # field -> sorted distinct values (cache)
+        self._version = 0          # records applied + dates dropped, see version()
+
+    passenger_key = staticmethod(passenger_key)
+
+    @staticmethod
+    def new_booking_id():
+        return new_id("BK")
+
+    # -----------------------------------------------------------
+    #                     READING SEGMENTS
+    # -----------------------------------------------------------
+    def _segment(self, date):
+        """The state of one date, read from its segment on first use. Caller holds _lock."""
+        segment = self._dates.get(date)
+        if segment is None:
+            segment = self._catch_up(_DateBookings(date))
+            self._dates[date] = segment
+        return segment
+
+    def _segments(self, date=None):
+        """One date's state, or that of every hot date (in date order)."""
+        if date is not None:
+            return [self._segment(date)]
+        return [self._segment(d) for d in self.ledger.dates()]
+
+    def _catch_up(self, segment):
+        """Apply whatever was written to a date's segment since it was last
+        read; returns the date's state (a new one if the file was replaced)."""
+        identity = self.ledger.identity(segment.date)
+        if identity == segment.identity:
+            return segment
+        records, offset, incarnation = self.ledger.read(segment.date, segment.offset, segment.incarnation)
+        if segment.incarnation is not None and incarnation != segment.incarnation:
+            # Compacted, archived or removed by another process: start over
+            segment = self._forget(segment)
+            self._dates[segment.date] = segment
+        self._apply(segment, records)
+        segment.identity, segment.offset, segment.incarnation = identity, offset, incarnation
+        return segment
+
+    def _apply(self, segment, records):
+        self._version += len(records)
+        for status, seq, fields in records:
+            segment.apply(status, seq, fields)
+            if status == CANCELLED:
+                self._date_of.pop(fields[0], None)
+            elif status == BOOKED:
+                self._date_of[fields[0]] = segment.date
+        if records:
+            self._distinct.clear()
+
+    def _forget(self, segment):
+        """Drop a date's bookings from memory; returns an empty state for it."""
+        for booking_id in segment.records:
+            self._date_of.pop(booking_id, None)
+        self._distinct.clear()
+        self._version += 1
+        return _DateBookings(segment.date)
+
+    def load(self):
+        """Move a bookings.csv journal left by an older version into the ledger.
+
+        Segments themselves are read on demand, so this is all a start needs.
+        """
+        if os.path.exists(os.path.join(self.data_dir, self.FILENAME)):
+            with self._lock, self.file_lock:
+                self._migrate_journal()
+
+    def refresh(self):
+        """Pick up what other processes wrote to the dates read so far."""
+        with self._lock:
+            for date, segment in list(self._dates.items()):
+                segment = self._catch_up(segment)
+                if segment.identity is None and not segment.records:
+                    del self._dates[date]       # archived, or never existed
+
+    # -----------------------------------------------------------
+    #                     LOADING / MIGRATION
+    # -----------------------------------------------------------
+    def _migrate_journal(self):
+        """Fold bookings.csv (any of its formats, tombstones included) into
+        segments, then keep the old file as bookings.csv.migrated."""
+        path = os.path.join(self.data_dir, self.FILENAME)
+        if not os.path.exists(path):
+            return      # another process got here first
+        rows = CsvJournal(path, self.HEADER).read()
+        if rows and rows[0] == self.LEGACY_HEADER:
+            rows = rows[1:]
+        live = {}
+        for row in rows:
+            if len(row) >= 7:
+                if row[6] == self.CANCELLED:
+                    live.pop(row[0], None)
+                else:
+                    live.setdefault(row[0], row[:6])
+            elif len(row) >= 5:     # before booking IDs
+                booking_id = self.new_booking_id()
+                live[booking_id] = [booking_id, *row[:5]]
+        self._import(live.values())
+        os.replace(path, path + ".migrated")
+        try:
+            os.remove(path + ".gen")
+        except FileNotFoundError:
+            pass
+
+    def import_rows(self, rows):
+        """Add (booking_id, passenger, flight_id, date, class, fare) rows as
+        they are, one append per date; for migrations and generated data."""
+        with self._lock, self.file_lock:
+            self._import(rows)
+
+    def _import(self, rows):
+        by_date = {}
+        for booking_id, passenger_name, flight_id, date, flight_class, fare in rows:
+            by_date.setdefault(date.strip(), []).append(
+                {"booking_id": booking_id, "passenger_name": passenger_name, "flight_id": flight_id,
+                 "class": flight_class, "fare": str(fare)})
+        for date, bookings in by_date.items():
+            segment = self._locked_segment(date)
+            self._write(segment, [(BOOKED, segment.next_seq + i, _fields(b)) for i, b in enumerate(bookings)])
+
+    # -----------------------------------------------------------
+    #                     QUERIES
+    # -----------------------------------------------------------
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return bool(self.ledger.dates())
+
+    def get(self, booking_id):
+        with self._lock:
+            date = self._date_of.get(booking_id)
+            if date is None:
+                self._segments()        # not in a date read so far: read them all
+                date = self._date_of.get(booking_id)
+            booking = self._dates[date].records.get(booking_id) if date is not None else None
+            return dict(booking) if booking else None
+
+    def find(self, passenger_name, flight_id, date=None):
+        """Live bookings for a passenger on a flight (optionally one date)."""
+        key = (self.passenger_key(passenger_name), flight_id.strip())
+        with self._lock:
+            return [
+                dict(segment.records[booking_id])
+                for segment in self._segments(date.strip() if date is not None else None)
+                for booking_id in segment.by_key.get(key, ())
+            ]
+
+    def all(self):
+        """Every live booking on a hot date, by flight date then booking order."""
+        with self._lock:
+            return [dict(b) for segment in self._segments() for b in segment.records.values()]
+
+    def version(self):
+        """A change counter: it moves by one for every booking or cancellation
+        applied, written here or read from another process, so it stands
+        still only while the bookings do. Reads no segment already read.
+        """
+        with self._lock:
+            self._segments()        # dates another process started since
+            return self._version
+
+    def snapshot(self):
+        """(all(), cancellations(), version()) as one consistent read."""
+        with self._lock:
+            return self.all(), self.cancellations(), self.version()
+
+    @staticmethod
+    def _filter_values(flight_id, date, flight_class):
+        """Normalized (flight, date, class) filter; None means any."""
+        return (
+            flight_id.strip().lower() if flight_id else None,
+            date.strip() if date else None,
+            flight_class or None,
+        )
+
+    def query(self, flight_id=None, date=None, flight_class=None, after=None, limit=50):
+        """One page of live bookings matching the filters, in all() order.
+
+        flight_id matches case-insensitively. Returns (bookings, cursor);
+        pass cursor back as `after` for the next page. cursor is None on
+        the last page. Only the dates from the cursor's on are read; dates
+        without a match are skipped on their counters, and within a date
+        the walk takes the shortest posting list among the filters, starts
+        at the cursor (bisect) and stops after one page.
+        """
+        flight, date, flight_class = self._filter_values(flight_id, date, flight_class)
+        after_date, after_seq = after if after is not None else (None, None)
+        with self._lock:
+            dates = [date] if date is not None else self.ledger.dates()
+            if after_date is not None:
+                dates = dates[bisect_left(dates, after_date):]
+            page, last = [], None
+            for day in dates:
+                segment = self._segment(day)
+                if not segment.counts.get((flight, flight_class)):
+                    continue
+                seqs = min(
+                    (segment.postings.get(key, ()) for key in (("flight", flight), ("class", flight_class))
+                     if key[1] is not None),
+                    key=len, default=segment.postings[None])
+                by_seq, records = segment.by_seq, segment.records
+                start = bisect_right(seqs, after_seq) if day == after_date else 0
+                for i in range(start, len(seqs)):
+                    booking_id = by_seq.get(seqs[i])
+                    if booking_id is None:
+                        continue
+                    booking = records[booking_id]
+                    if ((flight is None or booking["flight_id"].strip().lower() == flight)
+                            and (flight_class is None or booking["class"] == flight_class)):
+                        if len(page) == limit:
+                            return page, last
+                        page.append(dict(booking))
+                        last = (day, seqs[i])
+            return page, None
+
+    def count(self, flight_id=None, date=None, flight_class=None):
+        """Number of live bookings matching the filters (counter lookups, one per date)."""
+        flight, date, flight_class = self._filter_values(flight_id, date, flight_class)
+        with self._lock:
+            return sum(segment.counts.get((flight, flight_class), 0) for segment in self._segments(date))
+
+    def distinct(self, field):
+        """Sorted distinct values ("flight_id", "date" or "class") among live bookings."""
+        if field not in ("flight_id", "date", "class"):
+            raise KeyError(field)
+        with self._lock:
+            segments = self._segments()
+            values = self._distinct.get(field)
+            if values is None:
+                if field == "date":
+                    values = [s.date for s in segments if s.records]
+                elif field == "class":
+                    values = sorted({c for s in segments for f, c in s.counts if f is None and c is not None})
+                else:
+                    names = {}
+                    for s in segments:
+                        for f, c in s.counts:
+                            if f is not None and c is None:
+                                names.setdefault(f, s.flight_names[f])
+                    values = sorted(names.values())
+                self._distinct[field] = values
+            return list(values)
+
+    def _dates_between(self, date_from, date_to):
+        dates = self.ledger.dates()
+        lo = 0 if date_from is None else bisect_left(dates, date_from)
+        hi = len(dates) if date_to is None else bisect_right(dates, date_to)
+        return dates[lo:hi]
+
+    def between(self, date_from=None, date_to=None):
+        """Live bookings for flight dates date_from..date_to (inclusive, None
+        for open), in all() order; only those dates' segments are read."""
+        with self._lock:
+            return [
+                dict(b) for day in self._dates_between(date_from, date_to)
+                for b in self._segment(day).records.values()
+            ]
+
+    def cancellations(self, date_from=None, date_to=None):
+        """{(flight_id, date, class): cancelled bookings} for flight dates date_from..date_to."""
+        with self._lock:
+            return {
+                (flight_id, day, flight_class): n
+                for day in self._dates_between(date_from, date_to)
+                for (flight_id, flight_class), n in self._segment(day).cancelled.items()
+            }
+
+    # -----------------------------------------------------------
+    #                     WRITES
+    # -----------------------------------------------------------
+    def _write(self, segment, records):
+        """Append records to a date's segment and apply them.
+
+        Caller holds both locks and has caught the segment up.
+        """
+        if not records:
+            return
+        segment.offset, segment.incarnation = self.ledger.append(segment.date, records, segment.offset)
+        segment.identity = self.ledger.identity(segment.date)
+        self._apply(segment, records)
+        # Rewrite once dead records outnumber live ones (and compact_every),
+        # so rewrite cost stays amortized O(1) per appended record.
+        if segment.dead >= max(self.compact_every, len(segment.records)):
+            segment.offset, segment.incarnation = self.ledger.rewrite(segment.date, segment.compacted())
+            segment.identity = self.ledger.identity(segment.date)
+            segment.dead = 0
+
+    def _locked_segment(self, date):
+        """A date's state, caught up under both locks (which the caller holds)."""
+        return self._catch_up(self._segment(date))
+
+    def add(self, passenger_name, flight_id, date, flight_class, fare):
+        """Append a booking and return it (with its new booking_id)."""
+        return self.add_many([(passenger_name, flight_id, date, flight_class, fare)])[0]
+
+    def add_many(self, bookings):
+        """Append several (passenger, flight_id, date, class, fare) bookings, one write per date."""
+        rows = [
+            (date.strip(), (self.new_booking_id(), passenger_name, flight_id, flight_class, str(fare)))
+            for passenger_name, flight_id, date, flight_class, fare in bookings
+        ]
+        by_date = {}
+        for date, fields in rows:
+            by_date.setdefault(date, []).append(fields)
+        with self._lock, self.file_lock:
+            for date, fields in by_date.items():
+                segment = self._locked_segment(date)
+                self._write(segment, [(BOOKED, segment.next_seq + i, f) for i, f in enumerate(fields)])
+            return [dict(self._dates[date].records[fields[0]]) for date, fields in rows]
+
+    def _cancel(self, segment, booking_id):
+        booking = dict(segment.records[booking_id])
+        self._write(segment, [(CANCELLED, segment.seq_of[booking_id], _fields(booking))])
+        return booking
+
+    def cancel(self, booking_id):
+        """Tombstone a live booking; returns it, or None if it was not live."""
+        with self._lock, self.file_lock:
+            date = self._date_of.get(booking_id)
+            if date is None:
+                self._segments()
+                date = self._date_of.get(booking_id)
+            if date is None:
+                return None
+            segment = self._locked_segment(date)
+            if booking_id not in segment.records:
+                return None
+            return self._cancel(segment, booking_id)
+
+    def cancel_matching(self, passenger_name, flight_id, date):
+        """Tombstone the oldest live booking for (passenger, flight, date)."""
+        with self._lock, self.file_lock:
+            segment = self._locked_segment(date.strip())
+            ids = segment.by_key.get((self.passenger_key(passenger_name), flight_id.strip()))
+            return self._cancel(segment, ids[0]) if ids else None
+
+    # -----------------------------------------------------------
+    #                     ARCHIVE
+    # -----------------------------------------------------------
+    def archive(self, before):
+        """Move the bookings of flight dates before `before` to cold storage.
+
+        Each date's live bookings are appended to its gzip archive file and
+        its segment is deleted. Returns the number of bookings archived.
+        """
+        moved = 0
+        with self._lock, self.file_lock:
+            for date in [d for d in self.ledger.dates() if d < before]:
+                segment = self._locked_segment(date)
+                live = [(BOOKED, segment.seq_of[i], _fields(b)) for i, b in segment.records.items()]
+                if live:
+                    self.cold.add(date, live)
+                self.ledger.remove(date)
+                self._forget(segment)
+                del self._dates[date]
+                moved += len(live)
+        return moved
+
+    def archived_dates(self):
+        """Sorted flight dates with bookings in cold storage."""
+        return self.cold.dates()
+
+    def archived(self, date):
+        """The archived bookings of one flight date."""
+        return [
+            dict(zip(("booking_id", "passenger_name", "flight_id", "class", "fare"), fields), date=date)
+            for _, _, fields in self.cold.read(date)
+        ]
@@ -0,0 +1,80 @@
+import os
+import pickle
+from array import array
+
+from metrics import count_io
+
+# Bump when the layout below changes; older snapshots are then ignored
+SNAPSHOT_VERSION = 1
+STRING_FIELDS = ("flight_id", "source", "destination", "time", "date")
+
+# ===============================================================
+#                 BINARY SNAPSHOT OF FLIGHTS.CSV
+# ===============================================================
+
+def _encode(values):
+    """(distinct values, array of codes) for a column of strings."""
+    table, codes = {}, array("I")
+    for value in values:
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        codes.append(code)
+    return list(table), codes
+
+
+def write_snapshot(path, rows, source_signature):
+    """Save Flight() argument rows as a snapshot of the catalog file whose
+    catalog_signature is source_signature.
+
+    Columns are stored typed: strings as a table of distinct values plus
+    an array of codes, fares and seats as flat arrays. Returns False (and
+    writes nothing) if a row has a fare or seat count that isn't a number.
+    """
+    rows = list(rows)
+    try:
+        base_prices = array("d", (float(row[4]) for row in rows))
+        seats = array("i", (int(n) for row in rows for n in row[6:9]))
+    except (TypeError, ValueError):
+        return False
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "source": source_signature,
+        "count": len(rows),
+        "strings": {name: _encode(row[i] for row in rows)
+                    for name, i in zip(STRING_FIELDS, (0, 1, 2, 3, 5))},
+        "base_price": base_prices,
+        "seats": seats,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        count_io("write", os.path.basename(path), f.tell())
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_snapshot(path, source_signature):
+    """The rows saved by write_snapshot(), or None if there is no snapshot,
+    it is of another version, or it was taken of another catalog file.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+            count_io("read", os.path.basename(path), f.tell())
+    except FileNotFoundError:
+        return None
+    except Exception:       # torn or foreign file: treat as stale
+        return None
+    if (not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION
+            or snapshot.get("source") != source_signature):
+        return None
+
+    strings = []
+    for name in STRING_FIELDS:
+        values, codes = snapshot["strings"][name]
+        strings.append([values[code] for code in codes])
+    flight_ids, sources, destinations, times, dates = strings
+    seats = snapshot["seats"].tolist()
+    return list(zip(flight_ids, sources, destinations, times, snapshot["base_price"].tolist(), dates,
+                    seats[0::3], seats[1::3], seats[2::3]))
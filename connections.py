@@ -0,0 +1,183 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import date as Date, datetime, timedelta
+
+from utils import parse_time
+
+# flights.csv has departure times only, so every leg is assumed to take
+# DEFAULT_BLOCK_MINUTES unless the route has its own entry in block_times.
+DEFAULT_BLOCK_MINUTES = 120
+MIN_CONNECTION_MINUTES = 45
+MAX_LAYOVER_MINUTES = 12 * 60
+MAX_STOPS = 2
+
+# ===============================================================
+#                 TIME-EXPANDED ROUTE GRAPH
+# ===============================================================
+
+def _city(name):
+    return name.strip().lower()
+
+
+def _clock(minutes):
+    """'YYYY-MM-DD HH:MM' for an absolute minute count."""
+    return (datetime.min + timedelta(minutes=minutes - 1440)).strftime("%Y-%m-%d %H:%M")
+
+
+class ConnectionGraph:
+    """Flights as timed edges between cities, for connecting-itinerary search.
+
+    Every flight is an edge from (source, departure) to (destination,
+    departure + block time), with times as absolute minutes. Each city
+    keeps its departures sorted by time, so the flights leaving a city
+    within a connection window are one bisect away. add() / remove()
+    update a single city's list, so the graph follows add_flight /
+    delete_flight without a rebuild.
+    """
+
+    def __init__(self, flights=(), block_minutes=DEFAULT_BLOCK_MINUTES, block_times=None):
+        self.block_minutes = block_minutes
+        self.block_times = {(_city(s), _city(d)): m for (s, d), m in (block_times or {}).items()}
+        self._times = {}      # city -> sorted departure minutes
+        self._legs = {}       # city -> flights, parallel to _times
+        for flight in flights:
+            self.add(flight)
+
+    @staticmethod
+    def departure_minutes(flight):
+        """Absolute departure minute of a flight, or None if its date/time is unusable."""
+        clock = parse_time(flight.time)
+        try:
+            day = Date.fromisoformat(flight.date).toordinal()
+        except (TypeError, ValueError):
+            return None
+        return None if clock is None else day * 1440 + clock
+
+    def block_time(self, flight):
+        return self.block_times.get((_city(flight.source), _city(flight.destination)), self.block_minutes)
+
+    def add(self, flight):
+        departs = self.departure_minutes(flight)
+        if departs is None:
+            return
+        city = _city(flight.source)
+        times = self._times.setdefault(city, [])
+        legs = self._legs.setdefault(city, [])
+        i = bisect_right(times, departs)
+        times.insert(i, departs)
+        legs.insert(i, flight)
+
+    def remove(self, flight):
+        departs = self.departure_minutes(flight)
+        city = _city(flight.source)
+        times, legs = self._times.get(city), self._legs.get(city)
+        if departs is None or times is None:
+            return
+        for i in range(bisect_left(times, departs), bisect_right(times, departs)):
+            if legs[i] == flight:
+                del times[i]
+                del legs[i]
+                return
+
+    def departures(self, city, start, end):
+        """(departure minute, flight) pairs leaving city with start <= departure <= end."""
+        times = self._times.get(city)
+        if not times:
+            return []
+        lo, hi = bisect_left(times, start), bisect_right(times, end)
+        return zip(times[lo:hi], self._legs[city][lo:hi])
+
+    # -----------------------------------------------------------
+    #                     ITINERARY SEARCH
+    # -----------------------------------------------------------
+    def search(self, source, destination, date, flight_class="Economy", passengers=1,
+               max_stops=MAX_STOPS, min_connection=MIN_CONNECTION_MINUTES,
+               max_layover=MAX_LAYOVER_MINUTES):
+        """Best itineraries from source to destination leaving on date.
+
+        A multi-criteria label-setting search (in the spirit of McRAPTOR):
+        partial itineraries are expanded in order of arrival time, and one
+        is dropped as soon as another reaching the same city is no later,
+        no dearer and has no more stops. Legs without passengers seats
+        left in flight_class are never taken. Connections need at least
+        min_connection and at most max_layover minutes on the ground.
+
+        Returns the Pareto-optimal itineraries (arrival time, fare, stops),
+        fastest first; the cheapest is min(..., key=fare). Each is a dict
+        with legs (flights), departure, arrival, duration_minutes, stops
+        and fare (per passenger).
+        """
+        origin, target = _city(source), _city(destination)
+        try:
+            day = Date.fromisoformat(date).toordinal() * 1440
+        except (TypeError, ValueError):
+            return []
+        if origin == target:
+            return []
+
+        fare_cache = {}
+
+        def fare_of(flight):
+            key = id(flight)
+            fare = fare_cache.get(key)
+            if fare is None:
+                fare = fare_cache[key] = flight.get_price_by_class(flight_class)
+            return fare
+
+        # Heap entries: (arrival, fare, stops, tie-break, city, legs, first departure)
+        heap = []
+        counter = 0
+        bags = {}             # city -> [(arrival, fare, stops)] non-dominated labels
+        found = []            # complete itineraries, in arrival order
+        found_labels = []
+
+        def dominated(labels, arrival, fare, stops):
+            return any(a <= arrival and f <= fare and s <= stops for a, f, s in labels)
+
+        def push(flight, arrival, fare, stops, legs, departs):
+            nonlocal counter
+            city = _city(flight.destination)
+            if dominated(found_labels, arrival, fare, stops):
+                return
+            labels = bags.setdefault(city, [])
+            if dominated(labels, arrival, fare, stops):
+                return
+            labels[:] = [l for l in labels if not (arrival <= l[0] and fare <= l[1] and stops <= l[2])]
+            labels.append((arrival, fare, stops))
+            counter += 1
+            heapq.heappush(heap, (arrival, fare, stops, counter, city, legs, departs))
+
+        for departs, flight in self.departures(origin, day, day + 1439):
+            if flight.available(flight_class) < passengers:
+                continue
+            push(flight, departs + self.block_time(flight), fare_of(flight), 0, (flight,), departs)
+
+        while heap:
+            arrival, fare, stops, _, city, legs, departs = heapq.heappop(heap)
+            if city == target:
+                if not dominated(found_labels, arrival, fare, stops):
+                    found_labels.append((arrival, fare, stops))
+                    found.append((arrival, fare, stops, legs, departs))
+                continue
+            if stops >= max_stops or (arrival, fare, stops) not in bags.get(city, ()):
+                continue
+            visited = {_city(leg.source) for leg in legs}
+            for leg_departs, flight in self.departures(city, arrival + min_connection, arrival + max_layover):
+                if _city(flight.destination) in visited:
+                    continue
+                if flight.available(flight_class) < passengers:
+                    continue
+                push(flight, leg_departs + self.block_time(flight), round(fare + fare_of(flight), 2),
+                     stops + 1, legs + (flight,), departs)
+
+        return [
+            {
+                "legs": list(legs),
+                "departure": _clock(departs),
+                "arrival": _clock(arrival),
+                "duration_minutes": arrival - departs,
+                "stops": stops,
+                "fare": fare,
+            }
+            for arrival, fare, stops, legs, departs in found
+        ]
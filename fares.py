@@ -0,0 +1,113 @@
+import numpy as np
+
+from flight_system import CLASS_MULTIPLIERS, DEFAULT_MULTIPLIER, TAX_LABEL, TAX_RATE
+
+
+def round2(values):
+    """Round to 2 decimals exactly like Python's round(x, 2), elementwise.
+
+    np.round scales by 100 first, and that product can land on the other
+    side of .5 from the true decimal value. Only values within an ulp
+    of such a tie can differ, so just those are redone with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 1e-12 + 1e-12
+    if near_tie.any():
+        rounded[near_tie] = [round(v, 2) for v in values[near_tie].tolist()]
+    return rounded
+
+
+# ===============================================================
+#                     BATCH FARE ENGINE
+# ===============================================================
+
+class FareEngine:
+    """Prices many (flight, class, passengers) combinations in one NumPy pass.
+
+    The multiplier and tax tables are fixed when the engine is built. With
+    the defaults every fare equals Flight.get_price_by_class() for the
+    same flight and class, to the last bit.
+    """
+
+    def __init__(self, multipliers=None, tax_rate=TAX_RATE, default_multiplier=DEFAULT_MULTIPLIER):
+        self.multipliers = dict(CLASS_MULTIPLIERS if multipliers is None else multipliers)
+        self.tax_rate = tax_rate
+        self.default_multiplier = default_multiplier
+        self.tax_label = TAX_LABEL if tax_rate == TAX_RATE else f"Tax ({tax_rate:.0%})"
+        self.classes = list(self.multipliers)
+        self._class_codes = {name: i for i, name in enumerate(self.classes)}
+        # Last slot is the fallback for unknown classes
+        self._multiplier_table = np.array(
+            [*self.multipliers.values(), default_multiplier], dtype=np.float64)
+
+    def multipliers_for(self, classes):
+        """Class multiplier for each class name in classes (any array shape)."""
+        classes = np.asarray(classes, dtype=object)
+        names, inverse = np.unique(classes, return_inverse=True)
+        codes = np.array([self._class_codes.get(name, len(self.classes)) for name in names], dtype=np.intp)
+        return self._multiplier_table[codes[inverse]].reshape(classes.shape)
+
+    @staticmethod
+    def base_prices(flights):
+        """base_price of every flight as a float64 array."""
+        return np.fromiter((f.base_price for f in flights), dtype=np.float64, count=len(flights))
+
+    # -----------------------------------------------------------
+    #                     PRICING
+    # -----------------------------------------------------------
+    def quote(self, base_prices, classes, passengers=1):
+        """Price every combination of the (broadcast) inputs.
+
+        base_prices, classes and passengers are arrays (or scalars) that
+        broadcast together, e.g. base_prices[:, None] against a row of
+        classes prices every flight in every class. Returns a dict of
+        arrays of the broadcast shape:
+            base, multiplier, tax       per passenger (tax rounded)
+            fare                        per passenger, rounded
+            total                       fare x passengers
+        """
+        base = np.asarray(base_prices, dtype=np.float64)
+        multiplier = self.multipliers_for(classes)
+        base, multiplier, passengers = np.broadcast_arrays(base, multiplier, np.asarray(passengers))
+
+        # Same operation order as Flight.get_price_by_class
+        subtotal = base * multiplier
+        tax = subtotal * self.tax_rate
+        fare = round2(subtotal + tax)
+        return {
+            "base": base,
+            "multiplier": multiplier,
+            "tax": round2(tax),
+            "fare": fare,
+            "total": fare * passengers,
+        }
+
+    def price_table(self, flights, classes=None):
+        """(len(flights), len(classes)) array of per-passenger fares.
+
+        Defaults to every known class in table order, e.g. one row of
+        Economy / Business / First Class prices per search result.
+        """
+        classes = self.classes if classes is None else list(classes)
+        return self.quote(self.base_prices(flights)[:, None], np.array(classes, dtype=object)[None, :])["fare"]
+
+    def breakdowns(self, flights, classes):
+        """get_price_by_class(cls, breakdown=True) for each (flight, class) pair.
+
+        classes is one class name for all flights or one per flight.
+        """
+        if isinstance(classes, str):
+            classes = [classes] * len(flights)
+        q = self.quote(self.base_prices(flights), np.array(classes, dtype=object))
+        return [
+            {
+                "Base Fare": base,
+                "Class Multiplier": multiplier,
+                self.tax_label: tax,
+                "Total Fare": fare,
+            }
+            for base, multiplier, tax, fare in zip(
+                q["base"].tolist(), q["multiplier"].tolist(), q["tax"].tolist(), q["fare"].tolist())
+        ]
@@ -0,0 +1,124 @@
+import os
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ===============================================================
+#                 INTER-PROCESS FILE LOCK
+# ===============================================================
+
+class FileLock:
+    """Exclusive lock backed by a lock file.
+
+    Serializes threads of this process (threading.Lock) and other processes
+    (flock on POSIX, msvcrt.locking on Windows). The lock file descriptor is
+    opened once and kept for the life of the object.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def _open(self):
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        try:
+            fd = self._open()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class KeyedLocks:
+    """One lock per key, for fine-grained serialization.
+
+    In-process each key gets its own threading.Lock; across processes keys
+    are striped over a fixed pool of lock files, so unrelated keys rarely
+    contend.
+    """
+
+    def __init__(self, lock_dir, prefix, stripes=64):
+        self.lock_dir = lock_dir
+        self.prefix = prefix
+        self.stripes = stripes
+        self._guard = threading.Lock()
+        self._thread_locks = {}
+        self._file_locks = {}
+
+    def _locks_for(self, key):
+        # crc32 rather than hash(): it must agree between processes
+        stripe = zlib.crc32("|".join(map(str, key)).encode("utf-8")) % self.stripes
+        with self._guard:
+            thread_lock = self._thread_locks.get(key)
+            if thread_lock is None:
+                thread_lock = self._thread_locks[key] = threading.Lock()
+            file_lock = self._file_locks.get(stripe)
+            if file_lock is None:
+                path = os.path.join(self.lock_dir, f"{self.prefix}-{stripe}.lock")
+                file_lock = self._file_locks[stripe] = FileLock(path)
+        return thread_lock, file_lock
+
+    def hold(self, key):
+        """Context manager holding the lock for key."""
+        return _HeldKey(*self._locks_for(key))
+
+
+class _HeldKey:
+    def __init__(self, thread_lock, file_lock):
+        self._thread_lock = thread_lock
+        self._file_lock = file_lock
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file_lock.acquire()
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._file_lock.release()
+        finally:
+            self._thread_lock.release()
+        return False
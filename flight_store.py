@@ -0,0 +1,286 @@
+from collections import deque
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from flight_system import CLASS_INDEX as _CLASS_COLUMN, SEAT_CLASSES, Flight
+
+_COLUMNS = ("flight_id_codes", "source_codes", "destination_codes", "time_codes",
+            "date_codes", "base_price", "seats", "available", "alive")
+
+# ===============================================================
+#                     INTERNED STRING COLUMNS
+# ===============================================================
+
+class _Categories:
+    """Distinct values of a string column; rows store small integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def where(self, predicate):
+        """Boolean table over codes: True where predicate(value) holds."""
+        return np.fromiter((predicate(v) for v in self.values), dtype=bool, count=len(self.values))
+
+
+# ===============================================================
+#                  COLUMNAR FLIGHT STORE
+# ===============================================================
+
+class ColumnarFlightStore:
+    """Flights kept as NumPy columns instead of one Flight object each.
+
+    Prices and seat counts are numeric arrays; flight IDs, cities, times
+    and dates are interned and stored as int32 codes. Rows are only ever
+    appended (arrays grow by doubling) and deleted rows are masked out, so
+    a row number stays valid for the life of the store.
+
+    Iterating or indexing yields FlightView objects, which behave like
+    Flight (attributes, seats / available_seats mappings,
+    get_price_by_class) and read and write the columns in place. Bulk
+    queries (select / rows) are evaluated as vectorized masks.
+    """
+
+    def __init__(self, capacity=1024):
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self._size = 0
+        self._live = None              # cached row numbers of live flights
+        self.waitlists = {}            # row -> waitlist deque, made on first use
+        self.flight_ids = _Categories()
+        self.sources = _Categories()
+        self.destinations = _Categories()
+        self.times = _Categories()
+        self.dates = _Categories()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.flight_id_codes = np.zeros(capacity, dtype=np.int32)
+        self.source_codes = np.zeros(capacity, dtype=np.int32)
+        self.destination_codes = np.zeros(capacity, dtype=np.int32)
+        self.time_codes = np.zeros(capacity, dtype=np.int32)
+        self.date_codes = np.zeros(capacity, dtype=np.int32)
+        self.base_price = np.zeros(capacity, dtype=np.float64)
+        self.seats = np.zeros((capacity, len(SEAT_CLASSES)), dtype=np.int32)
+        self.available = np.zeros((capacity, len(SEAT_CLASSES)), dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in _COLUMNS}
+        self._allocate(max(1024, 2 * len(self.alive)))
+        for name, column in old.items():
+            getattr(self, name)[:self._size] = column[:self._size]
+
+    # -----------------------------------------------------------
+    #                     ROWS
+    # -----------------------------------------------------------
+    def add(self, flight_id, source, destination, time, base_price, date,
+            econ_seats, business_seats, first_class_seats):
+        """Append a flight (same arguments as Flight) and return its view."""
+        if self._size == len(self.alive):
+            self._grow()
+        row = self._size
+        self.flight_id_codes[row] = self.flight_ids.code(flight_id)
+        self.source_codes[row] = self.sources.code(source)
+        self.destination_codes[row] = self.destinations.code(destination)
+        self.time_codes[row] = self.times.code(time)
+        self.date_codes[row] = self.dates.code(date)
+        self.base_price[row] = float(base_price)
+        self.seats[row] = (int(econ_seats), int(business_seats), int(first_class_seats))
+        # Available seats start as total seats
+        self.available[row] = self.seats[row]
+        self.alive[row] = True
+        self._size += 1
+        self._live = None
+        return FlightView(self, row)
+
+    def remove(self, flight):
+        """Delete the row behind a view."""
+        self.alive[flight._row] = False
+        self.waitlists.pop(flight._row, None)
+        self._live = None
+
+    def clear(self):
+        self._reset(1024)
+
+    def live_rows(self):
+        """Row numbers of every flight still in the store, in insertion order."""
+        if self._live is None:
+            self._live = np.flatnonzero(self.alive[:self._size])
+        return self._live
+
+    def __len__(self):
+        return len(self.live_rows())
+
+    def __iter__(self):
+        return (FlightView(self, int(row)) for row in self.live_rows())
+
+    def __getitem__(self, i):
+        return FlightView(self, int(self.live_rows()[i]))
+
+    def view(self, row):
+        return FlightView(self, int(row))
+
+    # -----------------------------------------------------------
+    #                     BULK QUERIES
+    # -----------------------------------------------------------
+    def rows(self, source=None, destination=None, date_from=None, date_to=None,
+             flight_class="Economy", min_seats=0):
+        """Row numbers of flights matching every given condition.
+
+        Cities match case-insensitively; dates are ISO strings and the range
+        is inclusive. Conditions on interned columns are evaluated once per
+        distinct value, then broadcast to the rows through their codes.
+        """
+        n = self._size
+        mask = self.alive[:n].copy()
+        if source is not None:
+            wanted = source.strip().lower()
+            mask &= self.sources.where(lambda v: v.strip().lower() == wanted)[self.source_codes[:n]]
+        if destination is not None:
+            wanted = destination.strip().lower()
+            mask &= self.destinations.where(lambda v: v.strip().lower() == wanted)[self.destination_codes[:n]]
+        if date_from is not None or date_to is not None:
+            lo, hi = date_from or "", date_to or "\uffff"
+            mask &= self.dates.where(lambda v: lo <= v <= hi)[self.date_codes[:n]]
+        if min_seats:
+            mask &= self.available[:n, _CLASS_COLUMN[flight_class]] >= min_seats
+        return np.flatnonzero(mask)
+
+    def select(self, **conditions):
+        """Views of the flights matching rows(**conditions)."""
+        return [FlightView(self, int(row)) for row in self.rows(**conditions)]
+
+    def cities(self):
+        """Every source / destination with at least one live flight."""
+        live = self.live_rows()
+        return (
+            {self.sources.values[c] for c in np.unique(self.source_codes[live])}
+            | {self.destinations.values[c] for c in np.unique(self.destination_codes[live])}
+        )
+
+    def nbytes(self):
+        """Bytes held by the NumPy columns."""
+        return sum(getattr(self, name).nbytes for name in _COLUMNS)
+
+
+# ===============================================================
+#                   FLIGHT-COMPATIBLE ROW VIEW
+# ===============================================================
+
+class _SeatRow(MutableMapping):
+    """{class: seats} mapping over one row of a seat-count column."""
+
+    __slots__ = ("_column", "_row")
+
+    def __init__(self, column, row):
+        self._column = column
+        self._row = row
+
+    def __getitem__(self, flight_class):
+        return int(self._column[self._row, _CLASS_COLUMN[flight_class]])
+
+    def __setitem__(self, flight_class, seats):
+        self._column[self._row, _CLASS_COLUMN[flight_class]] = seats
+
+    def __delitem__(self, flight_class):
+        raise TypeError("seat classes are fixed")
+
+    def __iter__(self):
+        return iter(SEAT_CLASSES)
+
+    def __len__(self):
+        return len(SEAT_CLASSES)
+
+    def __contains__(self, flight_class):
+        return flight_class in _CLASS_COLUMN
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class FlightView(Flight):
+    """A Flight backed by one row of a ColumnarFlightStore.
+
+    Views are cheap and made on demand; two views of the same row compare
+    equal.
+    """
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __eq__(self, other):
+        return isinstance(other, FlightView) and other._store is self._store and other._row == self._row
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+    def __repr__(self):
+        return f"FlightView({self.flight_id!r}, {self.date!r})"
+
+    @property
+    def flight_id(self):
+        return self._store.flight_ids.values[self._store.flight_id_codes[self._row]]
+
+    @property
+    def source(self):
+        return self._store.sources.values[self._store.source_codes[self._row]]
+
+    @property
+    def destination(self):
+        return self._store.destinations.values[self._store.destination_codes[self._row]]
+
+    @property
+    def time(self):
+        return self._store.times.values[self._store.time_codes[self._row]]
+
+    @property
+    def date(self):
+        return self._store.dates.values[self._store.date_codes[self._row]]
+
+    @property
+    def base_price(self):
+        return float(self._store.base_price[self._row])
+
+    @property
+    def seats(self):
+        return _SeatRow(self._store.seats, self._row)
+
+    @seats.setter
+    def seats(self, seats):
+        self.seats.update(seats)
+
+    @property
+    def available_seats(self):
+        return _SeatRow(self._store.available, self._row)
+
+    @available_seats.setter
+    def available_seats(self, seats):
+        self.available_seats.update(seats)
+
+    @property
+    def waitlist(self):
+        # Views are made on demand, so the deque is kept by the store
+        waitlist = self._store.waitlists.get(self._row)
+        if waitlist is None:
+            waitlist = self._store.waitlists[self._row] = deque()
+        return waitlist
+
+    def available(self, flight_class):
+        i = _CLASS_COLUMN.get(flight_class)
+        return 0 if i is None else int(self._store.available[self._row, i])
@@ -1,52 +1,162 @@
-import csv
-import os
+import sys
+import threading
+from array import array
 from collections import deque
+from collections.abc import MutableMapping
+from enum import IntEnum
+
+from analytics import BookingAnalytics, range_report
+from connections import ConnectionGraph
+from metrics import instrument
+from ranking import RouteRanking, rank, top_k
+from route_summary import RouteSummaries
+from storage import open_storage
+
+# Fare rules: price = base fare x class multiplier, plus tax on top.
+# Unknown classes are priced like Economy.
+CLASS_MULTIPLIERS = {
+    "Economy": 1.0,
+    "Business": 1.5,
+    "First Class": 2.0
+}
+DEFAULT_MULTIPLIER = 1.0
+TAX_RATE = 0.18
+TAX_LABEL = f"Tax ({TAX_RATE:.0%})"
+
+# Seat classes, in the order their counters are stored
+class SeatClass(IntEnum):
+    ECONOMY = 0
+    BUSINESS = 1
+    FIRST = 2
+
+
+SEAT_CLASSES = ("Economy", "Business", "First Class")
+CLASS_INDEX = {name: SeatClass(i) for i, name in enumerate(SEAT_CLASSES)}
+_AVAILABLE_INDEX = {name: len(SEAT_CLASSES) + i for name, i in CLASS_INDEX.items()}
+
+# What book_group does when a class has fewer free seats than the group needs
+GROUP_ALL_OR_NOTHING = "all_or_nothing"     # book nobody
+GROUP_WAITLIST_REST = "waitlist_rest"       # book the seats left, waitlist the others
+GROUP_WAITLIST_ALL = "waitlist_all"         # keep the group together on the waitlist
+GROUP_POLICIES = (GROUP_ALL_OR_NOTHING, GROUP_WAITLIST_REST, GROUP_WAITLIST_ALL)
 
 # ===============================================================
 #                       FLIGHT CLASS
 # ===============================================================
 
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class _SeatCounts(MutableMapping):
+    """{class: seats} mapping over three counters of a Flight's seat array."""
+
+    __slots__ = ("_counts", "_offset")
+
+    def __init__(self, counts, offset):
+        self._counts = counts
+        self._offset = offset
+
+    def __getitem__(self, flight_class):
+        return self._counts[self._offset + CLASS_INDEX[flight_class]]
+
+    def __setitem__(self, flight_class, seats):
+        self._counts[self._offset + CLASS_INDEX[flight_class]] = seats
+
+    def __delitem__(self, flight_class):
+        raise TypeError("seat classes are fixed")
+
+    def get(self, flight_class, default=None):
+        i = CLASS_INDEX.get(flight_class)
+        return default if i is None else self._counts[self._offset + i]
+
+    def __iter__(self):
+        return iter(SEAT_CLASSES)
+
+    def __len__(self):
+        return len(SEAT_CLASSES)
+
+    def __contains__(self, flight_class):
+        return flight_class in CLASS_INDEX
+
+    def copy(self):
+        return dict(self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
 class Flight:
+    """One flight on one date.
+
+    Kept lean, since the catalog can hold millions: no per-instance
+    __dict__, the six seat counters (capacity, then available, per
+    SeatClass) in one int array, interned city / date / time strings, and
+    a waitlist deque only once something asks for it. seats and
+    available_seats are {class: count} mappings over that array.
+    """
+
+    __slots__ = ("flight_id", "source", "destination", "time", "base_price", "date",
+                 "_counts", "_waitlist")
+
     def __init__(self, flight_id, source, destination, time, base_price, date,
                  econ_seats, business_seats, first_class_seats):
-        self.flight_id = flight_id
-        self.source = source
-        self.destination = destination
-        self.time = time
+        self.flight_id = _intern(flight_id)
+        self.source = _intern(source)
+        self.destination = _intern(destination)
+        self.time = _intern(time)
         self.base_price = float(base_price)
-        self.date = date
-
-        # Seat structure by class
-        self.seats = {
-            "Economy": int(econ_seats),
-            "Business": int(business_seats),
-            "First Class": int(first_class_seats)
-        }
+        self.date = _intern(date)
 
         # Available seats start as total seats
-        self.available_seats = self.seats.copy()
-        self.waitlist = deque()
+        capacity = (int(econ_seats), int(business_seats), int(first_class_seats))
+        self._counts = array("i", capacity + capacity)
+        self._waitlist = None
+
+    @property
+    def seats(self):
+        return _SeatCounts(self._counts, 0)
+
+    @seats.setter
+    def seats(self, seats):
+        self.seats.update(seats)
+
+    @property
+    def available_seats(self):
+        return _SeatCounts(self._counts, len(SEAT_CLASSES))
+
+    @available_seats.setter
+    def available_seats(self, seats):
+        self.available_seats.update(seats)
+
+    @property
+    def waitlist(self):
+        if self._waitlist is None:
+            self._waitlist = deque()
+        return self._waitlist
+
+    def available(self, flight_class):
+        """Free seats in a class (0 for an unknown class), without building a mapping view."""
+        i = _AVAILABLE_INDEX.get(flight_class)
+        return 0 if i is None else self._counts[i]
 
     def get_price_by_class(self, flight_class, breakdown=False):
-        """Returns price or breakdown for selected class."""
-        multipliers = {
-            "Economy": 1.0,
-            "Business": 1.5,
-            "First Class": 2.0
-        }
-        tax_rate = 0.18
+        """Returns price or breakdown for selected class.
 
+        For many flights / classes at once use fares.FareEngine, which
+        gives identical results.
+        """
         base = self.base_price
-        class_multiplier = multipliers.get(flight_class, 1.0)
+        class_multiplier = CLASS_MULTIPLIERS.get(flight_class, DEFAULT_MULTIPLIER)
         total = base * class_multiplier
-        tax = total * tax_rate
+        tax = total * TAX_RATE
         total_fare = total + tax
 
         if breakdown:
             return {
                 "Base Fare": base,
                 "Class Multiplier": class_multiplier,
-                "Tax (18%)": round(tax, 2),
+                TAX_LABEL: round(tax, 2),
                 "Total Fare": round(total_fare, 2)
             }
         return round(total_fare, 2)
@@ -56,83 +166,355 @@ class Flight:
 #                     FLIGHT SYSTEM CLASS
 # ===============================================================
 
+@instrument("flight_system")
 class FlightSystem:
-    def __init__(self):
-        self.flights = []
+    def __init__(self, data_dir="data", columnar=False, storage="csv"):
+        self.data_dir = data_dir
+
+        # The catalog is a list of Flight objects, or with columnar=True a
+        # ColumnarFlightStore (NumPy columns, Flight-compatible views).
+        self.columnar = columnar
+        if columnar:
+            from flight_store import ColumnarFlightStore
+            self.flights = ColumnarFlightStore()
+        else:
+            self.flights = []
+
+        # Catalog indexes, kept in sync by add/delete/load:
+        #   (source, destination, date) -> [Flight, ...]
+        #   (flight_id, date)           -> Flight
+        self._route_index = {}
+        self._flight_index = {}
+        self._cities = None
+        self._connections = None   # ConnectionGraph, built on first connection search
+        self._ranking = None       # RouteRanking, built on first ranked search
+        self._summaries = None     # RouteSummaries, built on first summary / calendar / picker query
+        self._analytics = None     # BookingAnalytics, built on first dashboard view
+
+        # Catalog signature as of the last load / own write
+        self._file_signature = None
+
+        # Persistence: "csv" (flights.csv + journals), "sqlite" or a
+        # StorageBackend. Seat availability is kept apart from capacity.
+        self.storage = open_storage(storage, data_dir) if isinstance(storage, str) else storage
+        self.inventory = self.storage.inventory
+        self.inventory.on_change = self._apply_seat_delta
+        self.bookings = self.storage.bookings
+        self.waitlist = self.storage.waitlist
+
+        # Locking: catalog changes are serialized per process; seat changes
+        # per (flight_id, date, class) across threads and processes (by the
+        # backend's seat_locks).
+        self._catalog_lock = threading.RLock()
+        self._seat_locks = self.storage.seat_locks
+        self.bookings.load()
         self.load_flights()
 
+    # -----------------------------------------------------------
+    #                     CATALOG INDEX
+    # -----------------------------------------------------------
+    @staticmethod
+    def _route_key(source, destination, date):
+        return (source.strip().lower(), destination.strip().lower(), date)
+
+    def _new_flight(self, *fields, flights=None):
+        """Create a flight from Flight() arguments and store it in the catalog
+        (or in flights, a catalog being built)."""
+        flights = self.flights if flights is None else flights
+        if self.columnar:
+            return flights.add(*fields)
+        flight = Flight(*fields)
+        flights.append(flight)
+        return flight
+
+    def _index_flight(self, flight):
+        """Add a flight to every catalog index."""
+        key = self._route_key(flight.source, flight.destination, flight.date)
+        self._route_index.setdefault(key, []).append(flight)
+        self._flight_index[(flight.flight_id, flight.date)] = flight
+        if self._connections is not None:
+            self._connections.add(flight)
+        if self._ranking is not None:
+            self._ranking.add(key, flight)
+        if self._summaries is not None:
+            self._summaries.add(key, flight)
+        if self._analytics is not None:
+            self._analytics.add_flight(flight)
+
+    def _unindex_flight(self, flight):
+        """Remove a flight from every catalog index."""
+        key = self._route_key(flight.source, flight.destination, flight.date)
+        bucket = self._route_index.get(key)
+        if bucket is not None:
+            bucket[:] = [f for f in bucket if f != flight]
+            if not bucket:
+                del self._route_index[key]
+        if self._flight_index.get((flight.flight_id, flight.date)) == flight:
+            del self._flight_index[(flight.flight_id, flight.date)]
+        if self._connections is not None:
+            self._connections.remove(flight)
+        if self._ranking is not None:
+            self._ranking.remove(key, flight)
+        if self._summaries is not None:
+            self._summaries.remove(key, flight)
+        if self._analytics is not None:
+            self._analytics.remove_flight(flight)
+
+    def get_flight(self, flight_id, date):
+        """Return the flight with this ID on this date, or None."""
+        return self._flight_index.get((flight_id, date))
+
+    def cities(self):
+        """Sorted set of every source / destination in the catalog (cached)."""
+        if self._cities is None:
+            if self.columnar:
+                names = self.flights.cities()
+            else:
+                names = set()
+                for f in self.flights:
+                    names.add(f.source)
+                    names.add(f.destination)
+            self._cities = sorted(names)
+        return self._cities
+
+    # -----------------------------------------------------------
+    #                     CHANGE DETECTION
+    # -----------------------------------------------------------
+    def _remember_files(self):
+        """Record the catalog's state after loading or writing it."""
+        self._file_signature = self.storage.catalog_signature()
+
+    def reload_if_changed(self):
+        """Reload the catalog only if another writer saved it since.
+
+        Seat changes from other processes are picked up by tailing the seat
+        journal, which is much cheaper than a reload. Returns True when a
+        reload happened.
+        """
+        if self.storage.catalog_signature() == self._file_signature:
+            self.inventory.refresh()
+            return False
+        self.load_flights()
+        return True
+
     # -----------------------------------------------------------
     #                     FLIGHT MANAGEMENT
     # -----------------------------------------------------------
     def load_flights(self):
-        """Load all flights from data/flights.csv"""
-        self.flights.clear()
-        flights_path = os.path.join("data", "flights.csv")
-
-        if not os.path.exists(flights_path):
-            os.makedirs("data", exist_ok=True)
-            with open(flights_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "flight_id", "source", "destination", "time",
-                    "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
-                ])
-            return
-
-        with open(flights_path, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    flight = Flight(
-                        row["flight_id"], row["source"], row["destination"],
-                        row["time"], row["base_price"], row["date"],
-                        row["econ_seats"], row["business_seats"], row["first_class_seats"]
-                    )
-                    self.flights.append(flight)
-                except KeyError:
-                    continue
+        """Load all flights from storage"""
+        with self._catalog_lock:
+            self._load_flights()
+
+    def _load_flights(self):
+        """(Re)build the catalog from storage.
+
+        Readers take no lock, so the new catalog and its indexes are built
+        aside and swapped in whole: a concurrent search or get_flight()
+        sees the old catalog or the new one, never a half-built one. The
+        swap happens inside an inventory snapshot, so each seat change is
+        either in the snapshot applied to the new flights or reported
+        (through _apply_seat_delta) after the swap, never both or neither.
+        """
+        if self.columnar:
+            from flight_store import ColumnarFlightStore
+            flights = ColumnarFlightStore()
+        else:
+            flights = []
+        route_index, flight_index = {}, {}
+        for row in self.storage.load_catalog():
+            flight = self._new_flight(*row, flights=flights)
+            route_index.setdefault(self._route_key(flight.source, flight.destination, flight.date), []).append(flight)
+            flight_index[(flight.flight_id, flight.date)] = flight
+
+        self.inventory.load()
+        with self.inventory.snapshot() as deltas:
+            # Booked / freed seats on top of the capacities just loaded
+            for (flight_id, date, flight_class), delta in deltas.items():
+                flight = flight_index.get((flight_id, date))
+                if flight is not None and flight_class in CLASS_INDEX:
+                    flight.available_seats[flight_class] += delta
+            self.flights, self._route_index, self._flight_index = flights, route_index, flight_index
+            self._cities = None
+            self._connections = None
+            self._ranking = None
+            self._summaries = None
+            self._analytics = None
+        if not self.inventory.exists():
+            self._seed_inventory_from_bookings()
+        self._remember_files()
+
+    def _apply_seat_delta(self, key, delta):
+        """Mirror a seat-journal change onto the in-memory flight."""
+        flight_id, date, flight_class = key
+        flight = self.get_flight(flight_id, date)
+        if flight is not None and flight_class in CLASS_INDEX:
+            flight.available_seats[flight_class] += delta
+            if self._summaries is not None:
+                self._summaries.touch(self._route_key(flight.source, flight.destination, date))
+
+    def _seed_inventory_from_bookings(self):
+        """One-time migration: derive the seat journal from existing bookings."""
+        changes = [
+            (b["flight_id"], b["date"], b["class"], -1)
+            for b in self.view_all_bookings()
+            if b.get("flight_id") and b.get("date") and b.get("class")
+        ]
+        self.inventory.record_many(changes)
 
     def save_flights(self):
-        """Save all flights back to data/flights.csv"""
-        os.makedirs("data", exist_ok=True)
-        with open("data/flights.csv", "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "flight_id", "source", "destination", "time",
-                "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
-            ])
-            for fobj in self.flights:
-                writer.writerow([
-                    fobj.flight_id, fobj.source, fobj.destination, fobj.time,
-                    fobj.base_price, fobj.date,
-                    fobj.seats["Economy"], fobj.seats["Business"], fobj.seats["First Class"]
-                ])
+        """Save all flights (capacity only) back to storage"""
+        self.storage.save_catalog(self.flights)
+        self._remember_files()
+
+    def _save_edit(self, added=(), changed=(), removed=()):
+        """Store one catalog edit; backends that can write just those flights do."""
+        self.storage.update_catalog(self.flights, added=added, changed=changed, removed=removed)
+        self._remember_files()
 
     def add_flight(self, new_flight):
         """Add a new flight to the system."""
-        flight_obj = Flight(
-            new_flight["flight_id"], new_flight["source"], new_flight["destination"],
-            new_flight["time"], new_flight["base_price"], new_flight["date"],
-            new_flight["econ_seats"], new_flight["business_seats"], new_flight["first_class_seats"]
-        )
-        self.flights.append(flight_obj)
-        self.save_flights()
+        with self._catalog_lock:
+            flight_obj = self._new_flight(
+                new_flight["flight_id"], new_flight["source"], new_flight["destination"],
+                new_flight["time"], new_flight["base_price"], new_flight["date"],
+                new_flight["econ_seats"], new_flight["business_seats"], new_flight["first_class_seats"]
+            )
+            self._index_flight(flight_obj)
+            self._cities = None
+            self._save_edit(added=[flight_obj])
+
+    def add_flights(self, rows, save=True):
+        """Add many flights (Flight() argument lists) in one pass.
+
+        rows may be any iterable, e.g. a stream of validated schedule rows;
+        every index is updated as each flight goes in. The catalog is saved
+        once at the end, or not at all with save=False (call save_flights()
+        after the last batch). Returns the number of flights added.
+        """
+        added = 0
+        with self._catalog_lock:
+            for row in rows:
+                self._index_flight(self._new_flight(*row))
+                added += 1
+            self._cities = None
+            if save:
+                self.save_flights()
+        return added
 
     def delete_flight(self, flight_id):
         """Remove a flight by ID."""
-        self.flights = [f for f in self.flights if f.flight_id != flight_id]
-        self.save_flights()
+        with self._catalog_lock:
+            kept, removed = [], []
+            for f in self.flights:
+                if f.flight_id == flight_id:
+                    self.inventory.forget_flight(f.flight_id, f.date)
+                    self._unindex_flight(f)
+                    removed.append(f)
+                    if self.columnar:
+                        self.flights.remove(f)
+                else:
+                    kept.append(f)
+            if not self.columnar:
+                self.flights = kept
+            self._cities = None
+            self._save_edit(removed=removed)
 
     # -----------------------------------------------------------
     #                     SEARCH FUNCTIONALITY
     # -----------------------------------------------------------
     def search_flights(self, source, destination, date):
         """Search flights by source, destination, and date."""
+        return list(self._route_index.get(self._route_key(source, destination, date), ()))
+
+    def ranked_search(self, source, destination, date, sort_by="price", flight_class="Economy",
+                      offset=0, limit=None):
+        """search_flights() results in order, one page at a time.
+
+        sort_by "price" / "time" (or "-price" / "-time") is served from
+        per-route lists kept sorted as flights come and go, so no sorting
+        happens per request; ties are broken by the other key. Any other key,
+        or a tuple of keys such as ("-seats", "price"), is ranked on the fly
+        (heap top-K when limit is given); see ranking.sort_key.
+        """
+        route = self._route_key(source, destination, date)
+        if isinstance(sort_by, str) and sort_by.lstrip("-") in RouteRanking.ORDERS:
+            with self._catalog_lock:
+                if self._ranking is None:
+                    self._ranking = RouteRanking()
+                    for key, bucket in self._route_index.items():
+                        for flight in bucket:
+                            self._ranking.add(key, flight)
+                return self._ranking.page(route, sort_by, offset, limit)
+
+        keys = (sort_by,) if isinstance(sort_by, str) else tuple(sort_by)
+        flights = self._route_index.get(route, ())
+        if limit is not None:
+            return top_k(flights, offset + limit, keys, flight_class)[offset:]
+        return rank(flights, keys, flight_class)[offset:]
+
+    def search_connections(self, source, destination, date, flight_class="Economy", passengers=1,
+                           max_stops=2):
+        """Direct and connecting itineraries leaving on date (see ConnectionGraph.search).
+
+        The route graph is built on first use and then kept in step with
+        add_flight / delete_flight.
+        """
+        with self._catalog_lock:
+            if self._connections is None:
+                self._connections = ConnectionGraph(self.flights)
+            return self._connections.search(
+                source, destination, date, flight_class=flight_class,
+                passengers=passengers, max_stops=max_stops)
+
+    def _route_summaries(self):
+        with self._catalog_lock:
+            if self._summaries is None:
+                self._summaries = RouteSummaries(self._route_index, SEAT_CLASSES)
+            return self._summaries
+
+    def route_summary(self, source, destination, date):
+        """Flights, seats left, cheapest fare per class and departure times
+        of a route on one date (see RouteSummaries), or None if not flown.
+        """
+        return self._route_summaries().summary(self._route_key(source, destination, date))
+
+    def fare_calendar(self, source, destination, date_from=None, date_to=None):
+        """route_summary() of every date the route is flown in date_from..date_to.
+
+        Summaries are kept up to date through bookings, cancellations and
+        catalog changes, so a month of dates costs a dict lookup per date.
+        """
+        return self._route_summaries().calendar(source, destination, date_from, date_to)
+
+    def origins(self):
+        """Sorted names of the cities flights depart from (cached)."""
+        return self._route_summaries().origins()
+
+    def destinations(self, source=None):
+        """Sorted names of the cities flown to from source, or from anywhere (cached)."""
+        return self._route_summaries().destinations(source)
+
+    def filter_flights(self, source=None, destination=None, date_from=None, date_to=None,
+                       flight_class="Economy", min_seats=0):
+        """Flights matching every given condition, e.g. all flights from X
+        between two dates with at least N seats left in a class.
+
+        Cities match case-insensitively; the date range is inclusive. Runs as
+        vectorized masks on a columnar catalog.
+        """
+        if self.columnar:
+            return self.flights.select(
+                source=source, destination=destination, date_from=date_from, date_to=date_to,
+                flight_class=flight_class, min_seats=min_seats)
+        src = source.strip().lower() if source is not None else None
+        dst = destination.strip().lower() if destination is not None else None
         return [
             f for f in self.flights
-            if f.source.lower() == source.lower()
-            and f.destination.lower() == destination.lower()
-            and f.date == date
+            if (src is None or f.source.strip().lower() == src)
+            and (dst is None or f.destination.strip().lower() == dst)
+            and (date_from is None or f.date >= date_from)
+            and (date_to is None or f.date <= date_to)
+            and f.available(flight_class) >= min_seats
         ]
 
     # -----------------------------------------------------------
@@ -140,117 +522,262 @@ class FlightSystem:
     # -----------------------------------------------------------
     def book_ticket(self, flight_id, passenger_name, flight_date, flight_class):
         """Book a ticket or add to waitlist."""
-        for flight in self.flights:
-            if flight.flight_id == flight_id and flight.date == flight_date:
-                if flight.available_seats[flight_class] > 0:
-                    flight.available_seats[flight_class] -= 1
-                    self._record_booking(passenger_name, flight_id, flight_date, flight_class)
-                    self.save_flights()
-                    return f"✅ Booking confirmed for {passenger_name} ({flight_class}) on {flight_id}."
-                else:
-                    flight.waitlist.append(passenger_name)
-                    self._record_waitlist(passenger_name, flight_id, flight_date, flight_class)
-                    return f"🕓 No seats available. {passenger_name} added to waitlist for {flight_id}."
-        return "❌ Flight not found."
+        flight = self.get_flight(flight_id, flight_date)
+        if flight is None:
+            return "❌ Flight not found."
+
+        # Check-and-decrement must be atomic per (flight, date, class), also
+        # against other server processes sharing the data directory. The
+        # waitlist join happens under the same lock, so a seat freed
+        # meanwhile cannot be missed by the promotion in _free_seat.
+        with self._seat_locks.hold((flight_id, flight_date, flight_class)):
+            booked = self.storage.take_seats(flight, flight_class) == 1
+            if booked:
+                self._tally_bookings([self._record_booking(passenger_name, flight_id, flight_date, flight_class)])
+            else:
+                self.waitlist.add(passenger_name, flight_id, flight_date, flight_class)
+
+        if booked:
+            return f"✅ Booking confirmed for {passenger_name} ({flight_class}) on {flight_id}."
+        else:
+            return f"🕓 No seats available. {passenger_name} added to waitlist for {flight_id}."
+
+    def book_group(self, flight_id, passenger_names, flight_date, flight_class,
+                   policy=GROUP_ALL_OR_NOTHING):
+        """Book a whole group on one flight as a single batch.
+
+        The seats are claimed in one step (one seat journal record), the
+        bookings written in one append and any waitlisting in another, all
+        under one seat lock. What happens when the group does not fit is set
+        by policy (see GROUP_POLICIES). Returns {"booked": [...],
+        "waitlisted": [...]}; both are empty if the flight does not exist.
+        """
+        if policy not in GROUP_POLICIES:
+            raise ValueError(f"Unknown group booking policy: {policy}")
+        names = list(passenger_names)
+        flight = self.get_flight(flight_id, flight_date)
+        if flight is None or not names:
+            return {"booked": [], "waitlisted": []}
+
+        fare = flight.get_price_by_class(flight_class)
+        with self._seat_locks.hold((flight_id, flight_date, flight_class)):
+            taken = self.storage.take_seats(
+                flight, flight_class, len(names), partial=policy == GROUP_WAITLIST_REST)
+            booked = self.bookings.add_many(
+                [(name, flight_id, flight_date, flight_class, fare) for name in names[:taken]]
+            ) if taken else []
+            self._tally_bookings(booked)
+            rest = names[taken:]
+            waitlisted = self.waitlist.add_many(
+                rest, flight_id, flight_date, flight_class
+            ) if rest and policy != GROUP_ALL_OR_NOTHING else []
+        return {"booked": booked, "waitlisted": waitlisted}
 
     def _record_booking(self, passenger_name, flight_id, flight_date, flight_class):
-        """Save booking info to bookings.csv"""
-        os.makedirs("data", exist_ok=True)
-        bookings_path = os.path.join("data", "bookings.csv")
-        exists = os.path.exists(bookings_path)
-
-        with open(bookings_path, "a", newline="") as f:
-            writer = csv.writer(f)
-            if not exists:
-                writer.writerow(["passenger_name", "flight_id", "date", "class", "fare"])
-            fare = next(
-                (fobj.get_price_by_class(flight_class) for fobj in self.flights if fobj.flight_id == flight_id),
-                0
-            )
-            writer.writerow([passenger_name, flight_id, flight_date, flight_class, fare])
-
-    def _record_waitlist(self, passenger_name, flight_id, flight_date, flight_class):
-        """Record passengers in waitlist.csv"""
-        os.makedirs("data", exist_ok=True)
-        waitlist_path = os.path.join("data", "waitlist.csv")
-        exists = os.path.exists(waitlist_path)
-        with open(waitlist_path, "a", newline="") as f:
-            writer = csv.writer(f)
-            if not exists:
-                writer.writerow(["passenger_name", "flight_id", "date", "class"])
-            writer.writerow([passenger_name, flight_id, flight_date, flight_class])
+        """Save booking info to the booking ledger and return it (with booking_id)."""
+        flight = self.get_flight(flight_id, flight_date)
+        fare = flight.get_price_by_class(flight_class) if flight else 0
+        return self.bookings.add(passenger_name, flight_id, flight_date, flight_class, fare)
 
     # -----------------------------------------------------------
     #                     CANCEL TICKET
     # -----------------------------------------------------------
     def cancel_ticket(self, passenger_name, flight_id, flight_date):
-        """Cancel a passenger ticket and free up seat — fully safe version."""
-        bookings_path = os.path.join("data", "bookings.csv")
-
-        # If no bookings file exists
-        if not os.path.exists(bookings_path):
+        """Cancel a passenger ticket and free up seat."""
+        self.bookings.refresh()
+        if not self.bookings:
             return "⚠️ No bookings found to cancel."
 
-        updated_bookings = []
-        cancelled = False
-        cancelled_class = None
+        # Tombstone append + index update; the date's segment is never rewritten here
+        booking = self.bookings.cancel_matching(passenger_name, flight_id, flight_date)
+        if booking is None:
+            return "❌ No matching booking found."
+        self._tally_bookings([booking], cancelled=True)
 
-        with open(bookings_path, "r", newline="") as f:
-            reader = csv.reader(f)
-            rows = list(reader)
+        promoted = self._free_seat(booking)
+        return f"✅ Booking for {passenger_name} on flight {flight_id} cancelled successfully!" + self._promoted_note(promoted)
 
-            if not rows:
-                return "⚠️ No bookings available."
+    def cancel_booking(self, booking_id):
+        """Cancel a booking by its booking_id and free up its seat."""
+        cancelled = self.release_booking(booking_id)
+        if cancelled is None:
+            return "❌ No matching booking found."
 
-            # Detect if headers exist
-            headers = rows[0]
-            if "passenger_name" in headers:
-                data_rows = rows[1:]
-            else:
-                # Create headers manually if missing
-                headers = ["passenger_name", "flight_id", "date", "class", "fare"]
-                data_rows = rows
-
-            for row in data_rows:
-                if len(row) < 5:
-                    continue
-                pname, fid, fdate, fclass, fare = row[:5]
-
-                if (
-                    pname.strip().lower() == passenger_name.strip().lower()
-                    and fid.strip() == flight_id
-                    and fdate.strip() == flight_date
-                ):
-                    cancelled = True
-                    cancelled_class = fclass
-                    continue
-                updated_bookings.append(row)
-
-        # Rewrite file
-        with open(bookings_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
-            writer.writerows(updated_bookings)
-
-        if cancelled:
-            # Free up seat in the relevant flight
-            for f in self.flights:
-                if f.flight_id == flight_id and f.date == flight_date:
-                    f.available_seats[cancelled_class] += 1
+        booking, promoted = cancelled
+        return (
+            f"✅ Booking for {booking['passenger_name']} on flight {booking['flight_id']} cancelled successfully!"
+            + self._promoted_note(promoted)
+        )
 
-            self.save_flights()
-            return f"✅ Booking for {passenger_name} on flight {flight_id} cancelled successfully!"
-        else:
-            return "❌ No matching booking found."
+    def release_booking(self, booking_id):
+        """cancel_booking() returning (cancelled booking, bookings promoted into
+        its seat) instead of a message, or None if booking_id is not live."""
+        booking = self.bookings.cancel(booking_id)
+        if booking is None:
+            return None
+        self._tally_bookings([booking], cancelled=True)
+        return booking, self._free_seat(booking)
+
+    def _free_seat(self, booking):
+        """Give a cancelled booking's seat back, or straight to the waitlist.
+
+        Returns the bookings made for promoted waitlisters.
+        """
+        flight_id, flight_date, flight_class = booking["flight_id"], booking["date"], booking["class"]
+        if self.get_flight(flight_id, flight_date) is None:
+            return []
+        with self._seat_locks.hold((flight_id, flight_date, flight_class)):
+            return self._promote_waitlisted(flight_id, flight_date, flight_class, freed=1)
+
+    @staticmethod
+    def _promoted_note(promoted):
+        if not promoted:
+            return ""
+        names = ", ".join(b["passenger_name"] for b in promoted)
+        return f" 🎟️ Promoted from waitlist: {names}."
+
+    # -----------------------------------------------------------
+    #                     WAITLIST PROMOTION
+    # -----------------------------------------------------------
+    def _promote_waitlisted(self, flight_id, flight_date, flight_class, freed=0):
+        """Fill free seats (plus `freed` just released ones) from the waitlist head.
+
+        Caller holds the seat lock for (flight_id, flight_date, flight_class).
+        A released seat that goes straight to a waitlister never touches the
+        seat journal. Seats and bookings are written before the waitlist
+        entries are closed, so a crash can leave a passenger still listed but
+        never lose a promoted booking. Returns the new bookings.
+        """
+        self.inventory.refresh()
+        flight = self.get_flight(flight_id, flight_date)
+        free = flight.available(flight_class) + freed if flight else 0
+        entries = self.waitlist.peek(flight_id, flight_date, flight_class, n=free) if free > 0 else []
+
+        if freed - len(entries):
+            self.inventory.record(flight_id, flight_date, flight_class, freed - len(entries))
+        if not entries:
+            return []
+
+        fare = flight.get_price_by_class(flight_class)
+        promoted = self.bookings.add_many(
+            [(e["passenger_name"], flight_id, flight_date, flight_class, fare) for e in entries]
+        )
+        self._tally_bookings(promoted)
+        self.waitlist.mark_promoted(entries)
+        return promoted
+
+    def add_seats(self, flight_id, flight_date, flight_class, extra):
+        """Raise a class's capacity and promote waitlisters into the new seats in one batch.
+
+        Returns the bookings made for promoted waitlisters.
+        """
+        flight = self.get_flight(flight_id, flight_date)
+        if flight is None or flight_class not in flight.seats or extra <= 0:
+            return []
+        with self._catalog_lock, self._seat_locks.hold((flight_id, flight_date, flight_class)):
+            flight.seats[flight_class] += extra
+            flight.available_seats[flight_class] += extra
+            if self._summaries is not None:
+                self._summaries.touch(self._route_key(flight.source, flight.destination, flight_date))
+            if self._analytics is not None:
+                self._analytics.add_capacity(flight, flight_class, extra)
+            self._save_edit(changed=[flight])
+            return self._promote_waitlisted(flight_id, flight_date, flight_class)
 
     # -----------------------------------------------------------
     #                     VIEW BOOKINGS
     # -----------------------------------------------------------
     def view_all_bookings(self):
-        """Return all bookings as a list of dicts."""
-        bookings_path = os.path.join("data", "bookings.csv")
-        if not os.path.exists(bookings_path):
-            return []
-        with open(bookings_path, "r") as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        """Return all live bookings as a list of dicts."""
+        self.bookings.refresh()
+        return self.bookings.all()
+
+    def query_bookings(self, flight_id=None, flight_date=None, flight_class=None, after=None, limit=50):
+        """One page of live bookings plus the cursor for the next (see BookingStore.query)."""
+        self.bookings.refresh()
+        return self.bookings.query(flight_id, flight_date, flight_class, after=after, limit=limit)
+
+    def count_bookings(self, flight_id=None, flight_date=None, flight_class=None):
+        """Number of live bookings matching the filters."""
+        self.bookings.refresh()
+        return self.bookings.count(flight_id, flight_date, flight_class)
+
+    def booked_flight_ids(self):
+        """Sorted flight IDs that have at least one live booking (cached)."""
+        self.bookings.refresh()
+        return self.bookings.distinct("flight_id")
+
+    def get_booking(self, booking_id):
+        """One live booking by booking_id, or None."""
+        self.bookings.refresh()
+        return self.bookings.get(booking_id)
+
+    def find_bookings(self, passenger_name, flight_id, flight_date=None):
+        """Live bookings for a passenger on a flight, via the booking index."""
+        self.bookings.refresh()
+        return self.bookings.find(passenger_name, flight_id, flight_date)
+
+    # -----------------------------------------------------------
+    #                     ARCHIVED BOOKINGS
+    # -----------------------------------------------------------
+    def archive_bookings(self, before):
+        """Move bookings for flights dated before `before` (YYYY-MM-DD) to
+        cold storage; they leave every booking view above. Returns how many."""
+        archived = self.bookings.archive(before)
+        self._analytics = None      # archived bookings leave the dashboard too
+        return archived
+
+    def archived_booking_dates(self):
+        """Sorted flight dates with archived bookings."""
+        return self.bookings.archived_dates()
+
+    def archived_bookings(self, flight_date):
+        """Archived bookings of one flight date (reads its compressed file)."""
+        return self.bookings.archived(flight_date)
+
+    # -----------------------------------------------------------
+    #                     ANALYTICS
+    # -----------------------------------------------------------
+    def _tally_bookings(self, bookings, cancelled=False):
+        """Keep the running analytics in step with bookings made or cancelled here."""
+        analytics = self._analytics
+        if analytics is not None and bookings:
+            analytics.record(bookings, cancelled)
+
+    def _booking_analytics(self):
+        """The running aggregates, built from the bookings on first use.
+
+        The aggregates remember the booking store's version() they were
+        built at and move it along with every booking they tally. A booking
+        or cancellation made by another process (or by this one while they
+        were being built) leaves the two versions apart; they are then rebuilt.
+        """
+        with self._catalog_lock:
+            self.bookings.refresh()
+            analytics = self._analytics
+            if analytics is None or analytics.version != self.bookings.version():
+                analytics = BookingAnalytics(SEAT_CLASSES)
+                for flight in self.flights:
+                    analytics.add_flight(flight)
+                analytics.load(*self.bookings.snapshot())
+                self._analytics = analytics
+            return analytics
+
+    def booking_dashboard(self, top=10):
+        """Revenue, seats sold, load factor and cancellations: overall, per
+        class, and for the top routes and flights/classes by revenue.
+
+        Read from running totals, so the cost does not grow with bookings.
+        """
+        return self._booking_analytics().dashboard(top)
+
+    def booking_report(self, date_from=None, date_to=None, top=10):
+        """booking_dashboard() for flight dates date_from..date_to (inclusive),
+        recomputed with NumPy from that range's bookings only."""
+        self.bookings.refresh()
+        flights = [
+            f for f in self.flights
+            if (date_from is None or f.date >= date_from) and (date_to is None or f.date <= date_to)
+        ]
+        return range_report(self.bookings.between(date_from, date_to),
+                            self.bookings.cancellations(date_from, date_to), flights, SEAT_CLASSES, top)
@@ -0,0 +1,353 @@
+import csv
+import io
+import itertools
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from file_lock import FileLock
+from metrics import count_io
+
+# Random per process + counter: unique across processes, far cheaper than
+# a uuid4 (one urandom syscall) per record. Re-seeded after a fork, since
+# a forked worker would otherwise hand out its parent's IDs.
+_id_lock = threading.Lock()
+_id_pid = None
+_id_token = None
+_id_counter = None
+
+
+def new_id(prefix):
+    """Stable record ID such as BK1F3A9C2E000001."""
+    global _id_pid, _id_token, _id_counter
+    if _id_pid != os.getpid():
+        with _id_lock:
+            if _id_pid != os.getpid():
+                _id_token = uuid.uuid4().hex[:8].upper()
+                _id_counter = itertools.count(1)
+                _id_pid = os.getpid()
+    return f"{prefix}{_id_token}{next(_id_counter):06X}"
+
+
+# ===============================================================
+#                  APPEND-ONLY CSV JOURNAL
+# ===============================================================
+
+class CsvJournal:
+    """An append-only CSV file with a fixed header.
+
+    Rows are only ever appended; compaction replaces the whole file
+    atomically (write to a temp file, then os.replace) so a crash can
+    never leave a half-written journal behind.
+    """
+
+    def __init__(self, path, header):
+        self.path = path
+        self.name = os.path.basename(path)      # metrics label
+        self.header = list(header)
+        # Bumped on every rewrite; inode numbers alone can be reused
+        self.generation_path = path + ".gen"
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _encode(rows):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        return buf.getvalue().encode("utf-8")
+
+    def append(self, rows):
+        """Append rows in a single write, creating the file if needed."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "ab") as f:
+            data = self._encode(rows)
+            if f.tell() == 0:
+                data = self._encode([self.header]) + data
+            f.write(data)
+        count_io("write", self.name, len(data))
+
+    def read(self):
+        """Return all data rows (without the header) as lists."""
+        if not self.exists():
+            return []
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            rows = list(reader)
+            count_io("read", self.name, os.fstat(f.fileno()).st_size)
+        if rows and rows[0] == self.header:
+            rows = rows[1:]
+        return rows
+
+    def generation(self):
+        try:
+            with open(self.generation_path, "r") as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def identity(self):
+        """(generation, inode, size) of the journal file, or None if missing.
+
+        A changed generation or inode means the file was rewritten since it
+        was last read, so any saved read offset is no longer valid. The file
+        is stat'ed before the generation is read, and rewrites bump the
+        generation before swapping the file, so a reader can never pair a new
+        file with an old generation.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (self.generation(), st.st_ino, st.st_size)
+
+    def read_from(self, offset):
+        """Read complete rows appended after offset.
+
+        Returns (rows, new_offset). A trailing partial line (another process
+        mid-append) is left for the next call. The header is skipped when
+        reading from the start.
+        """
+        if not self.exists():
+            return [], offset
+        data = self.read_bytes_from(offset)
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return [], offset
+        rows = list(csv.reader(io.StringIO(data[:end].decode("utf-8"), newline="")))
+        if offset == 0 and rows and rows[0] == self.header:
+            rows = rows[1:]
+        return rows, offset + end
+
+    def first_row(self):
+        """The first row of the file (normally the header), or None."""
+        if not self.exists():
+            return None
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            return next(csv.reader(f), None)
+
+    def read_bytes_from(self, offset):
+        """Return the raw bytes appended after offset."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        count_io("read", self.name, len(data))
+        return data
+
+    def prepare_rewrite(self, rows):
+        """Write header + rows to a temp file and return its path.
+
+        Done without touching the live journal, so callers can build the
+        compacted file outside their lock and swap it in with commit_rewrite.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._encode([self.header]))
+            f.write(self._encode(rows))
+            count_io("write", self.name, f.tell())
+        return tmp_path
+
+    def commit_rewrite(self, tmp_path, tail=b""):
+        """Append tail to the temp file and atomically swap it in."""
+        with open(tmp_path, "ab") as f:
+            f.write(tail)
+            count_io("write", self.name, len(tail))
+            f.flush()
+            os.fsync(f.fileno())
+        gen_tmp = f"{self.generation_path}.{os.getpid()}.tmp"
+        with open(gen_tmp, "w") as f:
+            f.write(str(self.generation() + 1))
+        os.replace(gen_tmp, self.generation_path)
+        os.replace(tmp_path, self.path)
+
+    def rewrite(self, rows):
+        """Atomically replace the journal with rows."""
+        self.commit_rewrite(self.prepare_rewrite(rows))
+
+
+# ===============================================================
+#                JOURNAL-BACKED IN-MEMORY STORE
+# ===============================================================
+
+class JournalStore:
+    """In-memory state rebuilt from, and kept in sync with, a CsvJournal.
+
+    Subclasses define FILENAME / HEADER and three hooks:
+      _clear()            drop all in-memory state
+      _apply(row, notify) fold one journal row (list of str) into the state
+      _live_rows()        rows that reproduce the current state (compaction)
+      _live_count()       how many rows _live_rows() would return
+
+    Several processes may share the journal: writes and compaction happen
+    under an inter-process file lock, and each process tails the file from
+    its last read offset to pick up the others' rows before writing.
+    """
+
+    FILENAME = None
+    HEADER = None
+
+    def __init__(self, data_dir="data", compact_every=1000):
+        self.journal = CsvJournal(os.path.join(data_dir, self.FILENAME), self.HEADER)
+        lock_name = os.path.splitext(self.FILENAME)[0] + ".lock"
+        self.file_lock = FileLock(os.path.join(data_dir, "locks", lock_name))
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._pending = 0          # rows appended since the last compaction
+        self._compacting = False
+
+        # Where this process stopped reading the journal
+        self._file_id = None
+        self._offset = 0
+
+    # -----------------------------------------------------------
+    #                     SUBCLASS HOOKS
+    # -----------------------------------------------------------
+    def _clear(self):
+        raise NotImplementedError
+
+    def _apply(self, row, notify):
+        raise NotImplementedError
+
+    def _live_rows(self):
+        raise NotImplementedError
+
+    def _live_count(self):
+        return len(self._live_rows())
+
+    def _reload(self, rows):
+        """Rebuild state after another process rewrote the journal."""
+        self._clear()
+        for row in rows:
+            self._apply(row, notify=False)
+        self._pending = len(rows) - self._live_count()
+
+    # -----------------------------------------------------------
+    #                     READING
+    # -----------------------------------------------------------
+    def _read_everything(self):
+        rows, offset = self.journal.read_from(0)
+        identity = self.journal.identity()
+        self._file_id = identity[:2] if identity else None
+        self._offset = offset
+        return rows
+
+    def exists(self):
+        """Whether the journal file has been created yet."""
+        return self.journal.exists()
+
+    def load(self):
+        """Rebuild the in-memory state from the whole journal."""
+        with self._lock, self.file_lock:
+            self._clear()
+            rows = self._read_everything()
+            for row in rows:
+                self._apply(row, notify=False)
+            self._pending = len(rows) - self._live_count()
+
+    def _catch_up(self):
+        """Apply rows appended by other processes. Caller holds both locks."""
+        identity = self.journal.identity()
+        if identity is None:
+            return
+        if identity[:2] != self._file_id or identity[2] < self._offset:
+            self._reload(self._read_everything())
+            return
+        rows, self._offset = self.journal.read_from(self._offset)
+        for row in rows:
+            self._apply(row, notify=True)
+
+    def refresh(self):
+        """Pick up rows written by other processes since the last read."""
+        with self._lock:
+            identity = self.journal.identity()
+            if identity is None or (identity[:2] == self._file_id and identity[2] == self._offset):
+                return
+            with self.file_lock:
+                self._catch_up()
+
+    # -----------------------------------------------------------
+    #                     WRITING
+    # -----------------------------------------------------------
+    @contextmanager
+    def transaction(self):
+        """Hold the store exclusively, caught up with every other process.
+
+        Checks made inside the block stay valid until it exits, so
+        check-then-_write sequences are atomic.
+        """
+        with self._lock:
+            with self.file_lock:
+                self._catch_up()
+                yield self
+            # Compact once dead rows outnumber live ones (and compact_every),
+            # so rewrite cost stays amortized O(1) per appended row.
+            start = (
+                self._pending >= max(self.compact_every, self._live_count())
+                and not self._compacting
+            )
+            if start:
+                self._compacting = True
+        if start:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def _write(self, rows):
+        """Append rows and apply them. Caller must hold transaction()."""
+        if not rows:
+            return
+        rows = [[str(value) for value in row] for row in rows]
+        self.journal.append(rows)
+        identity = self.journal.identity()
+        self._file_id = identity[:2]
+        self._offset = identity[2]
+        for row in rows:
+            self._apply(row, notify=True)
+        self._pending += len(rows)
+
+    def append(self, rows):
+        """Append rows in one write, as a transaction of its own."""
+        if rows:
+            with self.transaction():
+                self._write(rows)
+
+    # -----------------------------------------------------------
+    #                     COMPACTION
+    # -----------------------------------------------------------
+    def compact(self):
+        """Rewrite the journal as _live_rows().
+
+        The new file is written outside the locks; rows appended meanwhile are
+        copied over verbatim before the atomic swap, so nothing is lost. If
+        another process compacted in between, this attempt is dropped.
+        """
+        try:
+            with self._lock, self.file_lock:
+                if not self.journal.exists():
+                    return
+                self._catch_up()
+                rows = self._live_rows()
+                file_id, size, pending = self._file_id, self._offset, self._pending
+
+            tmp_path = self.journal.prepare_rewrite(rows)
+
+            with self._lock, self.file_lock:
+                identity = self.journal.identity()
+                if identity is None or identity[:2] != file_id:
+                    os.remove(tmp_path)
+                    return
+                self._catch_up()
+                tail = self.journal.read_bytes_from(size)[:self._offset - size]
+                self.journal.commit_rewrite(tmp_path, tail)
+                identity = self.journal.identity()
+                self._file_id = identity[:2]
+                self._offset = identity[2]
+                self._pending -= pending
+        finally:
+            self._compacting = False
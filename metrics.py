@@ -0,0 +1,248 @@
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency percentiles are taken over each series' most recent samples
+WINDOW = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+HELP = {
+    "fms_method_seconds": "Latency of public FlightSystem / TicketGenerator methods.",
+    "fms_method_errors_total": "Calls that raised an exception.",
+    "fms_io_bytes_total": "Bytes read from or written to data files.",
+    "fms_io_ops_total": "File read / write calls.",
+    "fms_rerun_seconds": "Duration of a full Streamlit script run.",
+}
+
+# ===============================================================
+#                     METRICS REGISTRY
+# ===============================================================
+
+class _Series:
+    """Count, sum and a window of recent samples for one labelled timer."""
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=WINDOW)
+
+    def quantiles(self):
+        """{q: value} over the sample window, for every q in QUANTILES."""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return dict.fromkeys(QUANTILES, 0.0)
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class Registry:
+    """Process-wide timers and counters, keyed by (name, labels).
+
+    Labels are a sorted tuple of (key, value) pairs; keep their values to
+    small fixed sets (method names, file names), never passenger or
+    booking data. Set FMS_METRICS=0 to turn recording off.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        if self.enabled:
+            self.inc_key(self._key(name, labels), value)
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self.observe_key(self._key(name, labels), seconds)
+
+    # Hot paths build their (name, labels) key once and use these
+    def inc_key(self, key, value=1):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe_key(self, key, seconds):
+        with self._lock:
+            series = self._timers.get(key)
+            if series is None:
+                series = self._timers[key] = _Series()
+            series.count += 1
+            series.total += seconds
+            series.samples.append(seconds)
+
+    @contextmanager
+    def timed(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+
+    # -----------------------------------------------------------
+    #                     READING
+    # -----------------------------------------------------------
+    def timers(self, name):
+        """One dict per series of timer name: labels, count, total, mean and p50/p95/p99 (seconds)."""
+        rows = []
+        for labels, (count, total, quantiles) in self._timer_snapshot(name).items():
+            row = dict(labels, count=count, total=total, mean=total / count if count else 0.0)
+            row.update((f"p{int(q * 100)}", value) for q, value in quantiles.items())
+            rows.append(row)
+        return rows
+
+    def _timer_snapshot(self, name=None):
+        """{labels: (count, total, quantiles)} of timer name, or {(name, labels): ...} of all."""
+        with self._lock:
+            items = [(key, series.count, series.total, series.quantiles())
+                     for key, series in self._timers.items() if name is None or key[0] == name]
+        return {key if name is None else key[1]: (count, total, q) for key, count, total, q in items}
+
+    def counters(self, name):
+        """One dict per series of counter name: labels plus value."""
+        with self._lock:
+            return [dict(labels, value=value) for (n, labels), value in self._counters.items() if n == name]
+
+    # -----------------------------------------------------------
+    #                     PROMETHEUS EXPORT
+    # -----------------------------------------------------------
+    def prometheus_text(self):
+        """Everything in the Prometheus text exposition format (timers as summaries)."""
+        timers = self._timer_snapshot()
+        with self._lock:
+            counters = dict(self._counters)
+
+        lines = []
+        for name in sorted({n for n, _ in timers}):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} summary"]
+            for (n, labels), (count, total, quantiles) in sorted(timers.items()):
+                if n != name:
+                    continue
+                for q, value in quantiles.items():
+                    lines.append(f"{name}{_labels(labels + (('quantile', q),))} {value:.9g}")
+                lines.append(f"{name}_sum{_labels(labels)} {total:.9g}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        for name in sorted({n for n, _ in counters}):
+            lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() atomically (for node_exporter's textfile collector)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+        return path
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+REGISTRY = Registry(enabled=os.environ.get("FMS_METRICS", "1") != "0")
+
+
+# ===============================================================
+#                     INSTRUMENTATION
+# ===============================================================
+
+def instrument(component):
+    """Class decorator: time every public method as fms_method_seconds{component, method}.
+
+    Only plain functions defined on the class itself are wrapped (not
+    static/class methods, properties or underscore names).
+    """
+    def decorate(cls):
+        for name, fn in list(vars(cls).items()):
+            if name.startswith("_") or not callable(fn) or isinstance(fn, (staticmethod, classmethod, type)):
+                continue
+            setattr(cls, name, _timed_method(fn, component, name))
+        return cls
+    return decorate
+
+
+def _timed_method(fn, component, method):
+    registry = REGISTRY
+    labels = {"component": component, "method": method}
+    timer_key = Registry._key("fms_method_seconds", labels)
+    error_key = Registry._key("fms_method_errors_total", labels)
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not registry.enabled:
+            return fn(*args, **kwargs)
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            registry.inc_key(error_key)
+            raise
+        finally:
+            registry.observe_key(timer_key, perf_counter() - start)
+    return wrapper
+
+
+_io_keys = {}
+
+
+def count_io(op, file, nbytes):
+    """Record one file read or write ("read" / "write") of nbytes on file (a fixed name)."""
+    if not REGISTRY.enabled:
+        return
+    keys = _io_keys.get((op, file))
+    if keys is None:
+        labels = {"op": op, "file": file}
+        keys = _io_keys[op, file] = (Registry._key("fms_io_ops_total", labels),
+                                     Registry._key("fms_io_bytes_total", labels))
+    REGISTRY.inc_key(keys[0])
+    REGISTRY.inc_key(keys[1], nbytes)
+
+
+# ===============================================================
+#                     HTTP ENDPOINT
+# ===============================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve /metrics for Prometheus to scrape, from a daemon thread. Returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,71 @@
+"""
+Copy the CSV data files into a SQLite database.
+
+Reads data/flights.csv and the seat, booking and waitlist journals the way
+FlightSystem does (legacy formats and tombstones included), writes them to
+data/flights.db in a single transaction, then reloads both backends and
+checks they agree. The CSV files stay where they are (legacy formats get
+upgraded in place, as on any CSV-backed start).
+
+    python migrate_storage.py [--data-dir data] [--force]
+
+Afterwards start the app with FMS_STORAGE=sqlite.
+"""
+import argparse
+import os
+import sys
+
+from flight_system import FlightSystem
+from sqlite_storage import SEAT_CLASSES, SqliteStorage
+
+
+def migrate(data_dir="data", force=False):
+    """Copy data_dir's CSV files into data_dir/flights.db; returns the copied counts."""
+    source = FlightSystem(data_dir, storage="csv")
+    target = SqliteStorage(os.path.join(data_dir, SqliteStorage.FILENAME))
+    try:
+        if not force and (target.load_catalog() or target.bookings):
+            raise SystemExit(f"{target.db.path} already holds data; use --force to replace it")
+
+        flights = [
+            [f.flight_id, f.source, f.destination, f.time, f.base_price, f.date,
+             f.seats["Economy"], f.seats["Business"], f.seats["First Class"]]
+            for f in source.flights
+        ]
+        deltas = {
+            (f.flight_id, f.date, cls): source.inventory.delta(f.flight_id, f.date, cls)
+            for f in source.flights for cls in SEAT_CLASSES
+        }
+        bookings = source.view_all_bookings()
+        waiting = source.waitlist.waiting()
+        target.import_data(flights, deltas, bookings, waiting)
+    finally:
+        target.close()
+
+    migrated = FlightSystem(data_dir, storage="sqlite")
+    try:
+        for f in source.flights:
+            g = migrated.get_flight(f.flight_id, f.date)
+            if g is None or dict(g.available_seats) != dict(f.available_seats):
+                raise SystemExit(f"Seat mismatch for {f.flight_id} on {f.date}")
+        if migrated.view_all_bookings() != bookings or migrated.waitlist.waiting() != waiting:
+            raise SystemExit("Bookings or waitlist differ after migration")
+    finally:
+        migrated.storage.close()
+    return {"flights": len(flights), "bookings": len(bookings), "waitlisted": len(waiting)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--force", action="store_true", help="replace an existing database")
+    args = parser.parse_args()
+
+    counts = migrate(args.data_dir, args.force)
+    print(f"Migrated {counts['flights']} flights, {counts['bookings']} bookings and "
+          f"{counts['waitlisted']} waitlisted passengers to "
+          f"{os.path.join(args.data_dir, SqliteStorage.FILENAME)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
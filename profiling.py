@@ -0,0 +1,122 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_DIR = os.path.join("data", "profiles")
+MODES = ("sampling", "cprofile")
+SAMPLE_INTERVAL = 0.005
+
+# ===============================================================
+#                     PROFILERS
+# ===============================================================
+
+class SamplingProfiler:
+    """Samples one thread's call stack every interval seconds from a side thread.
+
+    Stacks are counted in the "folded" format (root;caller;callee count per
+    line) that flamegraph.pl, speedscope and inferno read directly. Costs
+    the profiled thread next to nothing, unlike cProfile's per-call hooks.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+class RunProfiler:
+    """Profile one stretch of code (e.g. a single Streamlit rerun) and save it.
+
+    mode "sampling" writes <name>.folded (flame graph input); "cprofile"
+    writes <name>.prof (pstats; snakeviz / flameprof / gprof2dot) plus
+    <name>.folded built from cProfile's caller edges, which shows each
+    function under its direct callers only.
+    """
+
+    def __init__(self, mode="sampling", output_dir=PROFILE_DIR, interval=SAMPLE_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.interval = interval
+        self._profiler = None
+        self._started = None
+
+    def start(self):
+        self._started = time.time()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = SamplingProfiler(interval=self.interval).start()
+        return self
+
+    def stop(self, name=None):
+        """Stop profiling and write the output files; returns their paths."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = name or time.strftime("run-%Y%m%d-%H%M%S", time.localtime(self._started))
+        base = os.path.join(self.output_dir, name)
+        if self.mode == "sampling":
+            self._profiler.stop()
+            return [self._profiler.write(base + ".folded")]
+
+        self._profiler.disable()
+        self._profiler.dump_stats(base + ".prof")
+        return [base + ".prof", _write_folded_cprofile(self._profiler, base + ".folded")]
+
+
+def _write_folded_cprofile(profiler, path):
+    """cProfile stats as two-level caller;callee folded stacks, weighted in microseconds."""
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    with open(path, "w") as f:
+        for func, (_, _, self_time, _, callers) in stats.items():
+            name = _func_name(func)
+            if not callers:
+                f.write(f"{name} {int(self_time * 1e6)}\n")
+                continue
+            # Split the function's own time between its callers by their share of calls
+            total_calls = sum(c[0] for c in callers.values()) or 1
+            for caller, (calls, *_) in callers.items():
+                weight = int(self_time * 1e6 * calls / total_calls)
+                if weight:
+                    f.write(f"{_func_name(caller)};{name} {weight}\n")
+    return path
+
+
+def _func_name(func):
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})" if line else name
@@ -0,0 +1,141 @@
+import heapq
+from bisect import bisect_left, bisect_right
+
+from utils import parse_time
+
+# ===============================================================
+#                    MULTI-KEY RESULT SORTING
+# ===============================================================
+
+_NO_TIME = 24 * 60      # flights with an unreadable time sort last
+
+
+def departure_minutes(flight):
+    minutes = parse_time(flight.time)
+    return _NO_TIME if minutes is None else minutes
+
+
+# name -> key(flight, flight_class)
+SORT_KEYS = {
+    "price": lambda f, cls: f.get_price_by_class(cls),
+    "time": lambda f, cls: departure_minutes(f),
+    "seats": lambda f, cls: f.available(cls),
+    "flight_id": lambda f, cls: f.flight_id,
+}
+
+
+class _Descending:
+    """Inverts the order of a non-numeric sort key."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def sort_key(keys=("price",), flight_class="Economy"):
+    """Key function for sorting flights by several keys.
+
+    keys are names from SORT_KEYS, each optionally prefixed with "-" for
+    descending order, e.g. ("price", "-seats"): cheapest first, and the
+    emptiest flight first among equal fares.
+    """
+    parts = []
+    for name in keys:
+        descending = name.startswith("-")
+        name = name.lstrip("-")
+        if name not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {name}")
+        parts.append((SORT_KEYS[name], descending))
+
+    def key(flight):
+        values = []
+        for fn, descending in parts:
+            value = fn(flight, flight_class)
+            if descending:
+                value = -value if isinstance(value, (int, float)) else _Descending(value)
+            values.append(value)
+        return tuple(values)
+
+    return key
+
+
+def rank(flights, keys=("price",), flight_class="Economy"):
+    """All flights sorted by keys (stable: ties keep their input order)."""
+    return sorted(flights, key=sort_key(keys, flight_class))
+
+
+def top_k(flights, k, keys=("price",), flight_class="Economy"):
+    """The first k flights of rank(...), e.g. the cheapest 10, via a heap.
+
+    O(n log k) instead of sorting everything; same order as rank()[:k].
+    """
+    return heapq.nsmallest(k, flights, key=sort_key(keys, flight_class))
+
+
+# ===============================================================
+#                 PRE-SORTED PER-ROUTE INDEXES
+# ===============================================================
+
+class RouteRanking:
+    """Each route's flights, kept sorted by fare and by departure time.
+
+    A route is whatever key the caller groups by (FlightSystem uses
+    (source, destination, date)). Fares are a fixed multiple of base_price
+    within a class, so one base_price order serves every class. Flights
+    are inserted in place with bisect, so a sorted page is a slice.
+    """
+
+    ORDERS = {
+        "price": lambda f: (f.base_price, departure_minutes(f)),
+        "time": lambda f: (departure_minutes(f), f.base_price),
+    }
+
+    def __init__(self):
+        self._lists = {}        # (route, order) -> (sorted keys, flights)
+
+    def add(self, route, flight):
+        for order, key_fn in self.ORDERS.items():
+            keys, flights = self._lists.setdefault((route, order), ([], []))
+            key = key_fn(flight)
+            i = bisect_right(keys, key)
+            keys.insert(i, key)
+            flights.insert(i, flight)
+
+    def remove(self, route, flight):
+        for order, key_fn in self.ORDERS.items():
+            entry = self._lists.get((route, order))
+            if entry is None:
+                continue
+            keys, flights = entry
+            key = key_fn(flight)
+            for i in range(bisect_left(keys, key), bisect_right(keys, key)):
+                if flights[i] == flight:
+                    del keys[i]
+                    del flights[i]
+                    break
+            if not flights:
+                del self._lists[(route, order)]
+
+    def page(self, route, order="price", offset=0, limit=None):
+        """flights[offset:offset + limit] of a route in the given order.
+
+        order is "price" or "time", or "-price" / "-time" for descending.
+        """
+        descending = order.startswith("-")
+        entry = self._lists.get((route, order.lstrip("-")))
+        if entry is None:
+            return []
+        flights = entry[1]
+        end = len(flights) if limit is None else min(len(flights), offset + limit)
+        if offset >= end:
+            return []
+        if descending:
+            return flights[len(flights) - end:len(flights) - offset][::-1]
+        return flights[offset:end]
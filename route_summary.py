@@ -0,0 +1,155 @@
+from bisect import bisect_left, bisect_right
+
+from ranking import departure_minutes
+
+# ===============================================================
+#                 PER-ROUTE, PER-DATE SUMMARIES
+# ===============================================================
+
+def _city(name):
+    return name.strip().lower()
+
+
+class RouteSummaries:
+    """What each route offers on each date, kept ready for the search page.
+
+    For every (source, destination, date) key of FlightSystem's route index
+    a summary holds the flight count, the seats left and cheapest fare per
+    class (among flights that still have a seat in it) and the departure
+    times. Each route also keeps its dates sorted, so a fare calendar is
+    one bisect, and the distinct origins / destinations are counted for the
+    city pickers.
+
+    Flights coming and going update the date lists and city counts in
+    place; those and seat changes mark the key's summary stale, and it is
+    recomputed from that key's bucket (a handful of flights) on next read.
+    """
+
+    def __init__(self, route_index, classes):
+        self._route_index = route_index     # shared with FlightSystem, never copied
+        self.classes = tuple(classes)
+        self._summaries = {}    # route key -> summary dict
+        self._changes = 0       # bumped by every update, see summary()
+        self._dates = {}        # (source, destination) -> sorted dates with flights
+        self._origins = {}      # source -> {display name: flight count}
+        self._destinations = {}     # source -> {destination display name: flight count}
+        self._origin_list = None
+        self._destination_lists = {}    # source (None = any) -> sorted names
+        for key, bucket in route_index.items():
+            for flight in bucket:
+                self.add(key, flight)
+
+    # -----------------------------------------------------------
+    #                     UPDATES
+    # -----------------------------------------------------------
+    def add(self, key, flight):
+        """Count a flight just added to the route index under key."""
+        source, destination, date = key
+        dates = self._dates.setdefault((source, destination), [])
+        i = bisect_left(dates, date)
+        if i == len(dates) or dates[i] != date:
+            dates.insert(i, date)
+        self._count(self._origins, source, flight.source, 1)
+        self._count(self._destinations, source, flight.destination, 1)
+        self.touch(key)
+
+    def remove(self, key, flight):
+        """Forget a flight just removed from the route index under key."""
+        source, destination, date = key
+        if key not in self._route_index:
+            dates = self._dates.get((source, destination), [])
+            i = bisect_left(dates, date)
+            if i < len(dates) and dates[i] == date:
+                del dates[i]
+            if not dates:
+                self._dates.pop((source, destination), None)
+        self._count(self._origins, source, flight.source, -1)
+        self._count(self._destinations, source, flight.destination, -1)
+        self.touch(key)
+
+    def touch(self, key):
+        """Seats changed on a flight of this route and date."""
+        self._changes += 1
+        self._summaries.pop(key, None)
+
+    def _count(self, counts, source, name, step):
+        names = counts.setdefault(source, {})
+        total = names.get(name, 0) + step
+        if total > 0:
+            names[name] = total
+            if total == step:   # a new name
+                self._forget_lists(counts)
+        else:
+            names.pop(name, None)
+            if not names:
+                del counts[source]
+            self._forget_lists(counts)
+
+    def _forget_lists(self, counts):
+        if counts is self._origins:
+            self._origin_list = None
+        else:
+            self._destination_lists.clear()
+
+    # -----------------------------------------------------------
+    #                     QUERIES
+    # -----------------------------------------------------------
+    def summary(self, key):
+        """The summary of one route key, or None if nothing flies it."""
+        summary = self._summaries.get(key)
+        if summary is None:
+            bucket = self._route_index.get(key)
+            if not bucket:
+                return None
+            changes = self._changes
+            summary = self._summarize(key, bucket)
+            # A booking on another thread may have landed mid-summary: use
+            # the result, but don't cache what may already be stale
+            if changes == self._changes:
+                self._summaries[key] = summary
+        return summary
+
+    def _summarize(self, key, bucket):
+        seats_left, min_fare = {}, {}
+        for flight_class in self.classes:
+            open_flights = [f for f in bucket if f.available(flight_class) > 0]
+            seats_left[flight_class] = sum(f.available(flight_class) for f in open_flights)
+            cheapest = min(open_flights, key=lambda f: f.base_price, default=None)
+            min_fare[flight_class] = cheapest.get_price_by_class(flight_class) if cheapest else None
+        first = bucket[0]
+        return {
+            "source": first.source,
+            "destination": first.destination,
+            "date": key[2],
+            "flights": len(bucket),
+            "seats_left": seats_left,
+            "total_seats_left": sum(seats_left.values()),
+            "min_fare": min_fare,
+            "times": [f.time for f in sorted(bucket, key=departure_minutes)],
+        }
+
+    def calendar(self, source, destination, date_from=None, date_to=None):
+        """Summaries of every date the route is flown, date_from..date_to inclusive."""
+        src, dst = _city(source), _city(destination)
+        dates = self._dates.get((src, dst), [])
+        lo = 0 if date_from is None else bisect_left(dates, date_from)
+        hi = len(dates) if date_to is None else bisect_right(dates, date_to)
+        return [self.summary((src, dst, date)) for date in dates[lo:hi]]
+
+    def origins(self):
+        """Sorted names of every city with a departing flight."""
+        if self._origin_list is None:
+            self._origin_list = sorted({name for names in self._origins.values() for name in names})
+        return self._origin_list
+
+    def destinations(self, source=None):
+        """Sorted names of every city flown to from source (from anywhere if None)."""
+        src = None if source is None else _city(source)
+        names = self._destination_lists.get(src)
+        if names is None:
+            if src is None:
+                names = sorted({name for names in self._destinations.values() for name in names})
+            else:
+                names = sorted(self._destinations.get(src, ()))
+            self._destination_lists[src] = names
+        return names
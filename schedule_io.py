@@ -0,0 +1,335 @@
+"""
+Bulk flight schedule import and streaming catalog / bookings export.
+
+    python schedule_io.py import schedule.csv [--rejects rejects.csv] [--chunk-size 10000]
+    python schedule_io.py export-flights flights.jsonl
+    python schedule_io.py export-bookings bookings.csv
+
+Files are CSV (flights.csv columns) or JSON Lines (.jsonl / .ndjson, one
+object per line with the same keys). Every command takes --data-dir and
+--storage like the app, and reports rows per second and peak RSS.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date as Date
+
+from flight_system import FlightSystem
+from metrics import count_io
+from storage import FLIGHT_HEADER
+from utils import parse_time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CHUNK_SIZE = 10_000
+BOOKING_HEADER = ["booking_id", "passenger_name", "flight_id", "date", "class", "fare"]
+_TEXT_FIELDS = ("flight_id", "source", "destination", "time", "date")
+_SEAT_FIELDS = ("econ_seats", "business_seats", "first_class_seats")
+
+# ===============================================================
+#                     FILE FORMATS
+# ===============================================================
+
+def file_format(path, fmt=None):
+    """"csv" or "jsonl", from fmt or else the file extension."""
+    if fmt is not None:
+        return fmt
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def read_chunks(path, fmt=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of (line number, record) from a schedule file, chunk_size at a time.
+
+    A record is a dict of the row's fields, or the raw text of a JSON Lines
+    line that is not a JSON object.
+    """
+    fmt = file_format(path, fmt)
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            records = ((reader.line_num, row) for row in reader)
+        else:
+            records = _jsonl_records(f)
+        chunk = []
+        for item in records:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        count_io("read", "schedule_io", os.fstat(f.fileno()).st_size)
+
+
+def _jsonl_records(f):
+    for line_num, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_num, record if isinstance(record, dict) else line.rstrip("\n")
+
+
+@contextmanager
+def atomic_open(path):
+    """Open path for writing via a temp file that replaces it only on success."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+            count_io("write", "schedule_io", os.fstat(f.fileno()).st_size)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _row_writer(f, fmt, header):
+    """write(dict) for a CSV (with header) or JSON Lines file."""
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
+        writer.writeheader()
+        return writer.writerow
+    return lambda row: f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+# ===============================================================
+#                     VALIDATION
+# ===============================================================
+
+def validate_flight(record):
+    """(Flight() arguments, None) for a valid schedule record, else (None, reason)."""
+    if not isinstance(record, dict):
+        return None, "not a JSON object"
+    if None in record:
+        return None, "too many fields"
+    missing = [name for name in FLIGHT_HEADER if record.get(name) is None]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    text = {name: str(record[name]).strip() for name in _TEXT_FIELDS}
+    empty = [name for name, value in text.items() if not value]
+    if empty:
+        return None, f"empty {', '.join(empty)}"
+    if text["source"].lower() == text["destination"].lower():
+        return None, "source and destination are the same"
+    try:
+        if Date.fromisoformat(text["date"]).isoformat() != text["date"]:
+            raise ValueError
+    except ValueError:
+        return None, f"bad date {text['date']!r} (want YYYY-MM-DD)"
+    if parse_time(text["time"]) is None:
+        return None, f"bad time {text['time']!r}"
+
+    try:
+        price = float(record["base_price"])
+    except (TypeError, ValueError):
+        return None, f"bad base_price {record['base_price']!r}"
+    if not math.isfinite(price) or price < 0:
+        return None, f"bad base_price {record['base_price']!r}"
+
+    seats = []
+    for name in _SEAT_FIELDS:
+        try:
+            value = int(str(record[name]).strip())
+        except ValueError:
+            value = -1
+        if value < 0:
+            return None, f"bad {name} {record[name]!r}"
+        seats.append(value)
+
+    return [text["flight_id"], text["source"], text["destination"], text["time"], price,
+            text["date"], *seats], None
+
+
+class _Rejects:
+    """Rejected records, written (atomically) only if there are any."""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self.count = 0
+        self._file = None
+        self._write = None
+
+    def add(self, line_num, record, reason):
+        self.count += 1
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = atomic_open(self.path)
+            header = ["line", "reason", *FLIGHT_HEADER]
+            self._write = _row_writer(self._file.__enter__(), self.fmt, header)
+        row = {"line": line_num, "reason": reason}
+        if isinstance(record, dict):
+            row.update((k, v) for k, v in record.items() if k is not None)
+        else:
+            row["raw"] = record
+        self._write(row)
+
+    def close(self, error=None):
+        if self._file is not None:
+            if error is None:
+                self._file.__exit__(None, None, None)
+            else:
+                self._file.__exit__(type(error), error, error.__traceback__)
+
+
+# ===============================================================
+#                     IMPORT / EXPORT
+# ===============================================================
+
+def import_schedule(system, path, fmt=None, rejects_path=None, chunk_size=CHUNK_SIZE):
+    """Stream a schedule file into the catalog and save it once.
+
+    Invalid rows, and flights already scheduled (same flight_id and date,
+    in the catalog or earlier in the file), go to rejects_path with their
+    line number and reason. The whole file is read and validated before
+    any flight enters the shared catalog, so nothing can search, book or
+    save a half-imported schedule; the flights then go in and are saved
+    in one step under the catalog lock. If that step fails, the catalog is
+    reloaded from storage. Returns counts and timings.
+    """
+    start = time.perf_counter()
+    fmt = file_format(path, fmt)
+    rejects = _Rejects(rejects_path, fmt)
+    read = added = 0
+    seen = set()
+    valid = []
+    try:
+        for chunk in read_chunks(path, fmt, chunk_size):
+            for line_num, record in chunk:
+                fields, reason = validate_flight(record)
+                if fields is not None:
+                    key = (fields[0], fields[5])
+                    if key in seen or system.get_flight(*key) is not None:
+                        fields, reason = None, "duplicate flight_id and date"
+                    else:
+                        seen.add(key)
+                if fields is None:
+                    rejects.add(line_num, record, reason)
+                else:
+                    valid.append(fields)
+            read += len(chunk)
+    except BaseException as error:
+        rejects.close(error)
+        raise
+    try:
+        added = system.add_flights(valid)
+    except BaseException as error:
+        rejects.close(error)
+        if valid:
+            # Flights indexed but never saved would otherwise stay in the
+            # shared catalog and be written out by the next save
+            system.load_flights()
+        raise
+    rejects.close()
+    return _report(read, start, imported=added, rejected=rejects.count)
+
+
+def export_flights(system, path, fmt=None):
+    """Write the catalog to a CSV / JSON Lines file, one flight at a time."""
+    start = time.perf_counter()
+    count = 0
+    with atomic_open(path) as f:
+        write = _row_writer(f, file_format(path, fmt), FLIGHT_HEADER)
+        for flight in system.flights:
+            write({
+                "flight_id": flight.flight_id, "source": flight.source,
+                "destination": flight.destination, "time": flight.time,
+                "base_price": flight.base_price, "date": flight.date,
+                "econ_seats": flight.seats["Economy"], "business_seats": flight.seats["Business"],
+                "first_class_seats": flight.seats["First Class"],
+            })
+            count += 1
+    return _report(count, start)
+
+
+def export_bookings(system, path, fmt=None, page_size=CHUNK_SIZE):
+    """Write every live booking to a CSV / JSON Lines file, a page at a time."""
+    start = time.perf_counter()
+    count = 0
+    with atomic_open(path) as f:
+        write = _row_writer(f, file_format(path, fmt), BOOKING_HEADER)
+        cursor = None
+        while True:
+            page, cursor = system.query_bookings(after=cursor, limit=page_size)
+            for booking in page:
+                write(booking)
+            count += len(page)
+            if cursor is None:
+                break
+    return _report(count, start)
+
+
+def _report(rows, start, **counts):
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows, **counts, "seconds": seconds,
+        "rows_per_s": rows / seconds if seconds else float("inf"),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# ===============================================================
+#                     COMMAND LINE
+# ===============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default=os.environ.get("FMS_STORAGE", "csv"))
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    commands = parser.add_subparsers(dest="command", required=True)
+    imp = commands.add_parser("import", help="add the flights in a schedule file")
+    imp.add_argument("path")
+    imp.add_argument("--rejects", help="default: <path>.rejects.<ext>")
+    imp.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    commands.add_parser("export-flights", help="write the flight catalog").add_argument("path")
+    commands.add_parser("export-bookings", help="write all live bookings").add_argument("path")
+    args = parser.parse_args()
+
+    system = FlightSystem(args.data_dir, storage=args.storage)
+    if args.command == "import":
+        base, ext = os.path.splitext(args.path)
+        rejects = args.rejects or f"{base}.rejects{ext or '.csv'}"
+        result = import_schedule(system, args.path, args.format, rejects, args.chunk_size)
+        print(f"Imported {result['imported']:,} of {result['rows']:,} rows", end="")
+        print(f", {result['rejected']:,} rejected -> {rejects}" if result["rejected"] else "")
+    elif args.command == "export-flights":
+        result = export_flights(system, args.path, args.format)
+        print(f"Exported {result['rows']:,} flights to {args.path}")
+    else:
+        result = export_bookings(system, args.path, args.format)
+        print(f"Exported {result['rows']:,} bookings to {args.path}")
+
+    rss = result["peak_rss_mb"]
+    print(f"{result['seconds']:.2f} s, {result['rows_per_s']:,.0f} rows/s"
+          + (f", peak RSS {rss:,.0f} MB" if rss is not None else ""))
+    system.storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from contextlib import contextmanager
+
+from journal import JournalStore
+
+# ===============================================================
+#                     SEAT INVENTORY STORE
+# ===============================================================
+
+class SeatInventory(JournalStore):
+    """Seat availability kept apart from flight capacity.
+
+    flights.csv only holds capacity. Every booking / cancellation appends one
+    delta row (flight_id, date, class, delta) to data/seat_journal.csv, and
+    load() replays the journal, so availability survives restarts without
+    rewriting the flight catalog. Once enough deltas pile up, a background
+    thread folds them into one row per (flight_id, date, class).
+
+    Every change, own or from another process, is reported through
+    on_change(key, delta).
+    """
+
+    FILENAME = "seat_journal.csv"
+    HEADER = ["flight_id", "date", "class", "delta"]
+
+    def __init__(self, data_dir="data", compact_every=1000, on_change=None):
+        self.on_change = on_change
+        self._deltas = {}          # (flight_id, date, class) -> net change in available seats
+        super().__init__(data_dir, compact_every)
+
+    # -----------------------------------------------------------
+    #                     JOURNAL HOOKS
+    # -----------------------------------------------------------
+    def _clear(self):
+        self._deltas = {}
+
+    def _apply(self, row, notify):
+        if len(row) < 4:
+            return
+        try:
+            key, delta = (row[0], row[1], row[2]), int(row[3])
+        except ValueError:
+            return
+        self._deltas[key] = self._deltas.get(key, 0) + delta
+        if notify and self.on_change is not None:
+            self.on_change(key, delta)
+
+    def _live_rows(self):
+        # Sorted for a stable, diff-friendly file.
+        return sorted([*key, delta] for key, delta in self._deltas.items() if delta)
+
+    def _live_count(self):
+        return len(self._deltas)
+
+    def _reload(self, rows):
+        # Compacted elsewhere: rebuild, then report only the differences
+        old = self._deltas
+        self._clear()
+        for row in rows:
+            self._apply(row, notify=False)
+        self._pending = len(rows) - self._live_count()
+        if self.on_change is not None:
+            for key in set(old) | set(self._deltas):
+                diff = self._deltas.get(key, 0) - old.get(key, 0)
+                if diff:
+                    self.on_change(key, diff)
+
+    # -----------------------------------------------------------
+    #                     SEAT DELTAS
+    # -----------------------------------------------------------
+    def load(self):
+        """Replay the journal and return {(flight_id, date, class): delta}."""
+        super().load()
+        return dict(self._deltas)
+
+    def delta(self, flight_id, date, flight_class):
+        return self._deltas.get((flight_id, date, flight_class), 0)
+
+    @contextmanager
+    def snapshot(self):
+        """Yield the current {(flight_id, date, class): delta}, holding back
+        every on_change report until the block exits.
+
+        A change is either in the snapshot or reported after it, never
+        both, so a caller can rebuild what it mirrors from the snapshot.
+        """
+        with self._lock:
+            yield dict(self._deltas)
+
+    def record(self, flight_id, date, flight_class, delta):
+        """Persist a change in available seats with a single append."""
+        self.append([(flight_id, date, flight_class, delta)])
+
+    def record_many(self, changes):
+        """Persist several (flight_id, date, class, delta) changes in one append."""
+        self.append(changes)
+
+    def forget_flight(self, flight_id, date):
+        """Cancel out every delta of a deleted flight so a re-added one starts full."""
+        with self.transaction():
+            self._write([
+                (fid, fdate, fclass, -delta)
+                for (fid, fdate, fclass), delta in list(self._deltas.items())
+                if fid == flight_id and fdate == date and delta
+            ])
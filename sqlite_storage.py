@@ -0,0 +1,771 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from booking_ledger import BOOKED, BookingArchive
+from journal import new_id
+from storage import StorageBackend
+
+SEAT_CLASSES = ("Economy", "Business", "First Class")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('catalog_version', 0);
+-- Moved by every booking insert or cancellation: SqliteBookingStore.version()
+INSERT OR IGNORE INTO meta (key, value) VALUES ('bookings_version', 0);
+
+CREATE TABLE IF NOT EXISTS flights (
+    flight_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    time TEXT NOT NULL,
+    base_price REAL NOT NULL,
+    date TEXT NOT NULL,
+    econ_seats INTEGER NOT NULL,
+    business_seats INTEGER NOT NULL,
+    first_class_seats INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS flights_by_id ON flights (flight_id, date);
+
+-- available = capacity + delta; the booking transaction's check-and-decrement
+CREATE TABLE IF NOT EXISTS seats (
+    flight_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    class TEXT NOT NULL,
+    capacity INTEGER NOT NULL DEFAULT 0,
+    delta INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (flight_id, date, class)
+) WITHOUT ROWID;
+
+-- Recent seat changes, tailed by every process to keep its flights current
+CREATE TABLE IF NOT EXISTS seat_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    flight_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    class TEXT NOT NULL,
+    delta INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS bookings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    booking_id TEXT NOT NULL UNIQUE,
+    passenger_name TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    class TEXT NOT NULL,
+    fare TEXT NOT NULL,
+    status TEXT NOT NULL,
+    passenger_key TEXT NOT NULL,
+    flight_key TEXT NOT NULL
+);
+-- Partial indexes over live bookings; each is ordered by seq within a key,
+-- so a filtered page is one range scan from the cursor.
+CREATE INDEX IF NOT EXISTS bookings_by_passenger
+    ON bookings (passenger_key, flight_id, date) WHERE status = 'BOOKED';
+CREATE INDEX IF NOT EXISTS bookings_by_flight ON bookings (flight_key) WHERE status = 'BOOKED';
+CREATE INDEX IF NOT EXISTS bookings_by_date ON bookings (date) WHERE status = 'BOOKED';
+CREATE INDEX IF NOT EXISTS bookings_by_class ON bookings (class) WHERE status = 'BOOKED';
+
+CREATE TABLE IF NOT EXISTS waitlist (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    waitlist_id TEXT NOT NULL UNIQUE,
+    passenger_name TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    class TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waitlist_queue
+    ON waitlist (flight_id, date, class, priority DESC, seq) WHERE status = 'WAITING';
+"""
+
+# ===============================================================
+#                 CONNECTIONS AND TRANSACTIONS
+# ===============================================================
+
+class Database:
+    """One SQLite file in WAL mode, with a connection per thread.
+
+    Connections run in autocommit mode; transaction() wraps a block in
+    BEGIN IMMEDIATE ... COMMIT, so writers queue up front instead of
+    failing on lock upgrade. Nested transaction() blocks join the
+    outermost one. Statements are fixed SQL strings, so each connection
+    prepares them once and reuses them from its statement cache.
+    """
+
+    def __init__(self, path, timeout=30.0, synchronous="NORMAL"):
+        self.path = path
+        self.timeout = timeout
+        self.synchronous = synchronous
+        self.after_commit = []      # callbacks run once an outermost transaction commits
+        self.after_rollback = []
+        self._local = threading.local()
+        self._pid = None
+        self._connections = []
+        self._guard = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        """This thread's connection (reopened after a fork)."""
+        if self._pid != os.getpid():
+            with self._guard:
+                if self._pid != os.getpid():
+                    self._local = threading.local()
+                    self._connections = []
+                    self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._guard:
+                self._connections.append(conn)
+        return conn
+
+    def in_transaction(self):
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """Run the block as one atomic write transaction; yields the connection."""
+        conn = self.connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = 0
+            conn.execute("ROLLBACK")
+            for callback in self.after_rollback:
+                callback()
+            raise
+        self._local.depth = 0
+        conn.execute("COMMIT")
+        for callback in self.after_commit:
+            callback()
+
+    @contextmanager
+    def read(self):
+        """Run the block's queries against one snapshot of the database
+        (a deferred read transaction); yields the connection."""
+        conn = self.connection()
+        if self._local.depth:
+            yield conn
+            return
+        conn.execute("BEGIN")
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.depth = 0
+            conn.execute("COMMIT")
+
+    def close(self):
+        with self._guard:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._local = threading.local()
+
+
+class _TransactionLocks:
+    """seat_locks for SQLite: holding any key is holding a write transaction."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def hold(self, key):
+        return self.db.transaction()
+
+
+# ===============================================================
+#                     SEAT INVENTORY
+# ===============================================================
+
+class SqliteSeatInventory:
+    """SeatInventory on the seats / seat_changes tables.
+
+    seats holds capacity and the net delta per (flight_id, date, class);
+    every change is also logged to seat_changes. Each process tails that
+    log from the last id it saw (refresh(), and after each commit) and
+    reports changes through on_change(key, delta), exactly like the CSV
+    journal. The log is pruned to its newest KEEP_CHANGES rows; a reader
+    that fell further behind resyncs from seats.
+    """
+
+    KEEP_CHANGES = 10_000
+    PRUNE_EVERY = 1_000
+
+    def __init__(self, db, on_change=None):
+        self.db = db
+        self.on_change = on_change
+        self._deltas = {}
+        self._last_id = 0
+        self._stale = False
+        self._lock = threading.RLock()
+        db.after_commit.append(self.refresh)
+        db.after_rollback.append(self._mark_stale)
+
+    def exists(self):
+        return True
+
+    def _mark_stale(self):
+        self._stale = True
+
+    def _read_deltas(self, conn):
+        deltas = {
+            (fid, date, cls): delta
+            for fid, date, cls, delta in conn.execute(
+                "SELECT flight_id, date, class, delta FROM seats WHERE delta != 0")
+        }
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM seat_changes").fetchone()[0]
+        return deltas, last_id
+
+    def load(self):
+        """Return {(flight_id, date, class): delta} and start tailing from here."""
+        with self._lock:
+            self._deltas, self._last_id = self._read_deltas(self.db.connection())
+            self._stale = False
+            return dict(self._deltas)
+
+    def _resync(self, conn):
+        """Catch up from seats itself, reporting only the differences."""
+        old = self._deltas
+        self._deltas, self._last_id = self._read_deltas(conn)
+        self._stale = False
+        if self.on_change is not None:
+            for key in set(old) | set(self._deltas):
+                diff = self._deltas.get(key, 0) - old.get(key, 0)
+                if diff:
+                    self.on_change(key, diff)
+
+    def refresh(self):
+        """Apply seat changes committed since the last call (by anyone)."""
+        with self._lock:
+            conn = self.db.connection()
+            if self._stale:
+                self._resync(conn)
+                return
+            rows = conn.execute(
+                "SELECT id, flight_id, date, class, delta FROM seat_changes WHERE id > ? ORDER BY id",
+                (self._last_id,)).fetchall()
+            if rows and rows[0][0] != self._last_id + 1:
+                first_kept = conn.execute("SELECT MIN(id) FROM seat_changes").fetchone()[0]
+                if first_kept > self._last_id + 1:
+                    self._resync(conn)
+                    return
+            for change_id, fid, date, cls, delta in rows:
+                key = (fid, date, cls)
+                self._deltas[key] = self._deltas.get(key, 0) + delta
+                self._last_id = change_id
+                if self.on_change is not None:
+                    self.on_change(key, delta)
+
+    def delta(self, flight_id, date, flight_class):
+        return self._deltas.get((flight_id, date, flight_class), 0)
+
+    @contextmanager
+    def snapshot(self):
+        """Yield the current deltas, holding back on_change reports (see SeatInventory.snapshot)."""
+        with self._lock:
+            yield dict(self._deltas)
+
+    # -----------------------------------------------------------
+    #                     WRITES
+    # -----------------------------------------------------------
+    def _log(self, conn, flight_id, date, flight_class, delta):
+        change_id = conn.execute(
+            "INSERT INTO seat_changes (flight_id, date, class, delta) VALUES (?, ?, ?, ?)",
+            (flight_id, date, flight_class, delta)).lastrowid
+        if change_id % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM seat_changes WHERE id <= ?", (change_id - self.KEEP_CHANGES,))
+
+    def _change(self, conn, flight_id, date, flight_class, delta):
+        conn.execute(
+            "INSERT INTO seats (flight_id, date, class, delta) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (flight_id, date, class) DO UPDATE SET delta = delta + excluded.delta",
+            (flight_id, date, flight_class, delta))
+        self._log(conn, flight_id, date, flight_class, delta)
+
+    def take(self, conn, flight_id, date, flight_class, count=1, partial=False):
+        """Check-and-decrement seats inside the caller's transaction; returns how many."""
+        if partial:
+            row = conn.execute(
+                "SELECT capacity + delta FROM seats WHERE flight_id = ? AND date = ? AND class = ?",
+                (flight_id, date, flight_class)).fetchone()
+            count = min(count, max(0, row[0])) if row else 0
+            if not count:
+                return 0
+        taken = conn.execute(
+            "UPDATE seats SET delta = delta - ? "
+            "WHERE flight_id = ? AND date = ? AND class = ? AND capacity + delta >= ?",
+            (count, flight_id, date, flight_class, count)).rowcount
+        if not taken:
+            return 0
+        self._log(conn, flight_id, date, flight_class, -count)
+        return count
+
+    def record(self, flight_id, date, flight_class, delta):
+        """Persist a change in available seats."""
+        with self.db.transaction() as conn:
+            self._change(conn, flight_id, date, flight_class, delta)
+
+    def record_many(self, changes):
+        """Persist several (flight_id, date, class, delta) changes in one transaction."""
+        if not changes:
+            return
+        with self.db.transaction() as conn:
+            for change in changes:
+                self._change(conn, *change)
+
+    def forget_flight(self, flight_id, date):
+        """Cancel out every delta of a deleted flight so a re-added one starts full."""
+        with self.db.transaction() as conn:
+            rows = conn.execute(
+                "SELECT class, delta FROM seats WHERE flight_id = ? AND date = ? AND delta != 0",
+                (flight_id, date)).fetchall()
+            for flight_class, delta in rows:
+                self._change(conn, flight_id, date, flight_class, -delta)
+
+
+# ===============================================================
+#                       BOOKING STORE
+# ===============================================================
+
+_BOOKING_COLUMNS = "booking_id, passenger_name, flight_id, date, class, fare"
+
+
+def _booking(row):
+    return dict(zip(("booking_id", "passenger_name", "flight_id", "date", "class", "fare"), row))
+
+
+class SqliteBookingStore:
+    """BookingStore on the bookings table.
+
+    Cancelling flips status to CANCELLED; the partial indexes only cover
+    live bookings. query() cursors are the seq primary key (the CSV store
+    pages by date, then booking order). archive() moves past dates to the
+    same gzip cold storage as the CSV store, next to the database file.
+    """
+
+    BOOKED = "BOOKED"
+    CANCELLED = "CANCELLED"
+
+    def __init__(self, db):
+        self.db = db
+        self.cold = BookingArchive(os.path.join(os.path.dirname(db.path), "bookings", "archive"))
+
+    @staticmethod
+    def passenger_key(passenger_name):
+        return passenger_name.strip().lower()
+
+    @staticmethod
+    def new_booking_id():
+        return new_id("BK")
+
+    def load(self):
+        pass
+
+    def refresh(self):
+        pass
+
+    # -----------------------------------------------------------
+    #                     QUERIES
+    # -----------------------------------------------------------
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return self.db.connection().execute(
+            "SELECT EXISTS (SELECT 1 FROM bookings WHERE status = 'BOOKED')").fetchone()[0] == 1
+
+    def get(self, booking_id):
+        row = self.db.connection().execute(
+            f"SELECT {_BOOKING_COLUMNS} FROM bookings WHERE booking_id = ? AND status = 'BOOKED'",
+            (booking_id,)).fetchone()
+        return _booking(row) if row else None
+
+    def find(self, passenger_name, flight_id, date=None):
+        """Live bookings for a passenger on a flight (optionally one date)."""
+        sql = (f"SELECT {_BOOKING_COLUMNS} FROM bookings "
+               "WHERE passenger_key = ? AND flight_id = ? AND status = 'BOOKED'")
+        params = [self.passenger_key(passenger_name), flight_id.strip()]
+        if date is not None:
+            sql += " AND date = ?"
+            params.append(date.strip())
+        return [_booking(row) for row in self.db.connection().execute(sql + " ORDER BY seq", params)]
+
+    def all(self):
+        """Every live booking, oldest first."""
+        return [_booking(row) for row in self.db.connection().execute(
+            f"SELECT {_BOOKING_COLUMNS} FROM bookings WHERE status = 'BOOKED' ORDER BY seq")]
+
+    def version(self):
+        """A change counter moved by one per booking inserted or cancelled (see BookingStore.version)."""
+        return self.db.connection().execute(
+            "SELECT value FROM meta WHERE key = 'bookings_version'").fetchone()[0]
+
+    def snapshot(self):
+        """(all(), cancellations(), version()) from one read transaction."""
+        with self.db.read():
+            return self.all(), self.cancellations(), self.version()
+
+    @staticmethod
+    def _where(flight_id, date, flight_class):
+        clauses, params = ["status = 'BOOKED'"], []
+        if flight_id:
+            clauses.append("flight_key = ?")
+            params.append(flight_id.strip().lower())
+        if date:
+            clauses.append("date = ?")
+            params.append(date.strip())
+        if flight_class:
+            clauses.append("class = ?")
+            params.append(flight_class)
+        return " AND ".join(clauses), params
+
+    def query(self, flight_id=None, date=None, flight_class=None, after=None, limit=50):
+        """One page of live bookings matching the filters, oldest first.
+
+        Returns (bookings, cursor) like BookingStore.query.
+        """
+        where, params = self._where(flight_id, date, flight_class)
+        rows = self.db.connection().execute(
+            f"SELECT seq, {_BOOKING_COLUMNS} FROM bookings WHERE {where} AND seq > ? ORDER BY seq LIMIT ?",
+            [*params, -1 if after is None else after, limit + 1]).fetchall()
+        cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [_booking(row[1:]) for row in rows[:limit]], cursor
+
+    def count(self, flight_id=None, date=None, flight_class=None):
+        """Number of live bookings matching the filters."""
+        where, params = self._where(flight_id, date, flight_class)
+        return self.db.connection().execute(f"SELECT COUNT(*) FROM bookings WHERE {where}", params).fetchone()[0]
+
+    def distinct(self, field):
+        """Sorted distinct values ("flight_id", "date" or "class") among live bookings."""
+        sql = {
+            "flight_id": "SELECT MIN(flight_id) FROM bookings WHERE status = 'BOOKED' GROUP BY flight_key",
+            "date": "SELECT DISTINCT date FROM bookings WHERE status = 'BOOKED'",
+            "class": "SELECT DISTINCT class FROM bookings WHERE status = 'BOOKED'",
+        }[field]
+        return sorted(row[0] for row in self.db.connection().execute(sql))
+
+    @staticmethod
+    def _date_range(date_from, date_to):
+        clauses, params = [], []
+        if date_from is not None:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("date <= ?")
+            params.append(date_to)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def between(self, date_from=None, date_to=None):
+        """Live bookings for flight dates date_from..date_to (inclusive, None for open)."""
+        where, params = self._date_range(date_from, date_to)
+        return [_booking(row) for row in self.db.connection().execute(
+            f"SELECT {_BOOKING_COLUMNS} FROM bookings WHERE status = 'BOOKED'{where} ORDER BY seq", params)]
+
+    def cancellations(self, date_from=None, date_to=None):
+        """{(flight_id, date, class): cancelled bookings} for flight dates date_from..date_to."""
+        where, params = self._date_range(date_from, date_to)
+        return {(flight_id, date, flight_class): n for flight_id, date, flight_class, n in self.db.connection().execute(
+            f"SELECT flight_id, date, class, COUNT(*) FROM bookings WHERE status = 'CANCELLED'{where} "
+            "GROUP BY flight_id, date, class", params)}
+
+    # -----------------------------------------------------------
+    #                     WRITES
+    # -----------------------------------------------------------
+    def _insert(self, conn, rows):
+        conn.executemany(
+            "INSERT INTO bookings (booking_id, passenger_name, flight_id, date, class, fare, status, "
+            "passenger_key, flight_key) VALUES (?, ?, ?, ?, ?, ?, 'BOOKED', ?, ?)",
+            [(*row, self.passenger_key(row[1]), row[2].strip().lower()) for row in rows])
+        conn.execute("UPDATE meta SET value = value + ? WHERE key = 'bookings_version'", (len(rows),))
+
+    def add(self, passenger_name, flight_id, date, flight_class, fare):
+        """Insert a booking and return it (with its new booking_id)."""
+        return self.add_many([(passenger_name, flight_id, date, flight_class, fare)])[0]
+
+    def add_many(self, bookings):
+        """Insert several (passenger, flight_id, date, class, fare) bookings in one transaction."""
+        rows = [
+            (self.new_booking_id(), name, flight_id, date, flight_class, str(fare))
+            for name, flight_id, date, flight_class, fare in bookings
+        ]
+        with self.db.transaction() as conn:
+            self._insert(conn, rows)
+        return [_booking(row) for row in rows]
+
+    def _cancel(self, conn, booking):
+        conn.execute("UPDATE bookings SET status = 'CANCELLED' WHERE booking_id = ?", (booking["booking_id"],))
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'bookings_version'")
+        return booking
+
+    def cancel(self, booking_id):
+        """Cancel a live booking; returns it, or None if it was not live."""
+        with self.db.transaction() as conn:
+            booking = self.get(booking_id)
+            return self._cancel(conn, booking) if booking else None
+
+    def cancel_matching(self, passenger_name, flight_id, date):
+        """Cancel the oldest live booking for (passenger, flight, date)."""
+        with self.db.transaction() as conn:
+            matches = self.find(passenger_name, flight_id, date)
+            return self._cancel(conn, matches[0]) if matches else None
+
+    # -----------------------------------------------------------
+    #                     ARCHIVE
+    # -----------------------------------------------------------
+    def archive(self, before):
+        """Move the bookings of flight dates before `before` to cold storage
+        and delete their rows. Returns the number of bookings archived.
+
+        The cold files are staged inside the transaction and only swapped
+        in once it has committed, so a failed DELETE leaves them untouched.
+        """
+        staged = []
+        try:
+            with self.db.transaction() as conn:
+                rows = conn.execute(
+                    f"SELECT seq, {_BOOKING_COLUMNS} FROM bookings WHERE status = 'BOOKED' AND date < ? "
+                    "ORDER BY date, seq", (before,)).fetchall()
+                by_date = {}
+                for seq, booking_id, passenger_name, flight_id, date, flight_class, fare in rows:
+                    by_date.setdefault(date, []).append(
+                        (BOOKED, seq, (booking_id, passenger_name, flight_id, flight_class, fare)))
+                for date, records in by_date.items():
+                    staged.append(self.cold.stage(date, records))
+                conn.execute("DELETE FROM bookings WHERE date < ?", (before,))
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'bookings_version'")
+        except BaseException:
+            for files in staged:
+                self.cold.discard(files)
+            raise
+        for files in staged:
+            self.cold.publish(files)
+        return len(rows)
+
+    def archived_dates(self):
+        """Sorted flight dates with bookings in cold storage."""
+        return self.cold.dates()
+
+    def archived(self, date):
+        """The archived bookings of one flight date."""
+        return [
+            dict(zip(("booking_id", "passenger_name", "flight_id", "class", "fare"), fields), date=date)
+            for _, _, fields in self.cold.read(date)
+        ]
+
+
+# ===============================================================
+#                       WAITLIST STORE
+# ===============================================================
+
+_WAITLIST_COLUMNS = "waitlist_id, passenger_name, flight_id, date, class, priority"
+
+
+def _entry(row):
+    return dict(zip(("waitlist_id", "passenger_name", "flight_id", "date", "class", "priority"), row))
+
+
+class SqliteWaitlistStore:
+    """WaitlistStore on the waitlist table; a queue is one index range scan."""
+
+    WAITING = "WAITING"
+    PROMOTED = "PROMOTED"
+    REMOVED = "REMOVED"
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def new_waitlist_id():
+        return new_id("WL")
+
+    def refresh(self):
+        pass
+
+    def peek(self, flight_id, date, flight_class, n=1):
+        """The next n passengers to be promoted for this flight/date/class."""
+        return [_entry(row) for row in self.db.connection().execute(
+            f"SELECT {_WAITLIST_COLUMNS} FROM waitlist "
+            "WHERE flight_id = ? AND date = ? AND class = ? AND status = 'WAITING' "
+            "ORDER BY priority DESC, seq LIMIT ?",
+            (flight_id, date, flight_class, n))]
+
+    def waiting(self, flight_id=None, date=None, flight_class=None):
+        """Waiting entries, optionally for one flight/date/class, in join order."""
+        clauses, params = ["status = 'WAITING'"], []
+        for column, value in (("flight_id", flight_id), ("date", date), ("class", flight_class)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return [_entry(row) for row in self.db.connection().execute(
+            f"SELECT {_WAITLIST_COLUMNS} FROM waitlist WHERE {' AND '.join(clauses)} ORDER BY seq", params)]
+
+    def _insert(self, conn, entries):
+        conn.executemany(
+            "INSERT INTO waitlist (waitlist_id, passenger_name, flight_id, date, class, priority, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, 'WAITING')",
+            [tuple(e.values()) for e in entries])
+
+    def add(self, passenger_name, flight_id, date, flight_class, priority=0):
+        """Put a passenger at the back of their priority level; returns the entry."""
+        entry = _entry((self.new_waitlist_id(), passenger_name, flight_id, date, flight_class, priority))
+        with self.db.transaction() as conn:
+            self._insert(conn, [entry])
+        return entry
+
+    def add_many(self, passengers, flight_id, date, flight_class, priority=0):
+        """Waitlist many passengers on one flight in one transaction; returns the entries."""
+        entries = [
+            _entry((self.new_waitlist_id(), name, flight_id, date, flight_class, priority))
+            for name in passengers
+        ]
+        with self.db.transaction() as conn:
+            self._insert(conn, entries)
+        return entries
+
+    def _close(self, waitlist_ids, status):
+        with self.db.transaction() as conn:
+            return conn.executemany(
+                "UPDATE waitlist SET status = ? WHERE waitlist_id = ? AND status = 'WAITING'",
+                [(status, waitlist_id) for waitlist_id in waitlist_ids]).rowcount
+
+    def mark_promoted(self, entries):
+        """Take promoted passengers off their queues."""
+        self._close([e["waitlist_id"] for e in entries], self.PROMOTED)
+
+    def remove(self, waitlist_id):
+        """Take a passenger off the waitlist without booking them."""
+        return self._close([waitlist_id], self.REMOVED) > 0
+
+
+# ===============================================================
+#                     SQLITE BACKEND
+# ===============================================================
+
+class SqliteStorage(StorageBackend):
+    """Catalog, seats, bookings and waitlist in one SQLite database (WAL).
+
+    A booking is a single transaction: the conditional seat decrement and
+    the booking insert (or the waitlist insert) commit together or not at
+    all, and concurrent writers from any process queue on the database's
+    write lock, so no seat lock files are needed.
+    """
+
+    FILENAME = "flights.db"
+
+    def __init__(self, path, **options):
+        self.db = Database(path, **options)
+        self.inventory = SqliteSeatInventory(self.db)
+        self.bookings = SqliteBookingStore(self.db)
+        self.waitlist = SqliteWaitlistStore(self.db)
+        self.seat_locks = _TransactionLocks(self.db)
+
+    def load_catalog(self):
+        return [list(row) for row in self.db.connection().execute(
+            "SELECT flight_id, source, destination, time, base_price, date, "
+            "econ_seats, business_seats, first_class_seats FROM flights ORDER BY rowid")]
+
+    @staticmethod
+    def _catalog_row(f):
+        return (f.flight_id, f.source, f.destination, f.time, f.base_price, f.date,
+                f.seats["Economy"], f.seats["Business"], f.seats["First Class"])
+
+    def save_catalog(self, flights):
+        rows = [self._catalog_row(f) for f in flights]
+        with self.db.transaction() as conn:
+            self._write_catalog(conn, rows)
+
+    def update_catalog(self, flights, added=(), changed=(), removed=()):
+        """Insert, update or delete just the rows of the flights named (see
+        StorageBackend.update_catalog); the rest of the catalog is untouched."""
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "DELETE FROM flights WHERE flight_id = ? AND date = ?",
+                [(f.flight_id, f.date) for f in removed])
+            conn.executemany(
+                "DELETE FROM seats WHERE flight_id = ? AND date = ? AND delta = 0 AND NOT EXISTS "
+                "(SELECT 1 FROM flights f WHERE f.flight_id = seats.flight_id AND f.date = seats.date)",
+                [(f.flight_id, f.date) for f in removed])
+            conn.executemany(
+                "INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._catalog_row(f) for f in added])
+            conn.executemany(
+                "UPDATE flights SET econ_seats = ?, business_seats = ?, first_class_seats = ? "
+                "WHERE flight_id = ? AND date = ?",
+                [(*self._catalog_row(f)[6:], f.flight_id, f.date) for f in changed])
+            self._write_capacity(conn, [self._catalog_row(f) for f in (*added, *changed)])
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalog_version'")
+
+    @staticmethod
+    def _write_capacity(conn, rows):
+        conn.executemany(
+            "INSERT INTO seats (flight_id, date, class, capacity) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (flight_id, date, class) DO UPDATE SET capacity = excluded.capacity",
+            [(row[0], row[5], cls, seats) for row in rows for cls, seats in zip(SEAT_CLASSES, row[6:])])
+
+    def _write_catalog(self, conn, rows):
+        conn.execute("DELETE FROM flights")
+        conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._write_capacity(conn, rows)
+        conn.execute(
+            "DELETE FROM seats WHERE delta = 0 AND NOT EXISTS "
+            "(SELECT 1 FROM flights f WHERE f.flight_id = seats.flight_id AND f.date = seats.date)")
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalog_version'")
+
+    def catalog_signature(self):
+        return self.db.connection().execute(
+            "SELECT value FROM meta WHERE key = 'catalog_version'").fetchone()[0]
+
+    def take_seats(self, flight, flight_class, count=1, partial=False):
+        with self.db.transaction() as conn:
+            return self.inventory.take(conn, flight.flight_id, flight.date, flight_class, count, partial)
+
+    def import_data(self, flights, seat_deltas, bookings, waiting):
+        """Bulk-load a complete data set in one transaction, replacing what is there.
+
+        flights are Flight() argument lists, seat_deltas {(flight_id, date,
+        class): delta}, bookings BookingStore dicts and waiting WaitlistStore
+        entries, both oldest first. IDs are kept as they are.
+        """
+        with self.db.transaction() as conn:
+            for table in ("flights", "seats", "seat_changes", "bookings", "waitlist"):
+                conn.execute(f"DELETE FROM {table}")
+            self._write_catalog(conn, [
+                (fid, src, dst, time, float(price), date, int(econ), int(business), int(first))
+                for fid, src, dst, time, price, date, econ, business, first in flights
+            ])
+            conn.executemany(
+                "INSERT INTO seats (flight_id, date, class, delta) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (flight_id, date, class) DO UPDATE SET delta = excluded.delta",
+                [(*key, delta) for key, delta in seat_deltas.items() if delta])
+            self.bookings._insert(conn, [
+                (b["booking_id"], b["passenger_name"], b["flight_id"], b["date"], b["class"], str(b["fare"]))
+                for b in bookings
+            ])
+            self.waitlist._insert(conn, waiting)
+        self.inventory.load()
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,164 @@
+import csv
+import os
+
+from booking_store import BookingStore
+from catalog_snapshot import read_snapshot, write_snapshot
+from file_lock import KeyedLocks
+from metrics import count_io
+from seat_inventory import SeatInventory
+from waitlist import WaitlistStore
+
+FLIGHT_HEADER = [
+    "flight_id", "source", "destination", "time",
+    "base_price", "date", "econ_seats", "business_seats", "first_class_seats"
+]
+
+# ===============================================================
+#                  STORAGE BACKEND INTERFACE
+# ===============================================================
+
+class StorageBackend:
+    """Where FlightSystem keeps its catalog, seats, bookings and waitlist.
+
+    A backend exposes three stores with the interfaces of the CSV ones:
+      inventory     seat availability deltas (SeatInventory)
+      bookings      live bookings (BookingStore)
+      waitlist      waitlist queues (WaitlistStore)
+    plus seat_locks, whose hold((flight_id, date, class)) serializes every
+    change to one seat class. Everything done while holding it commits
+    together where the backend supports transactions.
+    """
+
+    inventory = None
+    bookings = None
+    waitlist = None
+    seat_locks = None
+
+    def load_catalog(self):
+        """Every flight as a list of Flight() arguments, in catalog order."""
+        raise NotImplementedError
+
+    def save_catalog(self, flights):
+        """Replace the stored catalog (capacities only) with flights."""
+        raise NotImplementedError
+
+    def update_catalog(self, flights, added=(), changed=(), removed=()):
+        """Store one catalog edit: flights added, flights whose capacity
+        changed and flights removed. flights is the whole catalog after the
+        edit; a backend that cannot change single flights in place saves
+        that instead, which is what this default does.
+        """
+        self.save_catalog(flights)
+
+    def catalog_signature(self):
+        """A value that changes whenever any process saves the catalog."""
+        raise NotImplementedError
+
+    def take_seats(self, flight, flight_class, count=1, partial=False):
+        """Claim count available seats and return how many were taken.
+
+        All or nothing (0 or count), unless partial is set, in which case as
+        many as are left. Caller holds seat_locks for the seat class.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def open_storage(kind="csv", data_dir="data"):
+    """Storage backend by name: "csv" (data_dir/*.csv) or "sqlite" (data_dir/flights.db)."""
+    if kind == "csv":
+        return CsvStorage(data_dir)
+    if kind == "sqlite":
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage(os.path.join(data_dir, SqliteStorage.FILENAME))
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+# ===============================================================
+#                     CSV FILE BACKEND
+# ===============================================================
+
+class CsvStorage(StorageBackend):
+    """The original file layout: flights.csv, the seat and waitlist journals
+    and the date-partitioned booking ledger (data/bookings/).
+
+    Seat changes are serialized by striped inter-process lock files; a
+    booking is two appends (seat journal, then the date's booking segment)
+    under that lock. flights.csv is also kept as a binary snapshot (flights.snapshot,
+    see catalog_snapshot.py), which loads without CSV parsing as long as
+    it was taken of the flights.csv on disk.
+    """
+
+    SNAPSHOT_FILENAME = "flights.snapshot"
+
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.flights_path = os.path.join(data_dir, "flights.csv")
+        self.snapshot_path = os.path.join(data_dir, self.SNAPSHOT_FILENAME)
+        self.inventory = SeatInventory(data_dir)
+        self.bookings = BookingStore(data_dir)
+        self.waitlist = WaitlistStore(data_dir)     # rebuilt lazily on first use
+        self.seat_locks = KeyedLocks(os.path.join(data_dir, "locks"), "seats")
+
+    def load_catalog(self):
+        if not os.path.exists(self.flights_path):
+            self.save_catalog([])
+            return []
+
+        signature = self.catalog_signature()
+        rows = read_snapshot(self.snapshot_path, signature)
+        if rows is not None:
+            return rows
+
+        # No snapshot of this flights.csv (first run, or edited by hand): parse it and take one
+        rows = []
+        with open(self.flights_path, "r") as f:
+            for row in csv.DictReader(f):
+                try:
+                    rows.append([row[name] for name in FLIGHT_HEADER])
+                except KeyError:
+                    continue
+            count_io("read", "flights.csv", os.fstat(f.fileno()).st_size)
+        try:
+            write_snapshot(self.snapshot_path, rows, signature)
+        except OSError:
+            pass        # read-only data dir: keep loading from CSV
+        return rows
+
+    def save_catalog(self, flights):
+        # Written aside and swapped in, so a crash never leaves a truncated catalog
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_path = f"{self.flights_path}.{os.getpid()}.tmp"
+        rows = [
+            (fobj.flight_id, fobj.source, fobj.destination, fobj.time,
+             fobj.base_price, fobj.date,
+             fobj.seats["Economy"], fobj.seats["Business"], fobj.seats["First Class"])
+            for fobj in flights
+        ]
+        with open(tmp_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FLIGHT_HEADER)
+            writer.writerows(rows)
+            count_io("write", "flights.csv", f.tell())
+        # Signature of this very file (the rename keeps it), even if another
+        # writer replaces flights.csv before the snapshot is written
+        st = os.stat(tmp_path)
+        os.replace(tmp_path, self.flights_path)
+        write_snapshot(self.snapshot_path, rows, (st.st_mtime_ns, st.st_size))
+
+    def catalog_signature(self):
+        try:
+            st = os.stat(self.flights_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def take_seats(self, flight, flight_class, count=1, partial=False):
+        self.inventory.refresh()
+        available = max(0, flight.available_seats[flight_class])
+        taken = min(count, available) if partial else (count if available >= count else 0)
+        if taken:
+            self.inventory.record(flight.flight_id, flight.date, flight_class, -taken)
+        return taken
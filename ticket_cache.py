@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from metrics import count_io
+
+# Bump when the ticket layout changes, so stale PDFs are never served
+TEMPLATE_VERSION = 2
+
+# ===============================================================
+#                 CONTENT-ADDRESSED TICKET CACHE
+# ===============================================================
+
+def ticket_key(*payload):
+    """Cache key of a ticket: sha256 over the layout version and payload fields."""
+    text = "\x1f".join(str(value) for value in (TEMPLATE_VERSION, *payload))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TicketCache:
+    """Finished ticket PDFs, keyed by ticket_key().
+
+    Two tiers, each bounded in bytes and evicting least recently used
+    entries first: an in-memory LRU, and a directory of {key}.pdf files
+    that survives restarts and is shared with other processes. Disk
+    recency is the file mtime, refreshed on every hit.
+    """
+
+    def __init__(self, cache_dir=os.path.join("tickets", "cache"),
+                 max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> PDF bytes, least recent first
+        self._memory_bytes = 0
+        self._disk = None              # key -> size, least recent first (scanned on first use)
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _scan_disk(self):
+        """Index files already in cache_dir, oldest first. Caller holds _lock."""
+        if self._disk is not None:
+            return
+        found = []
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".pdf"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, entry.name[:-4], st.st_size))
+        found.sort()
+        self._disk = OrderedDict((key, size) for _, key, size in found)
+        self._disk_bytes = sum(self._disk.values())
+
+    # -----------------------------------------------------------
+    #                     MEMORY TIER
+    # -----------------------------------------------------------
+    def _remember(self, key, data):
+        """Put data in the memory tier. Caller holds _lock."""
+        if len(data) > self.max_memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # -----------------------------------------------------------
+    #                     LOOKUP / STORE
+    # -----------------------------------------------------------
+    def get(self, key):
+        """Cached PDF bytes for key, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            self._scan_disk()
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            count_io("read", "ticket_cache", len(data))
+            os.utime(path)
+        except OSError:
+            # Missing, or evicted by another process meanwhile
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            old_size = self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._disk_bytes += len(data) - old_size
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        """Store data under key in both tiers."""
+        with self._lock:
+            self._remember(key, data)
+            self._scan_disk()
+            if key in self._disk or len(data) > self.max_disk_bytes:
+                return
+
+        # Written under a temp name and renamed: readers never see half a file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        count_io("write", "ticket_cache", len(data))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = len(data)
+                self._disk_bytes += len(data)
+            while self._disk_bytes > self.max_disk_bytes and self._disk:
+                evicted, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    os.remove(self._path(evicted))
+                except OSError:
+                    pass
+
+    def get_or_render(self, key, render):
+        """Cached bytes for key, else render(), cached and returned."""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """Drop every cached ticket, in memory and on disk."""
+        with self._lock:
+            self._scan_disk()
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
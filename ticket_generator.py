@@ -1,30 +1,130 @@
-from fpdf import FPDF
+import copy
+import io
 import os
-from datetime import datetime
-import qrcode
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import multiprocessing
 
+from metrics import count_io, instrument
+from ticket_cache import TicketCache, ticket_key
+
+FONT_FAMILY = "DejaVu"
+FONT_PATH = os.path.join("fonts", "DejaVuSans.ttf")
+
+# Batches smaller than this are rendered in-process; starting workers
+# costs more than it saves.
+PARALLEL_THRESHOLD = 8
+
+
+def _ticket_data(passenger_name, flight_id, flight_date, flight_class, fare):
+    return f"{passenger_name}|{flight_id}|{flight_date}|{flight_class}|₹{fare}"
+
+
+def _qr_png(data):
+    """QR code for data as in-memory PNG bytes."""
+    import qrcode   # with fpdf, imported on first render: both are slow to import
+
+    buf = io.BytesIO()
+    qrcode.make(data).save(buf)
+    return buf.getvalue()
+
+
+def _issue_date():
+    """The issue date printed on a ticket rendered now; part of its cache key,
+    so a cached ticket is never served with an earlier day's date."""
+    return date.today().isoformat()
+
+
+def _booking_fields(booking):
+    """(passenger_name, flight_id, date, class, fare) of a booking dict."""
+    return (booking["passenger_name"], booking["flight_id"], booking["date"],
+            booking["class"], booking["fare"])
+
+
+@instrument("ticket_generator")
 class TicketGenerator:
-    def generate_ticket(self, passenger_name, flight_id, flight_date, flight_class, fare):
-        # Make sure folders exist
-        os.makedirs("fonts", exist_ok=True)
-        os.makedirs("tickets", exist_ok=True)
+    """Renders ticket PDFs.
 
-        pdf = FPDF()
-        pdf.add_page()
+    The TrueType font is parsed once per generator and handed to every new
+    document as a fresh lazy copy, instead of FPDF.add_font() re-reading and
+    re-parsing the file for each ticket. generate_tickets() renders whole
+    batches, spread over a pool of worker processes, each with a generator
+    (and so a parsed font) of its own.
+
+    Finished PDFs are cached by a hash of their payload (see TicketCache),
+    so re-downloading a ticket costs no rendering at all.
+    """
+
+    def __init__(self, font_path=FONT_PATH, output_dir="tickets", workers=None, cache=None):
+        self.font_path = font_path
+        self.output_dir = output_dir
+        self.cache = cache if cache is not None else TicketCache(os.path.join(output_dir, "cache"))
+        self.workers = workers or os.cpu_count() or 1
+        self._font = None          # parsed font of the first document, cloned into later ones
+        self._font_bytes = None
+        self._pool = None
+
+    # -----------------------------------------------------------
+    #                     DOCUMENT SETUP
+    # -----------------------------------------------------------
+    def _clone_font(self):
+        """A copy of the parsed font for a new document, or None.
 
-        # ✅ Use Unicode font
-        font_path = os.path.join("fonts", "DejaVuSans.ttf")
-        if not os.path.exists(font_path):
+        fpdf2 subsets a font in place when a document is output, so each
+        document needs its own fontTools object and subset map; the parsed
+        metrics are shared. Relies on fpdf2 internals, so any mismatch
+        disables cloning and _new_pdf() falls back to add_font().
+        """
+        if self._font is None:
+            return None
+        try:
+            from fontTools import ttLib
+            from fpdf.fonts import SubsetMap
+
+            font = copy.copy(self._font)
+            font.ttfont = ttLib.TTFont(io.BytesIO(self._font_bytes), recalcTimestamp=False, lazy=True)
+            font.subset = SubsetMap(font)
+            font.missing_glyphs = []
+            font.biggest_size_pt = 0
+            font._hbfont = None
+            return font
+        except Exception:
+            self._font = None
+            return None
+
+    def _new_pdf(self):
+        """An empty FPDF with the ticket font registered."""
+        if not os.path.exists(self.font_path):
             raise FileNotFoundError("Font 'DejaVuSans.ttf' not found in fonts folder.")
 
-        pdf.add_font("DejaVu", "", font_path, uni=True)
-        pdf.set_font("DejaVu", size=16)
+        from fpdf import FPDF
+
+        pdf = FPDF()
+        font = self._clone_font()
+        if font is not None:
+            font.i = len(pdf.fonts) + 1
+            pdf.fonts[FONT_FAMILY.lower()] = font
+        else:
+            pdf.add_font(FONT_FAMILY, "", self.font_path, uni=True)
+            template = pdf.fonts.get(FONT_FAMILY.lower())
+            if self._font_bytes is None and all(hasattr(template, a) for a in ("ttfont", "subset", "missing_glyphs")):
+                with open(self.font_path, "rb") as f:
+                    self._font_bytes = f.read()
+                count_io("read", "font", len(self._font_bytes))
+                self._font = copy.copy(template)
+        return pdf
+
+    def _draw_ticket(self, pdf, passenger_name, flight_id, flight_date, flight_class, fare, qr_image, issued):
+        """Lay out one ticket on a new page of pdf."""
+        pdf.add_page()
+        pdf.set_font(FONT_FAMILY, size=16)
 
         # ---- Header ----
         pdf.cell(200, 15, "AirVara Airlines ✈️", ln=True, align="C")
-        pdf.set_font("DejaVu", size=12)
+        pdf.set_font(FONT_FAMILY, size=12)
         pdf.ln(5)
-        pdf.cell(200, 10, f"Issue Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
+        pdf.cell(200, 10, f"Issue Date: {issued}", ln=True, align="C")
         pdf.ln(10)
 
         # ---- Passenger Details ----
@@ -36,20 +136,148 @@ class TicketGenerator:
         pdf.ln(10)
 
         # ---- QR Code ----
-        ticket_data = f"{passenger_name}|{flight_id}|{flight_date}|{flight_class}|₹{fare}"
-        qr = qrcode.make(ticket_data)
-        qr_path = os.path.join("tickets", f"{passenger_name}_{flight_id}_qr.png")
-        qr.save(qr_path)
-        pdf.image(qr_path, x=160, y=60, w=35)
+        pdf.image(qr_image, x=160, y=60, w=35)
 
         # ---- Footer ----
         pdf.ln(20)
-        pdf.set_font("DejaVu", size=11)
+        pdf.set_font(FONT_FAMILY, size=11)
         pdf.cell(0, 10, "Thank you for flying with AirVara Airlines!", ln=True, align="C")
         pdf.cell(0, 10, "For support: support@airvara.com", ln=True, align="C")
 
+    # -----------------------------------------------------------
+    #                     SINGLE TICKET
+    # -----------------------------------------------------------
+    def render_ticket(self, passenger_name, flight_id, flight_date, flight_class, fare, issued=None):
+        """One ticket as PDF bytes, without touching the disk (issued defaults to today)."""
+        pdf = self._new_pdf()
+        qr = _qr_png(_ticket_data(passenger_name, flight_id, flight_date, flight_class, fare))
+        self._draw_ticket(pdf, passenger_name, flight_id, flight_date, flight_class, fare, io.BytesIO(qr),
+                          issued or _issue_date())
+        return bytes(pdf.output())
+
+    def ticket_pdf(self, passenger_name, flight_id, flight_date, flight_class, fare):
+        """One ticket as PDF bytes, served from the cache when already rendered today."""
+        issued = _issue_date()
+        key = ticket_key(passenger_name, flight_id, flight_date, flight_class, fare, issued)
+        return self.cache.get_or_render(
+            key, lambda: self.render_ticket(passenger_name, flight_id, flight_date, flight_class, fare, issued))
+
+    def pooled_ticket_pdf(self, booking):
+        """ticket_pdf() for a booking dict, rendered on the worker pool.
+
+        For servers: the calling thread only waits, so the process's other
+        threads keep the GIL while the PDF is drawn.
+        """
+        row = (*_booking_fields(booking), _issue_date())
+        return self.cache.get_or_render(
+            ticket_key(*row), lambda: self._executor().submit(_render_in_worker, row).result())
+
+    def generate_ticket(self, passenger_name, flight_id, flight_date, flight_class, fare):
+        # Make sure folders exist
+        os.makedirs("fonts", exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        data = self.ticket_pdf(passenger_name, flight_id, flight_date, flight_class, fare)
+
         # ---- Save Ticket ----
-        ticket_path = os.path.join("tickets", f"{passenger_name}_{flight_id}.pdf")
-        pdf.output(ticket_path)
+        ticket_path = os.path.join(self.output_dir, f"{passenger_name}_{flight_id}_{flight_date}.pdf")
+        with open(ticket_path, "wb") as f:
+            f.write(data)
+        count_io("write", "tickets", len(data))
 
         return ticket_path
+
+    # -----------------------------------------------------------
+    #                     BATCHES
+    # -----------------------------------------------------------
+    def _executor(self):
+        if self._pool is None:
+            # spawn: forking a threaded server (Streamlit) is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(os.path.abspath(self.font_path),),
+            )
+        return self._pool
+
+    def _map(self, fn, items, local_fn):
+        """Run fn over items on the pool, or local_fn in-process for small batches."""
+        if self.workers <= 1 or len(items) < PARALLEL_THRESHOLD:
+            return [local_fn(item) for item in items]
+        chunksize = max(1, len(items) // (self.workers * 4))
+        return list(self._executor().map(fn, items, chunksize=chunksize))
+
+    def generate_tickets(self, bookings, merge=False):
+        """Render tickets for many bookings at once.
+
+        bookings are dicts with passenger_name, flight_id, date, class and
+        fare (BookingStore records work as they are). Returns the bytes of
+        one merged PDF (a page per ticket) when merge is set, else of a zip
+        archive holding one PDF per ticket.
+        """
+        fields = [_booking_fields(b) for b in bookings]
+        issued = _issue_date()
+
+        if merge:
+            return self.cache.get_or_render(
+                ticket_key("merged", issued, *(value for row in fields for value in row)),
+                lambda: self._render_merged(fields, issued))
+
+        # Only tickets missing from the cache go to the workers
+        rows = [(*row, issued) for row in fields]
+        keys = [ticket_key(*row) for row in rows]
+        pdfs = [self.cache.get(key) for key in keys]
+        missing = [i for i, data in enumerate(pdfs) if data is None]
+        rendered = self._map(_render_in_worker, [rows[i] for i in missing],
+                             lambda row: self.render_ticket(*row))
+        for i, data in zip(missing, rendered):
+            self.cache.put(keys[i], data)
+            pdfs[i] = data
+
+        buf = io.BytesIO()
+        seen = set()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+            for (passenger_name, flight_id, flight_date, _, _), data in zip(fields, pdfs):
+                name = base = f"{passenger_name}_{flight_id}_{flight_date}"
+                n = 1
+                while name in seen:
+                    n += 1
+                    name = f"{base}_{n}"
+                seen.add(name)
+                archive.writestr(f"{name}.pdf", data)
+        return buf.getvalue()
+
+    def _render_merged(self, fields, issued):
+        # QR codes in parallel; pages laid out here, so the font is
+        # embedded (and subset) once for the whole document.
+        qrs = self._map(_qr_in_worker, fields, _qr_in_worker)
+        pdf = self._new_pdf()
+        for row, qr in zip(fields, qrs):
+            self._draw_ticket(pdf, *row, io.BytesIO(qr), issued)
+        return bytes(pdf.output())
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# ---------------------------------------------------------------
+#                     WORKER PROCESSES
+# ---------------------------------------------------------------
+_worker_generator = None
+
+
+def _init_worker(font_path):
+    global _worker_generator
+    _worker_generator = TicketGenerator(font_path)
+
+
+def _render_in_worker(fields):
+    return _worker_generator.render_ticket(*fields)
+
+
+def _qr_in_worker(fields):
+    return _qr_png(_ticket_data(*fields))
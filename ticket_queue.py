@@ -0,0 +1,228 @@
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from journal import JournalStore, new_id
+
+LEASE_SECONDS = 60          # a claimed job is handed out again after this long
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 2     # doubled after every failed attempt
+KEEP_FINISHED_SECONDS = 24 * 3600
+
+# ===============================================================
+#                  DURABLE TICKET JOB QUEUE
+# ===============================================================
+
+class TicketJobQueue(JournalStore):
+    """Ticket rendering jobs, one per booking, in data/ticket_jobs.csv.
+
+    Every state change appends the job's full row (the last row of a job
+    wins): PENDING -> RUNNING -> DONE, or back to PENDING after a failure
+    until MAX_ATTEMPTS, then FAILED. A RUNNING job is leased for
+    LEASE_SECONDS; if its worker dies (or the server restarts) the lease
+    runs out and the job is claimed again (as another attempt), so no
+    pending ticket is lost.
+    Finished jobs are forgotten (in memory, and from the file at the next
+    compaction) once they are KEEP_FINISHED_SECONDS old.
+    """
+
+    FILENAME = "ticket_jobs.csv"
+    HEADER = ["job_id", "status", "attempts", "not_before", "updated",
+              "passenger_name", "flight_id", "date", "class", "fare", "path", "error"]
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+    def __init__(self, data_dir="data", compact_every=1000, max_attempts=MAX_ATTEMPTS,
+                 lease_seconds=LEASE_SECONDS, retry_delay=RETRY_DELAY_SECONDS):
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self._jobs = {}                # job_id -> job dict (latest row)
+        self._open = OrderedDict()     # PENDING / RUNNING job_ids, oldest first
+        self._finished = OrderedDict() # DONE / FAILED job_id -> finish time, oldest first
+        self.submitted = threading.Event()
+        super().__init__(data_dir, compact_every)
+        self.load()
+
+    @staticmethod
+    def new_job_id():
+        return new_id("TJ")
+
+    # -----------------------------------------------------------
+    #                     JOURNAL HOOKS
+    # -----------------------------------------------------------
+    def _clear(self):
+        self._jobs = {}
+        self._open = OrderedDict()
+        self._finished = OrderedDict()
+
+    def _apply(self, row, notify):
+        if len(row) < len(self.HEADER):
+            return
+        job = dict(zip(self.HEADER, row))
+        try:
+            job["attempts"] = int(job["attempts"])
+            job["not_before"] = float(job["not_before"])
+            job["updated"] = float(job["updated"])
+        except ValueError:
+            return
+        self._jobs[job["job_id"]] = job
+        self._finished.pop(job["job_id"], None)
+        if job["status"] in (self.PENDING, self.RUNNING):
+            self._open.setdefault(job["job_id"])
+        else:
+            self._open.pop(job["job_id"], None)
+            self._finished[job["job_id"]] = job["updated"]
+
+    def _forget_finished(self):
+        """Drop jobs finished more than KEEP_FINISHED_SECONDS ago from memory."""
+        cutoff = time.time() - KEEP_FINISHED_SECONDS
+        while self._finished:
+            job_id, updated = next(iter(self._finished.items()))
+            if updated >= cutoff:
+                break
+            del self._finished[job_id]
+            del self._jobs[job_id]
+
+    def _live_rows(self):
+        self._forget_finished()
+        return [list(job.values()) for job in self._jobs.values()]
+
+    def _live_count(self):
+        self._forget_finished()
+        return len(self._open) + len(self._finished)
+
+    def _row(self, job, **changes):
+        job = {**job, **changes, "updated": time.time()}
+        return [job[name] for name in self.HEADER]
+
+    # -----------------------------------------------------------
+    #                     PRODUCER SIDE
+    # -----------------------------------------------------------
+    def submit(self, bookings):
+        """Queue one job per booking dict (one append); returns the job IDs."""
+        now = time.time()
+        rows = [
+            [self.new_job_id(), self.PENDING, 0, 0, now, b["passenger_name"], b["flight_id"],
+             b["date"], b["class"], b["fare"], "", ""]
+            for b in bookings
+        ]
+        self.append(rows)
+        self.submitted.set()
+        return [row[0] for row in rows]
+
+    def statuses(self, job_ids):
+        """Current job dicts for job_ids (unknown IDs are left out)."""
+        self.refresh()
+        with self._lock:
+            return [dict(self._jobs[job_id]) for job_id in job_ids if job_id in self._jobs]
+
+    # -----------------------------------------------------------
+    #                     WORKER SIDE
+    # -----------------------------------------------------------
+    def claim(self):
+        """Lease the oldest job that is due (pending, or with an expired lease), or None.
+
+        An expired lease means the worker died mid-render; that counts as a
+        failed attempt, so a ticket that keeps killing its worker ends up
+        FAILED after max_attempts instead of being retried forever.
+        """
+        now = time.time()
+        with self.transaction():
+            for job_id in list(self._open):
+                job = self._jobs[job_id]
+                if job["not_before"] > now:
+                    continue
+                attempts = job["attempts"] + (job["status"] == self.RUNNING)
+                if attempts >= self.max_attempts:
+                    self._write([self._row(job, status=self.FAILED, attempts=attempts,
+                                           error="worker lost (lease expired)")])
+                    continue
+                self._write([self._row(job, status=self.RUNNING, attempts=attempts,
+                                       not_before=now + self.lease_seconds)])
+                return dict(self._jobs[job_id])
+        return None
+
+    def complete(self, job_id, path):
+        with self.transaction():
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == self.RUNNING:
+                self._write([self._row(job, status=self.DONE, path=path, error="")])
+
+    def fail(self, job_id, error):
+        """Schedule a retry with backoff, or give up after max_attempts."""
+        with self.transaction():
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != self.RUNNING:
+                return
+            attempts = job["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self._write([self._row(job, status=self.FAILED, attempts=attempts, error=error)])
+            else:
+                delay = self.retry_delay * 2 ** (attempts - 1)
+                self._write([self._row(job, status=self.PENDING, attempts=attempts,
+                                       not_before=time.time() + delay, error=error)])
+
+    def pending_count(self):
+        self.refresh()
+        with self._lock:
+            return len(self._open)
+
+
+# ===============================================================
+#                     BACKGROUND WORKERS
+# ===============================================================
+
+class TicketWorkers:
+    """Threads that take jobs off a TicketJobQueue and render them.
+
+    Each job becomes a PDF on disk via TicketGenerator.generate_ticket
+    (which also fills the ticket cache). Idle workers wake up as soon as a
+    job is submitted in this process, and every poll_interval otherwise,
+    which also picks up jobs from other processes and expired leases.
+    """
+
+    def __init__(self, queue, generator, threads=2, poll_interval=1.0):
+        self.queue = queue
+        self.generator = generator
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._run, name=f"ticket-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.queue.submitted.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cleared before looking, so a submit in between still wakes us
+            self.queue.submitted.clear()
+            job = self.queue.claim()
+            if job is None:
+                self.queue.submitted.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        try:
+            path = self.generator.generate_ticket(
+                job["passenger_name"], job["flight_id"], job["date"], job["class"], job["fare"])
+        except Exception:
+            self.queue.fail(job["job_id"], traceback.format_exc(limit=3).strip().splitlines()[-1])
+        else:
+            self.queue.complete(job["job_id"], path)
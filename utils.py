@@ -1,22 +1,28 @@
 # utils.py
-def merge_sort_flights(flights, key=lambda x: x.price):
-    if len(flights) <= 1:
-        return flights
-    mid = len(flights) // 2
-    left = merge_sort_flights(flights[:mid], key)
-    right = merge_sort_flights(flights[mid:], key)
-    return merge(left, right, key)
+def merge_sort_flights(flights, key=lambda f: f.base_price):
+    """Return flights sorted by key (cheapest base fare first by default).
 
-def merge(left, right, key):
-    sorted_list = []
-    i = j = 0
-    while i < len(left) and j < len(right):
-        if key(left[i]) < key(right[j]):
-            sorted_list.append(left[i])
-            i += 1
-        else:
-            sorted_list.append(right[j])
-            j += 1
-    sorted_list.extend(left[i:])
-    sorted_list.extend(right[j:])
-    return sorted_list
+    Kept for callers of the old hand-written merge sort, which sliced the
+    list at every level and was not stable. sorted() is a stable merge
+    sort (Timsort) in C. For multi-key ranking and top-K see ranking.py.
+    """
+    return sorted(flights, key=key)
+
+def parse_time(value):
+    """Minutes after midnight for a clock time such as "06:30", "6:30:00"
+    or "6:30 PM". Returns None if value is not a valid time."""
+    text = str(value).strip().upper()
+    suffix = None
+    if text.endswith(("AM", "PM")):
+        text, suffix = text[:-2].strip(), text[-2:]
+    parts = text.split(":")
+    if not 2 <= len(parts) <= 3 or not all(p.isdigit() for p in parts):
+        return None
+    hours, minutes = int(parts[0]), int(parts[1])
+    if suffix is not None:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if suffix == "PM" else 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
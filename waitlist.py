@@ -0,0 +1,180 @@
+import csv
+from collections import deque
+
+from journal import JournalStore, new_id
+
+# ===============================================================
+#                       WAITLIST STORE
+# ===============================================================
+
+class WaitlistStore(JournalStore):
+    """Persistent per-(flight_id, date, class) waitlist queues.
+
+    waitlist.csv is an append-only log: a WAITING row joins a queue, and a
+    PROMOTED / REMOVED row for the same waitlist_id takes the passenger off
+    it. Queues are rebuilt lazily, on first use, from that log.
+
+    Each queue is FIFO within a priority level; higher priorities are served
+    first. Entries leaving a queue are dropped from the entry map at once and
+    skipped when they reach the front of their deque, so promotion is O(1).
+    """
+
+    FILENAME = "waitlist.csv"
+    HEADER = ["waitlist_id", "passenger_name", "flight_id", "date", "class", "priority", "status"]
+    LEGACY_HEADER = ["passenger_name", "flight_id", "date", "class"]
+
+    WAITING = "WAITING"
+    PROMOTED = "PROMOTED"
+    REMOVED = "REMOVED"
+
+    def __init__(self, data_dir="data", compact_every=1000):
+        self._entries = {}         # waitlist_id -> entry dict (still waiting)
+        self._queues = {}          # (flight_id, date, class) -> {priority: deque of waitlist_id}
+        self._migrated = False
+        super().__init__(data_dir, compact_every)
+
+    @staticmethod
+    def new_waitlist_id():
+        return new_id("WL")
+
+    # -----------------------------------------------------------
+    #                     JOURNAL HOOKS
+    # -----------------------------------------------------------
+    def _clear(self):
+        self._entries = {}
+        self._queues = {}
+
+    def _apply(self, row, notify):
+        if len(row) < 7:
+            return
+        waitlist_id, passenger_name, flight_id, date, flight_class, priority, status = row[:7]
+
+        if status == self.WAITING:
+            if waitlist_id in self._entries:
+                return
+            try:
+                priority = int(priority or 0)
+            except ValueError:
+                priority = 0
+            self._entries[waitlist_id] = {
+                "waitlist_id": waitlist_id, "passenger_name": passenger_name, "flight_id": flight_id,
+                "date": date, "class": flight_class, "priority": priority,
+            }
+            levels = self._queues.get((flight_id, date, flight_class))
+            if levels is None:
+                levels = self._queues[(flight_id, date, flight_class)] = {}
+            queue = levels.get(priority)
+            if queue is None:
+                queue = levels[priority] = deque()
+            queue.append(waitlist_id)
+        else:
+            # Left in its deque; skipped (and dropped) once it reaches the front
+            self._entries.pop(waitlist_id, None)
+
+    def _live_rows(self):
+        return [[*e.values(), self.WAITING] for e in self._entries.values()]
+
+    def _live_count(self):
+        return len(self._entries)
+
+    def _catch_up(self):
+        if not self._migrated:
+            self._migrate_legacy_file()
+        super()._catch_up()
+
+    def _migrate_legacy_file(self):
+        """Give pre-waitlist_id files (with or without header) IDs. Caller holds the file lock."""
+        self._migrated = True
+        first = self.journal.first_row()
+        if first is None or first == self.HEADER:
+            return
+        with open(self.journal.path, "r", newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        if rows[0] == self.LEGACY_HEADER:
+            rows = rows[1:]
+        self.journal.rewrite([
+            [self.new_waitlist_id(), *row[:4], 0, self.WAITING]
+            for row in rows if len(row) >= 4
+        ])
+
+    # -----------------------------------------------------------
+    #                     QUERIES
+    # -----------------------------------------------------------
+    def _front(self, key, n):
+        """Up to n waiting entries of a queue in service order. Caller holds _lock."""
+        levels = self._queues.get(key)
+        if not levels:
+            return []
+        found = []
+        for priority in sorted(levels, reverse=True):
+            queue = levels[priority]
+            while queue and queue[0] not in self._entries:
+                queue.popleft()
+            if not queue:
+                del levels[priority]
+                continue
+            for waitlist_id in queue:
+                if waitlist_id in self._entries:
+                    found.append(dict(self._entries[waitlist_id]))
+                    if len(found) == n:
+                        return found
+        if not levels:
+            del self._queues[key]
+        return found
+
+    def peek(self, flight_id, date, flight_class, n=1):
+        """The next n passengers to be promoted for this flight/date/class."""
+        self.refresh()
+        with self._lock:
+            return self._front((flight_id, date, flight_class), n)
+
+    def waiting(self, flight_id=None, date=None, flight_class=None):
+        """Waiting entries, optionally for one flight/date/class, in join order."""
+        self.refresh()
+        with self._lock:
+            return [
+                dict(e) for e in self._entries.values()
+                if (flight_id is None or e["flight_id"] == flight_id)
+                and (date is None or e["date"] == date)
+                and (flight_class is None or e["class"] == flight_class)
+            ]
+
+    # -----------------------------------------------------------
+    #                     WRITES
+    # -----------------------------------------------------------
+    def add(self, passenger_name, flight_id, date, flight_class, priority=0):
+        """Put a passenger at the back of their priority level; returns the entry."""
+        waitlist_id = self.new_waitlist_id()
+        self.append([[waitlist_id, passenger_name, flight_id, date, flight_class, priority, self.WAITING]])
+        return {
+            "waitlist_id": waitlist_id, "passenger_name": passenger_name, "flight_id": flight_id,
+            "date": date, "class": flight_class, "priority": priority,
+        }
+
+    def add_many(self, passengers, flight_id, date, flight_class, priority=0):
+        """Waitlist many passengers on one flight with a single append; returns the entries."""
+        rows = [
+            [self.new_waitlist_id(), name, flight_id, date, flight_class, priority, self.WAITING]
+            for name in passengers
+        ]
+        self.append(rows)
+        return [dict(zip(self.HEADER[:6], row)) for row in rows]
+
+    def _close(self, entries, status):
+        with self.transaction():
+            self._write([
+                [*e.values(), status] for e in entries
+                if e["waitlist_id"] in self._entries
+            ])
+
+    def mark_promoted(self, entries):
+        """Take promoted passengers off their queues (one append)."""
+        self._close(entries, self.PROMOTED)
+
+    def remove(self, waitlist_id):
+        """Take a passenger off the waitlist without booking them."""
+        with self._lock:
+            entry = self._entries.get(waitlist_id)
+        if entry is not None:
+            self._close([dict(entry)], self.REMOVED)
+        return entry is not None